@@ -3,6 +3,7 @@ import sys
 
 import dj_database_url
 import environ
+from django.utils.dateparse import parse_datetime
 
 from .settings_jurisdiction import *  # noqa
 
@@ -44,6 +45,9 @@ env = environ.Env(
     LEGISTAR_TOKEN=(str, ""),
     TRANSLATION_SUITE_URL=(str, ""),
     TRANSLATION_API_KEY=(str, ""),
+    REDIS_URL=(str, ""),
+    TWO_LEVEL_CACHE=(bool, True),
+    HEROKU_RELEASE_CREATED_AT=(str, ""),
 )
 
 # Core Django Settings
@@ -94,22 +98,73 @@ DATABASES["default"] = dj_database_url.parse(
 
 HAYSTACK_CONNECTIONS = {
     "default": {
-        "ENGINE": "haystack.backends.elasticsearch7_backend.Elasticsearch7SearchEngine",
+        "ENGINE": "lametro.search_backends.LAMetroElasticsearch7SearchEngine",
         "URL": env("SEARCH_URL"),
         "INDEX_NAME": "lametro",
         "SILENTLY_FAIL": False,
         "BATCH_SIZE": 10,
     }
 }
-HAYSTACK_SIGNAL_PROCESSOR = "haystack.signals.RealtimeSignalProcessor"
+HAYSTACK_SIGNAL_PROCESSOR = "lametro.signals.processors.QueuedSignalProcessor"
 HAYSTACK_IDENTIFIER_METHOD = "lametro.utils.get_identifier"
 
-cache_backend = "dummy.DummyCache" if DEBUG is True else "db.DatabaseCache"
-CACHES = {
-    "default": {
-        "BACKEND": f"django.core.cache.backends.{cache_backend}",
-        "LOCATION": "site_cache",
+# The shared cache tier is Redis, if it's configured, or else the database.
+# Set TWO_LEVEL_CACHE=False to use the shared tier without the per-process
+# cache in front of it.
+REDIS_URL = env("REDIS_URL")
+TWO_LEVEL_CACHE = env.bool("TWO_LEVEL_CACHE")
+
+
+def shared_cache(location):
+    if REDIS_URL:
+        return {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": location,
+        }
+
+    return {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": location,
+    }
+
+
+def two_level_cache(location, shared, local_timeout):
+    if not TWO_LEVEL_CACHE:
+        return CACHES[shared]
+
+    return {
+        "BACKEND": "lametro.cache_backends.TwoLevelCache",
+        "LOCATION": location,
+        "OPTIONS": {
+            "SHARED": shared,
+            "LOCAL_TIMEOUT": local_timeout,
+            "MAX_ENTRIES": 1000,
+        },
     }
+
+
+CACHES = {
+    "shared": shared_cache("site_cache"),
+    # Written by the poll_live_media command and read by the site, so it must be
+    # shared between processes in every environment, including local development.
+    "live_media_shared": shared_cache("live_media_cache"),
+}
+CACHES["default"] = (
+    {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    if DEBUG is True
+    else two_level_cache("site", "shared", local_timeout=30)
+)
+# Kept briefly in process memory, so a poll is seen within a few seconds
+CACHES["live_media"] = two_level_cache(
+    "live_media", "live_media_shared", local_timeout=5
+)
+# SmartLogic concepts for autocomplete terms. They're requested often and have
+# many keys, so they're kept only in process memory, apart from the site cache.
+CACHES["smartlogic"] = {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "smartlogic",
+    "OPTIONS": {"MAX_ENTRIES": 1000},
 }
 ADV_CACHE_INCLUDE_PK = True
 
@@ -297,6 +352,11 @@ else:
 SENTRY_DSN = env("SENTRY_DSN")
 HEROKU_APP_NAME = os.getenv("HEROKU_APP_NAME", None)
 
+# When the running release was created, set by Heroku's dyno metadata. Pages
+# rendered by an earlier release may differ, so conditional requests treat
+# every page as changed at this time.
+RELEASED_AT = parse_datetime(env("HEROKU_RELEASE_CREATED_AT")) or None
+
 if SENTRY_DSN:
     import logging
 
@@ -364,6 +424,27 @@ LOGGING = {
 
 # Hard time limit on HTTP requests
 REQUEST_TIMEOUT = 5
+# Time limit on establishing a connection, within the overall request timeout
+REQUEST_CONNECT_TIMEOUT = 3.05
+
+# How often poll_live_media checks Granicus, and how long its results are
+# trusted if polling stops
+LIVE_MEDIA_POLL_INTERVAL = 30
+LIVE_MEDIA_SNAPSHOT_TIMEOUT = LIVE_MEDIA_POLL_INTERVAL * 4
+
+# How long the cached upcoming and recent meetings on the homepage are kept.
+# They're also invalidated when events change.
+HOMEPAGE_CACHE_TIMEOUT = 60 * 5
+
+# How far, in degrees, the board members map may move a point when simplifying
+# district shapes. Run refresh_map_layers after changing it.
+MAP_SIMPLIFY_TOLERANCE = 0.0001
+
+# How many requests compile_pdfs and probe_packets make to the PDF merger, or
+# to the bucket the packets are written to, at once, and how many times a
+# failed request is retried
+PACKET_REQUEST_WORKERS = 8
+PACKET_REQUEST_RETRIES = 3
 
 WAGTAIL_SITE_NAME = "boardagendas.metro.net"
 WAGTAILADMIN_BASE_URL = env("WAGTAILADMIN_BASE_URL")
@@ -39,8 +39,10 @@ from lametro.views import (
     LAMetroArchiveSearch,
     LAMetroContactView,
     MinutesView,
+    map_layer,
     TagAnalyticsView,
     TranslationFilesView,
+    TranslationFilesBatchView,
     pong,
     test_logging,
 )
@@ -109,6 +111,7 @@ urlpatterns = [
     url(r"^metro-logout/$", metro_logout, name="metro_logout"),
     url(r"^refresh-guid/(.*)$", refresh_guid_trigger, name="refresh_guid"),
     url(r"^object-counts/(.*)$", fetch_object_counts, name="object_counts"),
+    path("board-members/map/<str:name>/", map_layer, name="map_layer"),
     url(r"^delete-event/(?P<event_slug>[^/]+)/$", delete_event, name="delete_event"),
     url(
         r"^manual_event_link/(?P<event_slug>[^/]+)/$",
@@ -125,6 +128,11 @@ urlpatterns = [
         name="lametro_ses_endpoint",
     ),
     path("smartlogic/", include("smartlogic.urls", namespace="smartlogic")),
+    path(
+        "api/translations/",
+        TranslationFilesBatchView.as_view(),
+        name="translations",
+    ),
     path(
         "api/translations/<str:document_id>/",
         TranslationFilesView.as_view(),
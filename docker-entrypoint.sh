@@ -3,10 +3,15 @@ set -e
 
 if [ "$DJANGO_MANAGEPY_MIGRATE" = 'on' ]; then
     python manage.py migrate --noinput
+    python manage.py createcachetable
+    python manage.py refresh_visible_bills
+    python manage.py refresh_latest_actions
+    python manage.py refresh_recent_committee_bills
 fi
 
 if [ "$DJANGO_MANAGEPY_IMPORT_SHAPES" = 'on' ]; then
     python manage.py import_shapes data/final/boundary.geojson
+    python manage.py refresh_map_layers
 fi
 
 exec "$@"
@@ -1,12 +1,17 @@
+import hashlib
+import json
+
 from django.conf import settings
 from django.core import management
+from django.core.cache import caches
 from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import RedirectView
 
 from haystack.query import SearchQuerySet
 
-from lametro.models import LAMetroBill, LAMetroEvent, LAMetroSubject
+from lametro.models import LAMetroBill, LAMetroEvent
+from lametro.services.subject_service import SubjectService
 from smartlogic.views import SmartLogicAPI
 
 
@@ -42,22 +47,50 @@ def refresh_guid_trigger(request, refresh_key):
 
 
 class LAMetroSmartLogicAPI(SmartLogicAPI):
+    # Seconds to cache SES concepts for a term
+    CONCEPTS_TIMEOUT = 60 * 60
+
     def get_queryset(self, *args, **kwargs):
         self.kwargs["endpoint"] = "concepts"
 
-        qs = super().get_queryset(*args, **kwargs)
-
         action = self.kwargs.get("action", "suggest")
 
         if action not in ("suggest", "relate"):
             raise ValueError("action must be one of: suggest, relate")
 
+        qs = self.get_concepts(*args, **kwargs)
+
         if action == "suggest":
             return self.get_suggestions(qs)
 
         else:
             return self.get_relations(qs)
 
+    def get_concepts(self, *args, **kwargs):
+        """
+        Return the SES concepts for the term. Autocomplete requests the same
+        prefixes over and over, so concepts are cached on the term and the
+        allowed query parameters. Both actions are computed from the same
+        concepts, so they share cache entries. Requests SES refuses aren't
+        cached. Tokens are public, so cached concepts are served without
+        checking the token.
+
+        Concepts are cached in each process, in the smartlogic cache, so that
+        they don't crowd the site cache.
+        """
+        query_parameters = sorted(
+            (k, v) for k, v in self.request.GET.items() if k in self.ALLOWED_PARAMETERS
+        )
+        key = hashlib.sha256(
+            json.dumps([self.kwargs["term"], query_parameters]).encode()
+        ).hexdigest()
+
+        return caches["smartlogic"].get_or_set(
+            f"smartlogic_concepts:{key}",
+            lambda: super(LAMetroSmartLogicAPI, self).get_queryset(*args, **kwargs),
+            self.CONCEPTS_TIMEOUT,
+        )
+
     def get_suggestions(self, concepts):
         suggestions = {}
 
@@ -115,11 +148,9 @@ class LAMetroSmartLogicAPI(SmartLogicAPI):
     def map_to_subject(self, concepts, filter_concepts=True):
         result_count = int(self.request.GET.get("maxResultCount", 10))
 
+        guid_names = SubjectService.guid_names()
         matched_subjects = {
-            sub["guid"]: {"name": sub["name"]}
-            for sub in LAMetroSubject.objects.filter(
-                guid__in=list(concepts.keys())
-            ).values("name", "guid")
+            guid: {"name": guid_names[guid]} for guid in concepts if guid in guid_names
         }
 
         subjects = []
@@ -160,6 +191,12 @@ def fetch_object_counts(request, key):
             "bill_count": LAMetroBill.objects.count(),
             "event_count": LAMetroEvent.objects.count(),
             "search_index_count": SearchQuerySet().count(),
+            # Counted in the process that served this request
+            "cache": {
+                alias: caches[alias].stats()
+                for alias in settings.CACHES
+                if hasattr(caches[alias], "stats")
+            },
         }
     else:
         response = {
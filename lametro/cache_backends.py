@@ -0,0 +1,254 @@
+from collections import Counter, OrderedDict
+import pickle
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+
+
+# Django creates a cache backend instance per thread, so the local tier and its
+# counters are kept at module level, keyed by LOCATION, to be shared by every
+# thread in the process.
+_local_caches = {}
+_local_locks = {}
+_stats = {}
+
+_MISSING = object()
+
+
+class TwoLevelCache(BaseCache):
+    """
+    A small per-process LRU cache in front of a shared cache backend, e.g.,
+    Redis or the database. Reads are served from process memory when possible,
+    writes go to both tiers.
+
+    Entries are kept locally for at most LOCAL_TIMEOUT seconds, so a change
+    made by another process is seen within that time. Changes made by this
+    process are seen immediately.
+
+    Options:
+        SHARED: Alias of the shared cache (required)
+        LOCAL_TIMEOUT: Seconds to keep entries in process memory (default 30)
+        MAX_ENTRIES: Number of entries to keep in process memory (default 300)
+        LOCK_TIMEOUT: Seconds get_or_set waits for another process to compute
+            a missing value before computing it itself (default 10)
+    """
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+
+        self._shared_alias = options["SHARED"]
+        self._local_timeout = int(options.get("LOCAL_TIMEOUT", 30))
+        self._lock_timeout = int(options.get("LOCK_TIMEOUT", 10))
+
+        self._local = _local_caches.setdefault(name, OrderedDict())
+        self._lock = _local_locks.setdefault(name, threading.Lock())
+        self._stats = _stats.setdefault(name, Counter())
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "local_hits": self._stats["local_hits"],
+                "shared_hits": self._stats["shared_hits"],
+                "misses": self._stats["misses"],
+                "lock_waits": self._stats["lock_waits"],
+                "local_entries": len(self._local),
+            }
+
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _get_local(self, key):
+        with self._lock:
+            try:
+                pickled, expires = self._local[key]
+            except KeyError:
+                return _MISSING
+
+            if expires <= time.monotonic():
+                del self._local[key]
+                return _MISSING
+
+            self._local.move_to_end(key)
+
+        return pickle.loads(pickled)
+
+    def _set_local(self, key, value, timeout=DEFAULT_TIMEOUT):
+        if timeout == DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+
+        if timeout is not None and timeout <= 0:
+            self._delete_local(key)
+            return
+
+        local_timeout = self._local_timeout
+
+        if timeout is not None:
+            local_timeout = min(local_timeout, timeout)
+
+        # Store a pickled copy, so callers can't mutate the cached value
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            self._local[key] = (pickled, time.monotonic() + local_timeout)
+            self._local.move_to_end(key)
+
+            while len(self._local) > self._max_entries:
+                self._local.popitem(last=False)
+
+    def _delete_local(self, key):
+        with self._lock:
+            self._local.pop(key, None)
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_key(key, version)
+
+        value = self._get_local(local_key)
+
+        if value is not _MISSING:
+            self._count("local_hits")
+            return value
+
+        value = self.shared.get(key, _MISSING, version=version)
+
+        if value is _MISSING:
+            self._count("misses")
+            return default
+
+        self._count("shared_hits")
+        self._set_local(local_key, value)
+
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        remaining = []
+
+        for key in keys:
+            value = self._get_local(self.make_key(key, version))
+
+            if value is _MISSING:
+                remaining.append(key)
+            else:
+                self._count("local_hits")
+                found[key] = value
+
+        if remaining:
+            shared_values = self.shared.get_many(remaining, version=version)
+
+            for key in remaining:
+                if key in shared_values:
+                    self._count("shared_hits")
+                    self._set_local(self.make_key(key, version), shared_values[key])
+                    found[key] = shared_values[key]
+                else:
+                    self._count("misses")
+
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self._set_local(self.make_key(key, version), value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed_keys = self.shared.set_many(data, timeout, version=version)
+
+        for key, value in data.items():
+            if key not in failed_keys:
+                self._set_local(self.make_key(key, version), value, timeout)
+
+        return failed_keys
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if not self.shared.add(key, value, timeout, version=version):
+            return False
+
+        self._set_local(self.make_key(key, version), value, timeout)
+
+        return True
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        """
+        Like BaseCache.get_or_set, except that when the value is missing only
+        one caller at a time computes it. Others wait for the value to appear
+        in the shared cache, for up to LOCK_TIMEOUT seconds.
+        """
+        value = self.get(key, _MISSING, version=version)
+
+        if value is not _MISSING:
+            return value
+
+        lock_key = f"{key}:lock"
+        deadline = time.monotonic() + self._lock_timeout
+
+        while not (
+            acquired := self.shared.add(lock_key, 1, self._lock_timeout, version)
+        ):
+            self._count("lock_waits")
+
+            if time.monotonic() >= deadline:
+                break
+
+            time.sleep(0.05)
+            value = self.shared.get(key, _MISSING, version=version)
+
+            if value is not _MISSING:
+                self._set_local(self.make_key(key, version), value)
+                return value
+
+        try:
+            if callable(default):
+                default = default()
+
+            self.add(key, default, timeout, version=version)
+        finally:
+            if acquired:
+                self.shared.delete(lock_key, version=version)
+
+        return self.get(key, default, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._delete_local(self.make_key(key, version))
+        return self.shared.touch(key, timeout, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._delete_local(self.make_key(key, version))
+        return self.shared.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        self._delete_local(self.make_key(key, version))
+        return self.shared.decr(key, delta, version=version)
+
+    def has_key(self, key, version=None):
+        if self._get_local(self.make_key(key, version)) is not _MISSING:
+            return True
+
+        return self.shared.has_key(key, version=version)
+
+    def delete(self, key, version=None):
+        self._delete_local(self.make_key(key, version))
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._delete_local(self.make_key(key, version))
+
+        self.shared.delete_many(keys, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+
+        # Clearing a Redis cache flushes the whole database, including entries
+        # of other caches that share it, so only delete our own keys.
+        if hasattr(self.shared, "delete_pattern"):
+            self.shared.delete_pattern("*")
+        else:
+            self.shared.clear()
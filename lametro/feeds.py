@@ -1,6 +1,11 @@
 from councilmatic_core.feeds import PersonDetailFeed
+from django.utils.decorators import method_decorator
 
 from lametro.models import LAMetroPerson
+from lametro.services.last_modified_service import (
+    LastModifiedService,
+    conditional_page,
+)
 
 
 class LAMetroPersonDetailFeed(PersonDetailFeed):
@@ -11,17 +16,14 @@ class LAMetroPersonDetailFeed(PersonDetailFeed):
 
     model = LAMetroPerson
 
+    @method_decorator(conditional_page(LastModifiedService.person))
+    def __call__(self, request, *args, **kwargs):
+        return super().__call__(request, *args, **kwargs)
+
     def get_object(self, request, slug):
         o = LAMetroPerson.objects.get(slug=slug)
 
         return o
 
     def items(self, person):
-        person.committee_sponsorships
-
-        if person.committee_sponsorships:
-            recent_sponsored_bills = person.committee_sponsorships
-        else:
-            recent_sponsored_bills = []
-
-        return recent_sponsored_bills
+        return list(person.committee_sponsorships)
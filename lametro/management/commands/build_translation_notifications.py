@@ -86,22 +86,30 @@ class Command(BaseCommand):
             .distinct()
         )
 
+        # Evaluate each queryset once
+        bills = list(bills)
+        events = list(events)
+
         if not bills and not events:
             logger.info("~~ All document notifications up to date! ~~")
             return
         logger.info(f"Checking {len(bills)} bills and {len(events)} events...")
 
         # Create new notifications
-        bill_notifications = self.create_notifications(bills)
-        event_notifications = self.create_notifications(events)
+        bill_notifications = self.create_notifications(
+            "bill", bills, BillService.build_bills_document_details(bills)
+        )
+        event_notifications = self.create_notifications(
+            "event", events, EventService.build_events_document_details(events)
+        )
 
         if not bill_notifications and not event_notifications:
             logger.info("No related documents found for selected bills and events")
             return
 
         logger.info(
-            f"Created notifications for {len(bill_notifications or [])} bills "
-            f"and {len(event_notifications or [])} events."
+            f"Created notifications for {len(bill_notifications)} bills "
+            f"and {len(event_notifications)} events."
         )
 
         # Clean up previously failed notifications for these entities
@@ -114,39 +122,23 @@ class Command(BaseCommand):
 
         logger.info("~~ Finished building notifications! ~~")
 
-    def create_notifications(self, qs):
+    def create_notifications(self, entity_type, entities, details):
         """
-        Create a notification object for each entity in the queryset if that entity
-        has relevant related documents. If an entity has no documents to report on,
-        a notification will not be made.
+        Create a notification object for each entity with details, i.e., each
+        entity that has relevant related documents. If an entity has no
+        documents to report on, a notification will not be made.
         """
+        notifications_to_create = [
+            TranslationNotification(
+                entity_type=entity_type,
+                data=details[entity.pk],
+                **{entity_type: entity},
+            )
+            for entity in entities
+            if entity.pk in details
+        ]
 
-        # Determine which entity type this queryset is for, and choose the right builder
-        if not qs:
-            return
-        elif qs.model is LAMetroBill:
-            entity_type = "bill"
-            detail_builder = BillService.build_bill_document_details
-        else:
-            entity_type = "event"
-            detail_builder = EventService.build_event_document_details
-
-        # Create notifications
-        notifications_to_create = []
-        for current_entity in qs:
-            entity_details = detail_builder(current_entity)
-            if not entity_details:
-                continue
-
-            data_kwargs = {
-                "entity_type": entity_type,
-                entity_type: current_entity,
-                "data": entity_details,
-            }
-            notifications_to_create.append(TranslationNotification(**data_kwargs))
-
-        notifications = TranslationNotification.objects.bulk_create(
-            notifications_to_create
-        )
+        if not notifications_to_create:
+            return []
 
-        return notifications
+        return TranslationNotification.objects.bulk_create(notifications_to_create)
@@ -49,10 +49,7 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         update_token = options.get("update_token")
         force_var_update = options.get("force_var_update")
-        smartlogic = SmartLogic(settings.SMART_LOGIC_KEY)
-        smartlogic._authorization = "Bearer {}".format(
-            smartlogic.token()["access_token"]
-        )
+        smartlogic = SmartLogic(settings.SMART_LOGIC_KEY).authenticate()
         api_key = smartlogic.get_api_key_details()
         expiration_dt = datetime.strptime(api_key["expiryDate"], "%Y-%m-%dT%H:%M:%SZ")
         two_weeks_before_exp = expiration_dt - timedelta(weeks=2)
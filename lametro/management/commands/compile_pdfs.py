@@ -1,12 +1,23 @@
+import logging
+
 from django.core.management.base import BaseCommand
 from django.db.models import F
 
 from lametro.models import LAMetroBill, BillPacket, LAMetroEvent, EventPacket
+from lametro.services.packet_service import PacketService
+
 
-import tqdm
+logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
+    """
+    Request PDF packets of new and changed events and board reports from the
+    metro-pdf-merger. The files of every packet are looked up together, and
+    several packets are requested at once. Run probe_packets afterward to mark
+    packets ready once the merger has written them.
+    """
+
     help = "This command compiles PDF packets for LA Metro events and board reports."
 
     def add_arguments(self, parser):
@@ -47,15 +58,11 @@ class Command(BaseCommand):
             self._compile_board_reports()
 
     def _compile_events(self):
-        events = self._events_to_compile()
+        events = list(self._events_to_compile())
+        files = PacketService.event_files([event.pk for event in events])
 
-        for event in tqdm.tqdm(events, desc="Events"):
-            event_packet, created = EventPacket.objects.get_or_create(event=event)
-            # The docs in an event packet are updated on save.
-            # if the doc was just created, it was also saved so
-            # only save if the packet already existed
-            if not created:
-                event_packet.save(merge=self.merge)
+        packets = PacketService.compile(EventPacket, events, files, merge=self.merge)
+        logger.info(f"Compiled {len(packets)} of {len(events)} event packets")
 
     def _events_to_compile(self):
         events = (
@@ -105,16 +112,11 @@ class Command(BaseCommand):
         return events
 
     def _compile_board_reports(self):
-        bills = self._board_reports_to_compile()
-
-        for bill in tqdm.tqdm(bills, desc="Board Reports"):
-            bill_packet, created = BillPacket.objects.get_or_create(bill=bill)
+        bills = list(self._board_reports_to_compile())
+        files = PacketService.bill_files([bill.pk for bill in bills])
 
-            # The docs in a bill packet are updated on save.
-            # if the doc was just created, it was also saved so
-            # only call save here if the packet already existed
-            if not created:
-                bill_packet.save(merge=self.merge)
+        packets = PacketService.compile(BillPacket, bills, files, merge=self.merge)
+        logger.info(f"Compiled {len(packets)} of {len(bills)} board report packets")
 
     def _board_reports_to_compile(self):
         bills = (
@@ -0,0 +1,77 @@
+import logging
+
+from django.db import transaction
+from django.core.management.base import BaseCommand
+from haystack import connections as haystack_connections
+
+from lametro.models import LAMetroBill, QueuedBill
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Drain the queue of changed bills recorded by QueuedSignalProcessor. Queued
+    bills are updated in the search index, or removed from it if they've been
+    deleted or are no longer visible.
+    """
+
+    help = "Re-index the bills queued by changes since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Number of queued bills to index at a time.",
+        )
+
+        parser.add_argument(
+            "--using",
+            default="default",
+            help="Haystack connection to update.",
+        )
+
+    def handle(self, *args, **options):
+        backend = haystack_connections[options["using"]].get_backend()
+        index = (
+            haystack_connections[options["using"]]
+            .get_unified_index()
+            .get_index(LAMetroBill)
+        )
+
+        indexed = removed = 0
+
+        while True:
+            # Take a batch off the queue before indexing it, so that a bill
+            # queued again in the meantime is picked up by the next batch.
+            # Locked rows are skipped, so concurrent runs take different bills.
+            with transaction.atomic():
+                bill_ids = list(
+                    QueuedBill.objects.select_for_update(skip_locked=True)
+                    .order_by("queued_at")
+                    .values_list("bill_id", flat=True)[: options["batch_size"]]
+                )
+                QueuedBill.objects.filter(bill_id__in=bill_ids).delete()
+
+            if not bill_ids:
+                break
+
+            try:
+                bills = list(index.index_queryset().filter(pk__in=bill_ids))
+
+                if bills:
+                    backend.update(index, bills)
+
+                # Deleted bills, and bills that are no longer visible
+                for bill_id in set(bill_ids) - {bill.pk for bill in bills}:
+                    backend.remove(bill_id)
+                    removed += 1
+            except Exception:
+                QueuedBill.enqueue(bill_ids)
+                raise
+
+            indexed += len(bills)
+
+        logger.info(f"Indexed {indexed} queued bills and removed {removed}")
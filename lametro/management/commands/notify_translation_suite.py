@@ -1,11 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
-import requests
-from time import sleep
 
 from django.core.management.base import BaseCommand
-from django.conf import settings
 
 from lametro.models.legislative import TranslationNotification
+from lametro.services.translation_service import TranslationService
 
 
 logger = logging.getLogger(__name__)
@@ -22,9 +21,25 @@ class Command(BaseCommand):
         "information on each document that needs extraction/translation."
     )
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Number of notifications to send in each request.",
+        )
+
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of requests to send at once.",
+        )
+
     def handle(self, *args, **options):
         """
-        Send all waiting or failed notifications and update their statuses.
+        Send all waiting or failed notifications in chunks, several at a time,
+        and update the statuses of each chunk as it finishes.
 
         On success, mark as "delivered".
 
@@ -33,57 +48,60 @@ class Command(BaseCommand):
         clean up any failed notifications and make new ones next time it runs.
         """
 
-        notifications = TranslationNotification.objects.select_related(
-            "bill", "event"
-        ).filter(status__in=["waiting", "failed"])
+        notifications = list(
+            TranslationNotification.objects.filter(
+                status__in=["waiting", "failed"]
+            ).order_by("pk")
+        )
 
         if not notifications:
             logger.info("~~ No notifications are waiting to be delivered ~~")
             return
 
-        # Notify suite
-        logger.info(f"Sending {len(notifications)} notifications...")
-        document_details = [n.data for n in notifications]
-        url = f"https://{settings.TRANSLATION_SUITE_URL}/api/update-documents/"
-        data = {"api_key": settings.TRANSLATION_API_KEY, "documents": document_details}
-
-        was_successful = False
-        attempt_limit = 3
-        attempt_num = 0
-        delay_seconds = 30
-        while attempt_num < attempt_limit:
-            response = requests.post(
-                url, json=data, headers={"Content-type": "application/json"}
-            )
-            logger.info(
-                f"Translation suite returned status code: {response.status_code}"
+        batch_size = options["batch_size"]
+        chunks = [
+            notifications[i : i + batch_size]
+            for i in range(0, len(notifications), batch_size)
+        ]
+
+        logger.info(
+            f"Sending {len(notifications)} notifications in {len(chunks)} chunks..."
+        )
+
+        delivered_count = failed_count = 0
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            futures = {
+                executor.submit(TranslationService.deliver, chunk): chunk
+                for chunk in chunks
+            }
+
+            # Statuses are saved from this thread, as each chunk finishes
+            for future in as_completed(futures):
+                try:
+                    delivered, failed = future.result()
+                except Exception:
+                    logger.exception("Could not deliver a chunk of notifications")
+                    delivered, failed = [], futures[future]
+
+                for notification in delivered:
+                    notification.status = "delivered"
+
+                for notification in failed:
+                    notification.status = "failed"
+
+                TranslationNotification.objects.bulk_update(
+                    delivered + failed, ["status"]
+                )
+                TranslationService.invalidate_files(delivered)
+
+                delivered_count += len(delivered)
+                failed_count += len(failed)
+
+        if failed_count:
+            logger.warning(
+                f"~~ Delivered {delivered_count} notifications, "
+                f"and {failed_count} failed ~~"
             )
-
-            # Stop the loop if successful
-            if was_successful := str(response.status_code).startswith("20"):
-                logger.info(f"Success: {response.json()}")
-                break
-
-            # Wait and try again, if under our attempt limit
-            attempt_num += 1
-            try:
-                logger.warning(f"Failed: {response.json()}")
-            except requests.exceptions.JSONDecodeError:
-                logger.warning(f"Failed: {response.reason}")
-
-            if attempt_num < attempt_limit:
-                logger.warning(f"Trying again in {delay_seconds} seconds...")
-                sleep(delay_seconds)
-                delay_seconds *= 2
-
-        # Update notifications
-        if was_successful:
-            for notif in notifications:
-                notif.status = "delivered"
-            logger.info("~~ Notifications delivered and updated! ~~")
         else:
-            for notif in notifications:
-                notif.status = "failed"
-            logger.warning(f"~~ Notifications failed after {attempt_limit} attempts ~~")
-
-        TranslationNotification.objects.bulk_update(notifications, ["status"])
+            logger.info("~~ Notifications delivered and updated! ~~")
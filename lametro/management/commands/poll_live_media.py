@@ -0,0 +1,57 @@
+import logging
+from time import sleep
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from lametro.services.live_media_service import LiveMediaService
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Keep a snapshot of running Granicus events and valid live media URLs in the
+    "live_media" cache, so the site never has to contact Granicus while
+    rendering a page.
+    """
+
+    help = (
+        "Poll Granicus for running events and live media, and store the results "
+        "for the site to read."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=settings.LIVE_MEDIA_POLL_INTERVAL,
+            help="Seconds to wait between polls.",
+        )
+
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Poll a single time and exit, rather than running continuously.",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+
+        while True:
+            try:
+                running_events = LiveMediaService.poll()
+            except Exception as e:
+                # Keep polling through transient database errors. The previous
+                # snapshot expires on its own if polling keeps failing.
+                if options["once"]:
+                    raise
+                logger.exception(e)
+            else:
+                logger.info(f"Found {len(running_events)} running events")
+
+            if options["once"]:
+                break
+
+            sleep(interval)
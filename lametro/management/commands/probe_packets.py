@@ -0,0 +1,24 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from lametro.models import BillPacket, EventPacket
+from lametro.services.packet_service import PacketService
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Mark packets ready once the metro-pdf-merger has written them, so that
+    pages link to them. Pages never contact the merger's bucket themselves.
+    Run it on a schedule, e.g., every few minutes.
+    """
+
+    help = "Mark requested PDF packets that have been written as ready."
+
+    def handle(self, *args, **options):
+        for packet_model in (BillPacket, EventPacket):
+            ready = PacketService.probe(packet_model)
+            logger.info(f"Marked {ready} {packet_model.__name__} objects ready")
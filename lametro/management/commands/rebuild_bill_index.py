@@ -0,0 +1,262 @@
+from datetime import datetime, timedelta
+import json
+import logging
+from multiprocessing import Pool
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from haystack import connections as haystack_connections
+
+from lametro.models import LAMetroBill
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT = os.path.join(
+    tempfile.gettempdir(), "lametro_bill_index_checkpoint.json"
+)
+
+
+def parse_since(value):
+    """
+    Accept either a number of hours, e.g., "2", or an ISO date or datetime.
+    """
+    if value.isdigit():
+        return timezone.now() - timedelta(hours=int(value))
+
+    since = parse_datetime(value)
+
+    if since is None and (date := parse_date(value)):
+        since = datetime(date.year, date.month, date.day)
+
+    if since is None:
+        raise ValueError(f"Could not parse {value!r} as a number of hours or date")
+
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+
+    return since
+
+
+def index_range(args):
+    """
+    Prepare and bulk send the bills in one primary key range. Runs in a worker
+    process, so it looks up its own search backend and index.
+    """
+    position, (first_pk, last_pk), since, using = args
+    start = time.monotonic()
+
+    backend = haystack_connections[using].get_backend()
+    index = haystack_connections[using].get_unified_index().get_index(LAMetroBill)
+
+    bills = list(
+        index.build_queryset(using=using, start_date=since).filter(
+            pk__gte=first_pk, pk__lte=last_pk
+        )
+    )
+
+    if bills:
+        backend.update(index, bills, commit=False)
+
+    return position, len(bills), time.monotonic() - start
+
+
+def init_worker(using):
+    # Connections can't be shared with the parent process
+    connections.close_all()
+    haystack_connections[using].reset_sessions()
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the LAMetroBill search index in parallel. The bills are split into
+    primary key ranges, which are indexed by a pool of worker processes.
+    Finished ranges are recorded in a checkpoint file, so an interrupted run
+    can pick up where it left off with --resume. Full rebuilds then remove the
+    bills that are no longer indexable.
+    """
+
+    help = "Rebuild the bill search index in parallel, resumable batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of worker processes.",
+        )
+
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of bills in each primary key range.",
+        )
+
+        parser.add_argument(
+            "--since",
+            type=parse_since,
+            default=None,
+            help=(
+                "Only index bills updated since this many hours ago, or since "
+                "an ISO date or datetime."
+            ),
+        )
+
+        parser.add_argument(
+            "--checkpoint",
+            default=DEFAULT_CHECKPOINT,
+            help="Path of the file used to record finished ranges.",
+        )
+
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue the run recorded in the checkpoint file.",
+        )
+
+        parser.add_argument(
+            "--using",
+            default="default",
+            help="Haystack connection to update.",
+        )
+
+    def handle(self, *args, **options):
+        self.checkpoint_path = options["checkpoint"]
+        using = options["using"]
+
+        if options["resume"]:
+            checkpoint = self.load_checkpoint()
+        else:
+            checkpoint = self.new_checkpoint(
+                options["since"], options["batch_size"], using
+            )
+
+        since = parse_datetime(checkpoint["since"]) if checkpoint["since"] else None
+        completed = set(checkpoint["completed"])
+        remaining = [
+            (position, pk_range, since, using)
+            for position, pk_range in enumerate(checkpoint["ranges"])
+            if position not in completed
+        ]
+
+        logger.info(
+            f"Indexing {len(remaining)} of {len(checkpoint['ranges'])} ranges "
+            f"with {options['workers']} workers"
+        )
+
+        start = time.monotonic()
+        indexed = 0
+
+        try:
+            for position, count, elapsed in self.run(
+                remaining, options["workers"], using
+            ):
+                completed.add(position)
+                checkpoint["completed"] = sorted(completed)
+                self.save_checkpoint(checkpoint)
+
+                indexed += count
+                rate = indexed / (time.monotonic() - start)
+
+                logger.info(
+                    f"Indexed range {position + 1} ({count} bills in {elapsed:.1f}s). "
+                    f"{len(completed)}/{len(checkpoint['ranges'])} ranges complete, "
+                    f"{indexed} bills at {rate:.1f} bills/s"
+                )
+        except Exception as e:
+            raise CommandError(
+                f"Indexing failed: {e}. Run again with --resume to continue."
+            ) from e
+
+        # Bills are only added or updated above. On a full rebuild, also
+        # remove bills that have been deleted or hidden since they were indexed.
+        removed = 0 if since else self.remove_stale(using)
+
+        backend = haystack_connections[using].get_backend()
+        backend.conn.indices.refresh(index=backend.index_name)
+
+        os.remove(self.checkpoint_path)
+
+        logger.info(
+            f"Indexed {indexed} bills and removed {removed} in "
+            f"{time.monotonic() - start:.1f}s"
+        )
+
+    def remove_stale(self, using):
+        backend = haystack_connections[using].get_backend()
+        index = haystack_connections[using].get_unified_index().get_index(LAMetroBill)
+
+        current_ids = set(
+            index.index_queryset(using=using)
+            .prefetch_related(None)
+            .values_list("pk", flat=True)
+        )
+        stale_ids = [
+            bill_id
+            for bill_id in backend.indexed_ids(LAMetroBill)
+            if bill_id not in current_ids
+        ]
+
+        for bill_id in stale_ids:
+            backend.remove(bill_id, commit=False)
+
+        return len(stale_ids)
+
+    def run(self, tasks, workers, using):
+        if workers <= 1:
+            yield from map(index_range, tasks)
+            return
+
+        connections.close_all()
+
+        with Pool(workers, initializer=init_worker, initargs=(using,)) as pool:
+            yield from pool.imap_unordered(index_range, tasks)
+
+    def new_checkpoint(self, since, batch_size, using):
+        index = haystack_connections[using].get_unified_index().get_index(LAMetroBill)
+
+        pks = list(
+            index.build_queryset(using=using, start_date=since)
+            .prefetch_related(None)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+        checkpoint = {
+            "since": since.isoformat() if since else None,
+            "ranges": [
+                (pks[i], pks[min(i + batch_size, len(pks)) - 1])
+                for i in range(0, len(pks), batch_size)
+            ],
+            "completed": [],
+        }
+
+        self.save_checkpoint(checkpoint)
+
+        return checkpoint
+
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise CommandError(
+                f"No checkpoint found at {self.checkpoint_path}. Run without "
+                "--resume to start a new rebuild."
+            )
+
+    def save_checkpoint(self, checkpoint):
+        # Write to a temporary file and rename it, so an interruption can't
+        # leave a partially written checkpoint behind.
+        tmp_path = f"{self.checkpoint_path}.tmp"
+
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f)
+
+        os.replace(tmp_path, self.checkpoint_path)
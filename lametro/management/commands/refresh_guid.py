@@ -8,6 +8,7 @@ from legistar.bills import LegistarAPIBillScraper
 from opencivicdata.legislative.models import Bill
 
 from lametro.models import LAMetroSubject
+from lametro.services.subject_service import SubjectService
 from smartlogic.client import SmartLogic
 
 
@@ -69,10 +70,7 @@ class ClassificationMixin:
     @property
     def smartlogic(self):
         if not hasattr(self, "_smartlogic"):
-            self._smartlogic = SmartLogic(settings.SMART_LOGIC_KEY)
-            self._smartlogic._authorization = "Bearer {}".format(
-                self._smartlogic.token()["access_token"]
-            )
+            self._smartlogic = SmartLogic(settings.SMART_LOGIC_KEY).authenticate()
         return self._smartlogic
 
     @property
@@ -160,6 +158,7 @@ class Command(BaseCommand, ClassificationMixin):
                 for_update.append(subject)
 
         LAMetroSubject.objects.bulk_update(for_update, ["guid", "classification"])
+        SubjectService.invalidate_guid_names()
 
         update_count = len(for_update)
         topic_count = LAMetroSubject.objects.count()
@@ -0,0 +1,23 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from lametro.models import BillLatestAction
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Recompute the stored latest action and inferred status of every bill. Run
+    it after each import.
+    """
+
+    help = "Recompute the latest action and status of every bill."
+
+    def handle(self, *args, **options):
+        BillLatestAction.refresh()
+        logger.info(
+            f"Stored latest actions for {BillLatestAction.objects.count()} bills"
+        )
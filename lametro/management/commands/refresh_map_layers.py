@@ -0,0 +1,28 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from lametro.models import MapLayer
+from lametro.services.person_service import PersonService
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the simplified GeoJSON layers of the board members map from the
+    current members of each post, and expire the district maps cached for
+    person pages. Run it after each import, and after importing shapes.
+    """
+
+    help = "Rebuild the GeoJSON layers of the board members map."
+
+    def handle(self, *args, **options):
+        # import_shapes updates shapes in bulk, without sending signals
+        PersonService.invalidate_district_geojson()
+
+        layers = MapLayer.refresh()
+
+        for name, layer in layers.items():
+            logger.info(f"Built the {name} layer ({len(layer.geojson)} bytes)")
@@ -0,0 +1,22 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from lametro.models import PersonRecentBill
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Recompute the bills most recently acted on by each person's committees,
+    which are shown on person pages and in their feeds. Run it after each
+    import, after refresh_visible_bills.
+    """
+
+    help = "Recompute the recent committee bills of every person."
+
+    def handle(self, *args, **options):
+        PersonRecentBill.refresh()
+        logger.info(f"Stored {PersonRecentBill.objects.count()} recent committee bills")
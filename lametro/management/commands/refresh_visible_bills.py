@@ -0,0 +1,21 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from lametro.models import VisibleBill
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Recompute the VisibleBill table, which determines the bills that can be
+    displayed in Councilmatic. Run it after each import.
+    """
+
+    help = "Recompute which bills can be displayed in Councilmatic."
+
+    def handle(self, *args, **options):
+        VisibleBill.refresh()
+        logger.info(f"{VisibleBill.objects.count()} bills are visible")
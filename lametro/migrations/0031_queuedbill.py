@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lametro", "0030_alter_committeedisplaysettings_hidden_committees"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QueuedBill",
+            fields=[
+                (
+                    "bill_id",
+                    models.CharField(max_length=100, primary_key=True, serialize=False),
+                ),
+                ("queued_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
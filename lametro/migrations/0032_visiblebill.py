@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lametro", "0031_queuedbill"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VisibleBill",
+            fields=[
+                (
+                    "bill_id",
+                    models.CharField(max_length=100, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lametro", "0032_visiblebill"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BillLatestAction",
+            fields=[
+                (
+                    "bill",
+                    models.OneToOneField(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="latest_action",
+                        serialize=False,
+                        to="lametro.lametrobill",
+                    ),
+                ),
+                ("description", models.TextField(blank=True)),
+                ("date", models.DateField(null=True)),
+                ("status", models.CharField(max_length=256, null=True)),
+            ],
+        ),
+    ]
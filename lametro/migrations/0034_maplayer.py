@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lametro", "0033_billlatestaction"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MapLayer",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=32, primary_key=True, serialize=False),
+                ),
+                ("geojson", models.TextField()),
+                ("etag", models.CharField(max_length=64)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lametro", "0034_maplayer"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PersonRecentBill",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "bill",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="recent_committee_actions",
+                        to="lametro.lametrobill",
+                    ),
+                ),
+                (
+                    "person",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="recent_committee_bills",
+                        to="lametro.lametroperson",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("person", "bill")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="personrecentbill",
+            index=models.Index(
+                fields=["person", "-date"], name="person_recent_bill_idx"
+            ),
+        ),
+    ]
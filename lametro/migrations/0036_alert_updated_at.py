@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lametro", "0035_personrecentbill"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="alert",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
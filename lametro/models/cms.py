@@ -140,6 +140,7 @@ class Alert(models.Model):
     description = RichTextField()
     type = models.CharField(max_length=255, choices=TYPE_CHOICES)
     expiration = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     panels = [
         FieldPanel(
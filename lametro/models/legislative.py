@@ -1,28 +1,40 @@
+from collections import defaultdict
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
+import hashlib
 import json
 import logging
 import pytz
 
-import requests
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.db.models.expressions import RawSQL
 from django.utils.text import slugify
 from django.utils import timezone
 from django.utils.functional import cached_property
-from django.core.cache import cache
+from django.core.cache import caches
 from django.core.exceptions import ObjectDoesNotExist
 
-from django.db.models import Prefetch, Case, When, Value, Q, F, Subquery, OuterRef
-from django.db.models.functions import Now, Cast
+from django.db.models import (
+    Prefetch,
+    Case,
+    When,
+    Value,
+    Q,
+    F,
+    Exists,
+    Max,
+    OuterRef,
+)
+from django.db.models.functions import Now, TruncDate
 from opencivicdata.legislative.models import (
+    EventDocument,
     EventMedia,
+    EventParticipant,
     EventAgendaItem,
     EventRelatedEntity,
     RelatedBill,
     BillVersion,
-    BillAction,
 )
 from proxy_overrides.related import ProxyForeignKey
 
@@ -33,15 +45,11 @@ from councilmatic_core.models import (
     Person,
     Organization,
     EventManager,
+    BillAction as CoreBillAction,
     Membership as CoreMembership,
 )
 
-from lametro.utils import (
-    format_full_text,
-    parse_subject,
-    timed_get,
-    LAMetroRequestTimeoutException,
-)
+from lametro.utils import format_full_text, parse_subject
 from councilmatic.settings_jurisdiction import BILL_STATUS_DESCRIPTIONS, MEMBER_BIOS
 
 
@@ -68,76 +76,25 @@ class SourcesMixin(object):
 class LAMetroBillManager(models.Manager):
     def get_queryset(self):
         """
-        The Councilmatic database contains both "private" and "public" bills.
-        This issue thread explains why:
-        https://github.com/datamade/la-metro-councilmatic/issues/345#issuecomment-455683240
-
-        We do not display "private" bills in Councilmatic.
-        Metro staff devised three checks for knowing when to hide or show a report:
-
-        (1) Is the bill private (i.e., `restrict_view` is True)? Then, do not show it.
-        N.b., the scrapers contain logic for populating the restrict_view field.
-
-        (2) Does the Bill have a classification of "Board Box" or "Board
-        Correspondence"? Then, show it.
-
-        (3) Is the Bill on a published agenda, i.e., an event with the
-        status of "passed" or "cancelled"? Then, show it.
-
-        (4) Sometimes motions are made during meetings that were not submitted
-        in advance, i.e., they do not appear on the published agenda. They will
-        be entered as matter history, which we translate to bill actions. Does
-        the bill have any associated actions? Then, show it.
-        https://github.com/datamade/la-metro-councilmatic/issues/477
+        Only return bills that can be displayed in Councilmatic, i.e., bills in
+        the VisibleBill table. See VisibleBill.visible for the rules.
 
-        NOTE! A single bill can appear on multiple event agendas. We thus call
-        'distinct' on the below query, otherwise the queryset would contain
-        duplicate bills.
+        Private bills are also excluded here, rather than only when the table is
+        refreshed, so a bill the scrapers make private is hidden right away.
 
         WARNING! Be sure to use LAMetroBill, rather than the base Bill class,
         when getting bill querysets. Otherwise restricted view bills
         may slip through the crevices of Councilmatic display logic.
         """
         qs = super().get_queryset()
-
-        on_published_agenda = Q(
-            eventrelatedentity__agenda_item__event__status="passed"
-        ) | Q(eventrelatedentity__agenda_item__event__status="cancelled")
-        is_board_box = Q(board_box=True)
-        has_minutes_history = Q(actions__isnull=False) & Q(
-            extras__local_classification="Motion / Motion Response"
-        )
-
-        qs = (
-            qs.exclude(extras__restrict_view=True)
-            .annotate(
-                board_box=Case(
-                    When(
-                        extras__local_classification__in=(
-                            "Board Box",
-                            "Board Correspondence",
-                        ),
-                        then=True,
-                    ),
-                    When(classification__contains=["Board Box"], then=True),
-                    When(classification__contains=["Board Correspondence"], then=True),
-                    default=False,
-                    output_field=models.BooleanField(),
-                )
-            )
-            .filter(on_published_agenda | is_board_box | has_minutes_history)
-            .distinct()
+        return qs.exclude(extras__restrict_view=True).filter(
+            pk__in=VisibleBill.objects.values("bill_id")
         )
 
-        return qs
-
     def with_latest_actions(self):
-        latest_action = BillAction.objects.filter(bill=OuterRef("pk")).order_by(
-            "-order"
-        )
-
         qs = self.annotate(
-            last_action_description=Subquery(latest_action.values("description")[:1])
+            last_action_description=F("latest_action__description"),
+            last_action_status=F("latest_action__status"),
         )
 
         return qs
@@ -166,21 +123,33 @@ class LAMetroBill(Bill, SourcesMixin):
 
         return "{0} - {1}".format(self.identifier, title.upper())
 
-    # LA METRO CUSTOMIZATION
     @property
-    def inferred_status(self):
+    def latest_action_description(self):
+        try:
+            return self.latest_action.description
+        except BillLatestAction.DoesNotExist:
+            # Not yet stored, so fall back to the actions themselves
+            pass
+
         # Get most recent action.
         action = self.actions.last()
 
         # Get description of that action.
         if action:
-            description = action.description
-        else:
-            description = ""
+            return action.description
 
-        return self._status(description)
+        return ""
+
+    # LA METRO CUSTOMIZATION
+    @property
+    def inferred_status(self):
+        try:
+            return self.latest_action.status
+        except BillLatestAction.DoesNotExist:
+            return self._status(self.latest_action_description)
 
-    def _status(self, description):
+    @staticmethod
+    def _status(description):
         if description and description.upper() in BILL_STATUS_DESCRIPTIONS.keys():
             return BILL_STATUS_DESCRIPTIONS[description.upper()]["search_term"]
         return None
@@ -225,72 +194,140 @@ class LAMetroBill(Bill, SourcesMixin):
             'organization': <Organization>
         }
         """
-        actions = self.actions.all()
-        events = LAMetroEvent.objects.filter(agenda__related_entities__bill=self)
+        return self.actions_and_agendas_for_bills([self])[self.pk]
+
+    @classmethod
+    def actions_and_agendas_for_bills(cls, bills):
+        """
+        Return a dictionary mapping the primary key of each of the given bills
+        to its actions_and_agendas, using a constant number of queries no matter
+        how many bills or actions there are.
+        """
+        bills = {bill.pk: bill for bill in bills}
+        data = {bill_id: [] for bill_id in bills}
+
+        if not bills:
+            return data
 
-        data = []
+        actions = list(
+            CoreBillAction.objects.filter(bill_id__in=bills).select_related(
+                "organization"
+            )
+        )
+
+        # Find every event held by an organization that took an action, on the
+        # date of one of those actions. The event's local date is compared, as
+        # with a start_time__date lookup.
+        action_events = (
+            LAMetroEvent.objects.filter(
+                participants__entity_type="organization",
+                participants__organization_id__in={a.organization_id for a in actions},
+            )
+            .annotate(
+                participant_organization_id=F("participants__organization_id"),
+                start_date_local=TruncDate("start_time"),
+            )
+            .filter(start_date_local__in={a.date_dt for a in actions})
+        )
+
+        events_by_org_and_date = {}
+
+        for event in action_events:
+            key = (event.participant_organization_id, event.start_date_local)
+            events_by_org_and_date.setdefault(key, []).append(event)
 
         for action in actions:
-            try:
-                event = LAMetroEvent.objects.get(
-                    participants__entity_type="organization",
-                    participants__organization=action.organization,
-                    start_time__date=action.date,
-                )
-            except LAMetroEvent.DoesNotExist:
+            events = events_by_org_and_date.get(
+                (action.organization_id, action.date_dt), []
+            )
+
+            if not events:
                 logger.warning(
                     "Could not find event corresponding to action on Board "
                     + "Report {0} by {1} on {2}".format(
-                        self.identifier, action.organization, action.date
+                        bills[action.bill_id].identifier,
+                        action.organization,
+                        action.date,
                     )
                 )
                 continue
 
-            action_dict = {
-                "date": action.date_dt,
-                "description": action.description,
-                "event": event,
-                "organization": action.organization,
-            }
+            elif len(events) > 1:
+                raise LAMetroEvent.MultipleObjectsReturned(
+                    "Found {0} events corresponding to action on Board Report "
+                    "{1} by {2} on {3}".format(
+                        len(events),
+                        bills[action.bill_id].identifier,
+                        action.organization,
+                        action.date,
+                    )
+                )
 
-            data.append(action_dict)
+            data[action.bill_id].append(
+                {
+                    "date": action.date_dt,
+                    "description": action.description,
+                    "event": events[0],
+                    "organization": action.organization,
+                }
+            )
 
-        for event in events:
-            try:
-                # Attempt to return Metro org object.
-                org = LAMetroOrganization.objects.get(
-                    id=event.participants.first().organization_id
+        agenda_events = list(
+            LAMetroEvent.objects.filter(agenda__related_entities__bill_id__in=bills)
+            .annotate(related_bill_id=F("agenda__related_entities__bill_id"))
+            .prefetch_related(
+                Prefetch(
+                    "participants",
+                    queryset=EventParticipant.objects.order_by("pk"),
+                    to_attr="ordered_participants",
                 )
-            except LAMetroOrganization.DoesNotExist:
-                # If a corresponding org does not exist, e.g., in the case of
-                # appearing on the agenda of a public hearing, return the event
-                # participant object.
-                org = event.participants.first()
-
-            event_dict = {
-                "date": event.start_time.date(),
-                "description": "SCHEDULED",  # Use a description of "SCHEDULED"
-                "event": event,
-                "organization": org,
+            )
+        )
+
+        # Attempt to return Metro org objects. If a corresponding org does not
+        # exist, e.g., in the case of appearing on the agenda of a public
+        # hearing, return the event participant object.
+        organizations = LAMetroOrganization.objects.in_bulk(
+            {
+                event.ordered_participants[0].organization_id
+                for event in agenda_events
+                if event.ordered_participants
             }
+            - {None}
+        )
+
+        for event in agenda_events:
+            participant = (
+                event.ordered_participants[0] if event.ordered_participants else None
+            )
 
-            data.append(event_dict)
+            data[event.related_bill_id].append(
+                {
+                    "date": event.start_time.date(),
+                    "description": "SCHEDULED",  # Use a description of "SCHEDULED"
+                    "event": event,
+                    "organization": organizations.get(
+                        participant.organization_id, participant
+                    ),
+                }
+            )
 
         # Sort actions by date, and list SCHEDULED actions before other actions on that date
         # SCHEDULED descriptions are kept uppercase to use ascii-betical sorting
-        sorted_data = sorted(
-            data,
-            key=lambda x: (
-                x["date"],
-                (
-                    x["description"].upper()
-                    if x["description"] == "SCHEDULED"
-                    else x["description"].lower()
+        return {
+            bill_id: sorted(
+                bill_data,
+                key=lambda x: (
+                    x["date"],
+                    (
+                        x["description"].upper()
+                        if x["description"] == "SCHEDULED"
+                        else x["description"].lower()
+                    ),
                 ),
-            ),
-        )
-
-        return sorted_data
+            )
+            for bill_id, bill_data in data.items()
+        }
 
 
 class RelatedBillManager(models.Manager):
@@ -321,7 +358,16 @@ class LAMetroPost(Post):
     class Meta:
         proxy = True
 
-    def get_feature(self, membership=None):
+    def get_feature(self, membership=None, tolerance=None):
+        """
+        Return the post as a GeoJSON feature. If a tolerance is given, the
+        shape is simplified so no point moves by more than that many degrees.
+        """
+        shape = self.shape
+
+        if tolerance:
+            shape = shape.simplify(tolerance, preserve_topology=True)
+
         if membership:
             council_member = membership.person.name
             detail_link = membership.person.slug
@@ -332,7 +378,7 @@ class LAMetroPost(Post):
 
         return {
             "type": "Feature",
-            "geometry": json.loads(self.shape.json),
+            "geometry": json.loads(shape.json),
             "properties": {
                 "district": self.label,
                 "council_member": council_member,
@@ -365,7 +411,7 @@ class LAMetroPerson(Person, SourcesMixin):
     def slug_name(self):
         return slugify(self.name)
 
-    @property
+    @cached_property
     def latest_council_membership(self):
         filter_kwarg = {
             "organization__name": settings.OCD_CITY_COUNCIL_NAME,
@@ -385,9 +431,7 @@ class LAMetroPerson(Person, SourcesMixin):
             | Q(role="Nonvoting Board Member")
         )
 
-        if primary_memberships.exists():
-            return primary_memberships.order_by("-end_date").first()
-        return None
+        return primary_memberships.select_related("post").order_by("-end_date").first()
 
     @property
     def latest_committee_membership(self):
@@ -412,20 +456,21 @@ class LAMetroPerson(Person, SourcesMixin):
             return m.post.label
         return ""
 
+    BOARD_OFFICE_ROLES = (
+        "Chair",
+        "1st Chair",
+        "Vice Chair",
+        "1st Vice Chair",
+        "2nd Chair",
+        "2nd Vice Chair",
+    )
+
     @property
     def board_office(self):
-        office_roles = (
-            "Chair",
-            "1st Chair",
-            "Vice Chair",
-            "1st Vice Chair",
-            "2nd Chair",
-            "2nd Vice Chair",
-        )
-
         try:
             office_membership = self.current_memberships.get(
-                organization__name=settings.OCD_CITY_COUNCIL_NAME, role__in=office_roles
+                organization__name=settings.OCD_CITY_COUNCIL_NAME,
+                role__in=self.BOARD_OFFICE_ROLES,
             )
         except Membership.DoesNotExist:
             office_membership = None
@@ -438,16 +483,14 @@ class LAMetroPerson(Person, SourcesMixin):
         This property returns a list of five bills, which have recent actions
         from the organizations that the person has memberships in.
 
-        Organizations do not include the Board of Directors.
+        Organizations do not include the Board of Directors. The bills are
+        precomputed in PersonRecentBill.
         """
         qs = (
             LAMetroBill.objects.defer("extras")
-            .filter(
-                actions__organization__classification="committee",
-                actions__organization__memberships__in=self.current_memberships,
-            )
-            .order_by("-actions__date")
-            .distinct()[:5]
+            .select_related("latest_action")
+            .filter(recent_committee_actions__person=self)
+            .order_by("-recent_committee_actions__date", "id")
         )
 
         return qs
@@ -517,11 +560,59 @@ class LAMetroEventManager(EventManager):
             Prefetch("media", queryset=mediaqueryset)
         ).prefetch_related("media__links")
 
+    def for_listing(self):
+        """
+        Events with media, annotated with whether each one was updated in the
+        four days before it starts, for the updates_made template filter.
+        Computing this in SQL saves a query per event on the events page.
+        """
+        now = timezone.now()
+        update_window = timedelta(days=4)
+
+        return self.with_media().annotate(
+            has_agenda=Exists(
+                EventDocument.objects.filter(
+                    event_id=OuterRef("id"), note__icontains="agenda"
+                )
+            ),
+            recently_updated=Case(
+                When(
+                    has_agenda=True,
+                    start_time__gt=now,
+                    start_time__lte=now + update_window,
+                    updated_at__gte=F("start_time") - update_window,
+                    updated_at__lt=F("start_time"),
+                    then=Value(True),
+                ),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            ),
+        )
+
 
 class LiveMediaMixin(object):
+    """
+    Granicus is never contacted while rendering a page. Instead, the
+    poll_live_media management command periodically records which events are
+    running and which media URLs are valid in the "live_media" cache, and the
+    methods below read from that snapshot.
+    """
+
     BASE_MEDIA_URL = "http://metro.granicus.com/mediaplayer.php?"
     GENERIC_ENGLISH_MEDIA_URL = BASE_MEDIA_URL + "camera_id=3"
     GENERIC_SPANISH_MEDIA_URL = BASE_MEDIA_URL + "camera_id=2"
+    RUNNING_EVENTS_URL = "http://metro.granicus.com/running_events.php"
+
+    RUNNING_EVENTS_CACHE_KEY = "running_events"
+    VALID_MEDIA_CACHE_KEY = "valid_media:{guid}"
+
+    @staticmethod
+    def live_media_cache():
+        return caches["live_media"]
+
+    @classmethod
+    def media_url(cls, guid):
+        return cls.BASE_MEDIA_URL + "event_id={guid}".format(guid=guid)
 
     @property
     def bilingual(self):
@@ -533,20 +624,10 @@ class LiveMediaMixin(object):
         """
         return bool(self.extras.get("sap_guid"))
 
-    def _valid(self, media_url):
-        try:
-            response = timed_get(media_url)
-        except (LAMetroRequestTimeoutException, requests.Timeout):
-            return False
-
-        if (
-            response.ok
-            and "The event you selected is not currently in progress"
-            not in response.text
-        ):
-            return True
-        else:
-            return False
+    def _valid(self, guid):
+        return bool(
+            self.live_media_cache().get(self.VALID_MEDIA_CACHE_KEY.format(guid=guid))
+        )
 
     @property
     def english_live_media_url(self):
@@ -554,10 +635,9 @@ class LiveMediaMixin(object):
             return None
 
         guid = self.extras["guid"]
-        english_url = self.BASE_MEDIA_URL + "event_id={guid}".format(guid=guid)
 
-        if self._valid(english_url):
-            return english_url
+        if self._valid(guid):
+            return self.media_url(guid)
         else:
             return self.GENERIC_ENGLISH_MEDIA_URL
 
@@ -572,10 +652,9 @@ class LiveMediaMixin(object):
         """
         if self.bilingual:
             guid = self.extras["sap_guid"]
-            spanish_url = self.BASE_MEDIA_URL + "event_id={guid}".format(guid=guid)
 
-            if self._valid(spanish_url):
-                return spanish_url
+            if self._valid(guid):
+                return self.media_url(guid)
             else:
                 return self.GENERIC_SPANISH_MEDIA_URL
 
@@ -695,39 +774,20 @@ class LAMetroEvent(Event, LiveMediaMixin, SourcesMixin):
         GUIDs appear when an event is live: one for the English audio, and one
         for the Spanish audio.
 
-        Hit the endpoint, and return the corresponding meeting, or an empty
-        queryset.
+        The poll_live_media command stores the GUIDs returned by that endpoint.
+        Return the corresponding meeting, or an empty queryset if the snapshot
+        is empty or has expired.
         """
-        running_events = cache.get("running_events")
-        if not running_events:
-            try:
-                running_events = timed_get(
-                    "http://metro.granicus.com/running_events.php"
-                )
-
-            except (LAMetroRequestTimeoutException, requests.RequestException) as e:
-                logger.warning(e)
-                running_events = cls.objects.none()
-                return running_events
+        running_events = cls.live_media_cache().get(cls.RUNNING_EVENTS_CACHE_KEY, [])
 
-            finally:
-                # Cache running events for one minute
-                cache.set("running_events", running_events, 60)
+        for guid in running_events:
+            # We get back two GUIDs, but we won't know which is the English
+            # audio GUID stored in the 'guid' field of the extras dict. Thus,
+            # we iterate.
+            meeting = cls.objects.filter(extras__guid=guid)
 
-        if running_events.status_code == 200:
-            for guid in running_events.json():
-                # We get back two GUIDs, but we won't know which is the English
-                # audio GUID stored in the 'guid' field of the extras dict. Thus,
-                # we iterate.
-                #
-                # Note that our stored GUIDs are all uppercase, because they come
-                # that way from the Legistar API. The running events endpoint
-                # returns all-lowercase GUIDs, so we need to uppercase them for
-                # comparison.
-                meeting = cls.objects.filter(extras__guid=guid.upper())
-
-                if meeting:
-                    return meeting
+            if meeting:
+                return meeting
 
         return cls.objects.none()
 
@@ -1056,6 +1116,12 @@ class Membership(CoreMembership):
 
 
 class Packet(models.Model):
+    """
+    A PDF combining an entity's documents, built by the metro-pdf-merger and
+    written to MERGE_HOST. Packets are requested by compile_pdfs, and marked
+    ready by probe_packets once the merged PDF exists. See PacketService.
+    """
+
     class Meta:
         abstract = True
 
@@ -1063,79 +1129,25 @@ class Packet(models.Model):
     url = models.URLField()
     ready = models.BooleanField(default=False)
 
-    @property
-    def related_entity(self):
-        raise NotImplementedError()
-
-    @property
-    def related_files(self):
-        raise NotImplementedError()
-
-    def save(self, *args, merge=True, **kwargs):
-        if merge:
-            self._merge_docs()
+    # The name of the field linking the packet to its bill or event
+    entity_field = None
 
+    @staticmethod
+    def packet_url(slug):
         # MERGE_HOST contains a trailing slash
-        self.url = "{host}{slug}.pdf".format(
-            host=settings.MERGE_HOST, slug=self.related_entity.slug
-        )
+        return "{host}{slug}.pdf".format(host=settings.MERGE_HOST, slug=slug)
 
+    def save(self, *args, **kwargs):
+        self.url = self.packet_url(getattr(self, self.entity_field).slug)
         super().save(*args, **kwargs)
 
-    def is_ready(self):
-        if not self.ready:
-            response = requests.head(self.url)
-            if response.status_code == 200:
-                self.ready = True
-                super().save()
-
-        return self.ready
-
-    def _merge_docs(self):
-        data = {
-            "run_id": "merge_{0}_{1}".format(
-                self.related_entity.slug, datetime.now().isoformat()
-            ),
-            "conf": {
-                "identifier": self.related_entity.slug,
-                "attachment_links": self.related_files,
-            },
-            "replace_microseconds": "false",
-        }
-
-        requests.post(settings.MERGE_ENDPOINT, json=data)
-
 
 class BillPacket(Packet):
     bill = models.OneToOneField(
         LAMetroBill, related_name="packet", on_delete=models.CASCADE
     )
 
-    @property
-    def related_entity(self):
-        return self.bill
-
-    @property
-    def related_files(self):
-        board_report = self.bill.versions.get()
-
-        attachments = self.bill.documents.annotate(
-            index=Case(
-                When(note__istartswith="0", then=Value("z")),
-                default=F("note"),
-                output_field=models.CharField(),
-            )
-        ).order_by("index")
-
-        doc_links = [board_report.links.get().url]
-
-        # sometimes there is more than one url for the same document name
-        # https://metro.legistar.com/LegislationDetail.aspx?ID=3104422&GUID=C30D3376-7265-477B-AFFA-815270400538%3e%5d%3e
-        # I'm not sure if this a data problem or not, so we'll just
-        # add all the doc links
-        doc_links += [link.url for doc in attachments for link in doc.links.all()]
-
-        return doc_links
+    entity_field = "bill"
 
 
 class EventPacket(Packet):
@@ -1143,42 +1155,7 @@ class EventPacket(Packet):
         LAMetroEvent, related_name="packet", on_delete=models.CASCADE
     )
 
-    @property
-    def related_entity(self):
-        return self.event
-
-    @property
-    def related_files(self):
-        agenda_doc = self.event.documents.get(note="Agenda")
-
-        related = [agenda_doc.links.get().url]
-
-        agenda_items = (
-            self.event.agenda.filter(related_entities__bill__documents__isnull=False)
-            .annotate(int_order=Cast("order", models.IntegerField()))
-            .order_by("int_order")
-            .distinct()
-        )
-
-        for item in agenda_items:
-            for entity in item.related_entities.filter(bill__isnull=False):
-                try:
-                    related_bill = entity.bill
-                except LAMetroBill.DoesNotExist:
-                    # We configure event agenda items to return LAMetroBill
-                    # objects. Sometimes, agenda items concern bills that do
-                    # not meet criteria for display, e.g., the bill is private
-                    # or it does not appear on a published agenda. (See the
-                    # LAMetroBill manager for an exhaustive list of display
-                    # criteria.) In this case, trying to access the bill via
-                    # the event agenda item will raise this exception. Skip
-                    # adding those documents to the event packet.
-                    continue
-                else:
-                    bill_packet = BillPacket(bill=related_bill)
-                    related.extend(bill_packet.related_files)
-
-        return related
+    entity_field = "event"
 
 
 class LAMetroSubject(models.Model):
@@ -1255,3 +1232,387 @@ class TranslationNotification(models.Model):
                 name="only_one_entity",
             )
         ]
+
+
+class QueuedBill(models.Model):
+    """
+    A bill waiting to be re-indexed, recorded by QueuedSignalProcessor when the
+    bill or one of its related objects changes. The bill ID isn't a foreign key,
+    so that deleted bills can be queued for removal from the index.
+    """
+
+    bill_id = models.CharField(max_length=100, primary_key=True)
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def enqueue(cls, bill_ids):
+        """
+        Queue the given bills, ignoring any that are already queued.
+        """
+        cls.objects.bulk_create(
+            [cls(bill_id=bill_id) for bill_id in set(bill_ids)],
+            ignore_conflicts=True,
+        )
+
+
+class VisibleBill(models.Model):
+    """
+    The IDs of bills that can be displayed in Councilmatic, which
+    LAMetroBillManager filters on. Kept up to date by the signal handlers in
+    lametro.signals.handlers, and rebuilt by the refresh_visible_bills command
+    after each import.
+    """
+
+    bill_id = models.CharField(max_length=100, primary_key=True)
+
+    @staticmethod
+    def visible(queryset):
+        """
+        The Councilmatic database contains both "private" and "public" bills.
+        This issue thread explains why:
+        https://github.com/datamade/la-metro-councilmatic/issues/345#issuecomment-455683240
+
+        We do not display "private" bills in Councilmatic.
+        Metro staff devised three checks for knowing when to hide or show a report:
+
+        (1) Is the bill private (i.e., `restrict_view` is True)? Then, do not show it.
+        N.b., the scrapers contain logic for populating the restrict_view field.
+
+        (2) Does the Bill have a classification of "Board Box" or "Board
+        Correspondence"? Then, show it.
+
+        (3) Is the Bill on a published agenda, i.e., an event with the
+        status of "passed" or "cancelled"? Then, show it.
+
+        (4) Sometimes motions are made during meetings that were not submitted
+        in advance, i.e., they do not appear on the published agenda. They will
+        be entered as matter history, which we translate to bill actions. Does
+        the bill have any associated actions? Then, show it.
+        https://github.com/datamade/la-metro-councilmatic/issues/477
+
+        NOTE! A single bill can appear on multiple event agendas. We thus call
+        'distinct' on the below query, otherwise the queryset would contain
+        duplicate bills.
+        """
+        on_published_agenda = Q(
+            eventrelatedentity__agenda_item__event__status="passed"
+        ) | Q(eventrelatedentity__agenda_item__event__status="cancelled")
+        is_board_box = Q(board_box=True)
+        has_minutes_history = Q(actions__isnull=False) & Q(
+            extras__local_classification="Motion / Motion Response"
+        )
+
+        return (
+            queryset.exclude(extras__restrict_view=True)
+            .annotate(
+                board_box=Case(
+                    When(
+                        extras__local_classification__in=(
+                            "Board Box",
+                            "Board Correspondence",
+                        ),
+                        then=True,
+                    ),
+                    When(classification__contains=["Board Box"], then=True),
+                    When(classification__contains=["Board Correspondence"], then=True),
+                    default=False,
+                    output_field=models.BooleanField(),
+                )
+            )
+            .filter(on_published_agenda | is_board_box | has_minutes_history)
+            .distinct()
+        )
+
+    @classmethod
+    def refresh(cls, bill_ids=None):
+        """
+        Recompute the visibility of the given bills, or of all bills if none
+        are given.
+        """
+        bills = Bill.objects.all()
+        rows = cls.objects.all()
+
+        if bill_ids is not None:
+            bills = bills.filter(pk__in=bill_ids)
+            rows = rows.filter(bill_id__in=bill_ids)
+
+        visible_bills = cls.visible(bills).values("pk")
+
+        with transaction.atomic():
+            rows.exclude(bill_id__in=visible_bills).delete()
+            cls.objects.bulk_create(
+                [cls(bill_id=bill["pk"]) for bill in visible_bills],
+                ignore_conflicts=True,
+                batch_size=1000,
+            )
+
+
+class BillLatestAction(models.Model):
+    """
+    The description, date and inferred status of each bill's latest action,
+    stored so that listings and the search index don't have to look up each
+    bill's actions. Kept up to date by the signal handlers in
+    lametro.signals.handlers, and rebuilt by the refresh_latest_actions
+    command after each import.
+    """
+
+    # Rows are replaced rather than cascaded, so don't constrain the bill
+    bill = models.OneToOneField(
+        LAMetroBill,
+        primary_key=True,
+        related_name="latest_action",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    description = models.TextField(blank=True)
+    date = models.DateField(null=True)
+    status = models.CharField(max_length=256, null=True)
+
+    @classmethod
+    def refresh(cls, bill_ids=None):
+        """
+        Recompute the latest action of the given bills, or of all bills if
+        none are given.
+        """
+        bills = Bill.objects.all()
+
+        if bill_ids is not None:
+            bills = bills.filter(pk__in=bill_ids)
+
+        latest_actions = {
+            action.bill_id: action
+            for action in CoreBillAction.objects.filter(bill__in=bills)
+            .order_by("bill_id", "-order")
+            .distinct("bill_id")
+        }
+
+        rows = []
+
+        for bill_id in bills.values_list("pk", flat=True):
+            description = ""
+            date = None
+
+            if action := latest_actions.get(bill_id):
+                description = action.description
+                date = action.date_dt
+
+            rows.append(
+                cls(
+                    bill_id=bill_id,
+                    description=description,
+                    date=date,
+                    status=LAMetroBill._status(description),
+                )
+            )
+
+        with transaction.atomic():
+            stale = cls.objects.all()
+
+            if bill_ids is not None:
+                stale = stale.filter(bill_id__in=bill_ids)
+
+            stale.delete()
+            cls.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class MapLayer(models.Model):
+    """
+    A layer of the board members map, stored as simplified GeoJSON so the map
+    doesn't have to be built from every post's shape on each request. Rows are
+    deleted by the signal handlers in lametro.signals.handlers when posts or
+    memberships change, rebuilt on the next request, and rebuilt by the
+    refresh_map_layers command after each import.
+    """
+
+    DISTRICTS = "districts"
+    SECTORS = "sectors"
+    CITY = "city"
+    CALTRANS = "caltrans"
+
+    LAYERS = (DISTRICTS, SECTORS, CITY, CALTRANS)
+
+    name = models.CharField(max_length=32, primary_key=True)
+    geojson = models.TextField()
+    etag = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @staticmethod
+    def _layers_for_post(post):
+        layers = []
+
+        if "council_district" in post.division_id:
+            layers.append(MapLayer.DISTRICTS)
+
+        if "la_metro_sector" in post.division_id:
+            layers.append(MapLayer.SECTORS)
+
+        if post.division_id == "ocd-division/country:us/state:ca/place:los_angeles":
+            layers.append(MapLayer.CITY)
+
+        if "caltrans" in post.division_id:
+            layers.append(MapLayer.CALTRANS)
+
+        return layers
+
+    @classmethod
+    def refresh(cls):
+        """
+        Rebuild every layer from the current members of each post with a shape.
+        """
+        current_memberships = CoreMembership.objects.filter(
+            start_date_dt__lte=Now(), end_date_dt__gt=Now()
+        ).select_related("person")
+
+        posts = LAMetroPost.objects.filter(shape__isnull=False).prefetch_related(
+            Prefetch(
+                "memberships",
+                queryset=current_memberships,
+                to_attr="current_memberships",
+            )
+        )
+
+        features = {layer: [] for layer in cls.LAYERS}
+
+        for post in posts:
+            layers = cls._layers_for_post(post)
+
+            if not layers:
+                continue
+
+            for membership in post.current_memberships or [None]:
+                feature = post.get_feature(
+                    membership, tolerance=settings.MAP_SIMPLIFY_TOLERANCE
+                )
+
+                for layer in layers:
+                    features[layer].append(feature)
+
+        # Only show appointed Caltrans seats
+        features[cls.CALTRANS] = [
+            feature
+            for feature in features[cls.CALTRANS]
+            if feature["properties"]["council_member"] != "Vacant"
+        ]
+
+        layers = {}
+
+        # Concurrent requests may rebuild the layers at once, so each row is
+        # updated in place rather than deleted and inserted again
+        for layer in cls.LAYERS:
+            geojson = json.dumps(
+                {"type": "FeatureCollection", "features": features[layer]},
+                separators=(",", ":"),
+            )
+            layers[layer], _ = cls.objects.update_or_create(
+                name=layer,
+                defaults={
+                    "geojson": geojson,
+                    "etag": hashlib.sha256(geojson.encode()).hexdigest(),
+                },
+            )
+
+        return layers
+
+    @classmethod
+    def get(cls, name):
+        """
+        Return a layer, rebuilding the layers if they've been invalidated.
+        """
+        return cls.objects.filter(name=name).first() or cls.refresh()[name]
+
+    @classmethod
+    def current(cls):
+        """
+        Return the layers by name, rebuilding them if they've been invalidated.
+        """
+        layers = cls.objects.defer("geojson").in_bulk()
+
+        if len(layers) < len(cls.LAYERS):
+            layers = cls.refresh()
+
+        return layers
+
+
+class PersonRecentBill(models.Model):
+    """
+    The bills most recently acted on by the committees each person currently
+    sits on, and the date of each bill's latest action by those committees,
+    which LAMetroPerson.committee_sponsorships reads. Kept up to date by the
+    signal handlers in lametro.signals.handlers, and rebuilt by the
+    refresh_recent_committee_bills command after each import.
+    """
+
+    RECENT_BILLS = 5
+
+    # Rows are replaced rather than cascaded, so don't constrain the foreign keys
+    person = models.ForeignKey(
+        LAMetroPerson,
+        related_name="recent_committee_bills",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    bill = models.ForeignKey(
+        LAMetroBill,
+        related_name="recent_committee_actions",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    date = models.DateField()
+
+    class Meta:
+        unique_together = ("person", "bill")
+        indexes = [
+            models.Index(fields=["person", "-date"], name="person_recent_bill_idx")
+        ]
+
+    @classmethod
+    def refresh(cls, person_ids=None):
+        """
+        Recompute the recent committee bills of the given people, or of all
+        people if none are given.
+        """
+        people = Person.objects.all()
+
+        if person_ids is not None:
+            people = people.filter(pk__in=person_ids)
+
+        committees = defaultdict(set)
+
+        for person_id, organization_id in Membership.objects.filter(
+            person__in=people,
+            organization__classification="committee",
+            start_date_dt__lte=Now(),
+            end_date_dt__gt=Now(),
+        ).values_list("person_id", "organization_id"):
+            committees[person_id].add(organization_id)
+
+        visible_bills = VisibleBill.objects.values("bill_id")
+        rows = []
+
+        for person_id, organization_ids in committees.items():
+            recent_bills = (
+                CoreBillAction.objects.filter(
+                    organization_id__in=organization_ids, bill_id__in=visible_bills
+                )
+                .values("bill_id")
+                .annotate(latest_date=Max("date"))
+                .order_by("-latest_date", "bill_id")[: cls.RECENT_BILLS]
+            )
+
+            rows.extend(
+                cls(
+                    person_id=person_id,
+                    bill_id=recent_bill["bill_id"],
+                    date=recent_bill["latest_date"][:10],
+                )
+                for recent_bill in recent_bills
+            )
+
+        with transaction.atomic():
+            stale = cls.objects.all()
+
+            if person_ids is not None:
+                stale = stale.filter(person_id__in=person_ids)
+
+            stale.delete()
+            cls.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
@@ -0,0 +1,41 @@
+from elasticsearch.helpers import scan
+from haystack.backends.elasticsearch7_backend import (
+    Elasticsearch7SearchBackend,
+    Elasticsearch7SearchEngine,
+)
+from haystack.constants import DJANGO_CT
+from haystack.utils import get_model_ct
+
+
+class LAMetroElasticsearch7SearchBackend(Elasticsearch7SearchBackend):
+    def update(self, index, iterable, commit=True):
+        """
+        Give indexes that define a preload context manager the chance to load
+        data for the whole batch of objects before each object is prepared.
+        """
+        if not hasattr(index, "preload"):
+            return super().update(index, iterable, commit=commit)
+
+        objs = list(iterable)
+
+        with index.preload(objs):
+            return super().update(index, objs, commit=commit)
+
+    def indexed_ids(self, model):
+        """
+        Return the IDs of the documents of the given model in the index.
+        """
+        query = {
+            "query": {
+                "query_string": {"query": "%s:%s" % (DJANGO_CT, get_model_ct(model))}
+            },
+            "_source": False,
+        }
+
+        return [
+            doc["_id"] for doc in scan(self.conn, query=query, index=self.index_name)
+        ]
+
+
+class LAMetroElasticsearch7SearchEngine(Elasticsearch7SearchEngine):
+    backend = LAMetroElasticsearch7SearchBackend
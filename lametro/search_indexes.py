@@ -1,9 +1,14 @@
+from contextlib import contextmanager
 import json
+import threading
 
+from django.db.models import Prefetch
 from haystack import indexes
+from opencivicdata.legislative.models import BillAbstract
 from councilmatic_core.haystack_indexes import BillIndex
+from councilmatic_core.models import BillAction, BillSponsorship
 
-from lametro.models import LAMetroBill, LAMetroSubject
+from lametro.models import BillLatestAction, LAMetroBill, LAMetroSubject
 from lametro.utils import format_full_text, parse_subject
 
 
@@ -33,14 +38,113 @@ class LAMetroBillIndex(BillIndex, indexes.Indexable):
     rich_topics = indexes.CharField(indexed=False)
     pseudo_topics = indexes.CharField(indexed=False)
 
+    def __init__(self):
+        super().__init__()
+        self._preloaded = threading.local()
+
     def get_model(self):
         return LAMetroBill
 
+    def index_queryset(self, using=None):
+        """
+        Prefetch the related objects read while preparing bills, so that each
+        batch of bills costs a fixed number of queries, rather than several
+        queries per bill.
+        """
+        return (
+            self.get_model()
+            ._default_manager.select_related(
+                "legislative_session", "from_organization", "latest_action"
+            )
+            .prefetch_related(
+                Prefetch(
+                    "actions",
+                    queryset=BillAction.objects.select_related("organization"),
+                ),
+                Prefetch(
+                    "sponsorships",
+                    queryset=BillSponsorship.objects.select_related("person").order_by(
+                        "pk"
+                    ),
+                ),
+                Prefetch("abstracts", queryset=BillAbstract.objects.order_by("pk")),
+                "documents",
+                "sources",
+            )
+        )
+
+    @contextmanager
+    def preload(self, bills):
+        """
+        Load the actions and agendas and the topic classifications of a batch
+        of bills up front. Called by the search backend around each update.
+        """
+        subjects = {subject for bill in bills for subject in bill.subject}
+
+        self._preloaded.actions_and_agendas = LAMetroBill.actions_and_agendas_for_bills(
+            bills
+        )
+        self._preloaded.classifications = dict(
+            LAMetroSubject.objects.filter(name__in=subjects).values_list(
+                "name", "classification"
+            )
+        )
+
+        try:
+            yield
+        finally:
+            del self._preloaded.actions_and_agendas
+            del self._preloaded.classifications
+
+    def _actions_and_agendas(self, obj):
+        preloaded = getattr(self._preloaded, "actions_and_agendas", {})
+
+        if obj.pk in preloaded:
+            return preloaded[obj.pk]
+
+        return obj.actions_and_agendas
+
+    def _classifications(self, obj):
+        """
+        Return a dictionary mapping the name of each of a bill's subjects to
+        its classification.
+        """
+        classifications = getattr(self._preloaded, "classifications", None)
+
+        if classifications is None:
+            classifications = dict(
+                LAMetroSubject.objects.filter(name__in=obj.subject).values_list(
+                    "name", "classification"
+                )
+            )
+
+        return {
+            subject: classifications[subject]
+            for subject in obj.subject
+            if subject in classifications
+        }
+
+    def _latest_action(self, obj):
+        """
+        Return the description and inferred status of a bill's latest action.
+        """
+        try:
+            latest_action = obj.latest_action
+        except BillLatestAction.DoesNotExist:
+            # Not yet stored, so use the (possibly prefetched) actions
+            actions = list(obj.actions.all())
+            description = actions[-1].description if actions else ""
+            return description, obj._status(description)
+
+        return latest_action.description, latest_action.status
+
     def prepare_controlling_body(self, obj):
         return None
 
     def prepare_sponsorships(self, obj):
-        orgs_list = [action["organization"].name for action in obj.actions_and_agendas]
+        orgs_list = [
+            action["organization"].name for action in self._actions_and_agendas(obj)
+        ]
         return set(orgs_list)
 
     def prepare_actions(self, obj):
@@ -72,7 +176,9 @@ class LAMetroBillIndex(BillIndex, indexes.Indexable):
         If a bill doesn't have more than one of either, then use the
         legislative session as fallback value.
         """
-        aa = sorted(obj.actions_and_agendas, key=lambda i: i["date"], reverse=True)
+        aa = sorted(
+            self._actions_and_agendas(obj), key=lambda i: i["date"], reverse=True
+        )
         agendas = [a for a in aa if a["description"] == "SCHEDULED"]
         start_year = None
         end_year = None
@@ -129,25 +235,38 @@ class LAMetroBillIndex(BillIndex, indexes.Indexable):
         """
         Retrieve a list of topics with the given classification.
         """
-        topics = LAMetroSubject.objects.filter(
-            name__in=obj.subject, classification=classification
-        ).values_list("name", flat=True)
+        return [
+            name
+            for name, topic_classification in self._classifications(obj).items()
+            if topic_classification == classification
+        ]
 
-        return list(topics)
+    def prepare_inferred_status(self, obj):
+        _, status = self._latest_action(obj)
+        return status
 
     def prepare_listing_description(self, obj):
         return obj.listing_description
 
     def prepare_last_action_description(self, obj):
-        if obj.current_action:
-            return obj.current_action.description
+        description, _ = self._latest_action(obj)
+        return description or None
 
     def prepare_primary_sponsor(self, obj):
-        if obj.primary_sponsor:
-            return obj.primary_sponsor.name
+        primary_sponsor = min(
+            (s for s in obj.sponsorships.all() if s.primary),
+            key=lambda s: s.pk,
+            default=None,
+        )
+
+        if primary_sponsor:
+            return primary_sponsor.name
 
     def prepare_rich_topics(self, obj):
-        if rich_topics := list(obj.rich_topics.values("name", "classification")):
+        if rich_topics := [
+            {"name": name, "classification": classification}
+            for name, classification in sorted(self._classifications(obj).items())
+        ]:
             return json.dumps(rich_topics)
 
     def prepare_pseudo_topics(self, obj):
@@ -1,5 +1,7 @@
 import logging
 
+from opencivicdata.legislative.models import BillVersion
+
 from lametro.models.legislative import LAMetroBill
 
 logger = logging.getLogger(__name__)
@@ -14,21 +16,42 @@ class BillService:
 
         :return details: A dict with document details if available
         """
+        return BillService.build_bills_document_details([bill]).get(bill.pk, {})
+
+    @staticmethod
+    def build_bills_document_details(bills) -> dict:
+        """
+        Return the details of build_bill_document_details for each of the given
+        bills that has a board report, by bill ID, looking up every board
+        report at once.
+        """
 
         date_format = "%Y-%m-%d %H:%M:%S"
+        board_reports = {}
+
+        for board_report in BillVersion.objects.filter(
+            bill_id__in=[bill.pk for bill in bills], note="Board Report"
+        ).prefetch_related("links"):
+            links = board_report.links.all()
+
+            if links and board_report.bill_id not in board_reports:
+                board_report.url = links[0].url
+                board_reports[board_report.bill_id] = board_report
+
         details = {}
 
-        if board_report := bill.board_report:
-            details = {
-                "title": bill.friendly_name,
-                "source_url": board_report.url,
-                "created_at": bill.created_at.strftime(date_format),
-                "updated_at": bill.updated_at.strftime(date_format),
-                "document_type": "bill_version",
-                "document_id": str(board_report.pk),
-                "entity_type": "bill",
-                "entity_id": bill.pk,
-                "entity_slug": bill.slug,
-            }
+        for bill in bills:
+            if board_report := board_reports.get(bill.pk):
+                details[bill.pk] = {
+                    "title": bill.friendly_name,
+                    "source_url": board_report.url,
+                    "created_at": bill.created_at.strftime(date_format),
+                    "updated_at": bill.updated_at.strftime(date_format),
+                    "document_type": "bill_version",
+                    "document_id": str(board_report.pk),
+                    "entity_type": "bill",
+                    "entity_id": bill.pk,
+                    "entity_slug": bill.slug,
+                }
 
         return details
@@ -100,8 +100,17 @@ class EventService:
 
     @staticmethod
     def get_agenda(event) -> Optional[dict]:
+        return EventService.get_agendas([event]).get(event.pk)
+
+    @staticmethod
+    def get_agendas(events) -> dict:
+        """
+        Return the agenda of each of the given events that has one, by event
+        ID. Scraped agendas take precedence over manually uploaded ones.
+        """
         documents = (
-            event.documents.annotate(
+            EventDocument.objects.filter(event_id__in=[event.pk for event in events])
+            .annotate(
                 precedence=Case(
                     When(note__icontains="manual", then=2),
                     When(note__icontains="agenda", then=1),
@@ -109,20 +118,26 @@ class EventService:
                     output_field=IntegerField(),
                 )
             )
-            .order_by("precedence")
+            .order_by("event_id", "precedence")
             .prefetch_related("links")
         )
 
-        if documents:
-            agenda = documents.first()
-            return {
-                "url": agenda.links.get().url,
+        agendas = {}
+
+        for agenda in documents:
+            links = agenda.links.all()
+
+            if agenda.event_id in agendas or not links:
+                continue
+
+            agendas[agenda.event_id] = {
+                "url": links[0].url,
                 "timestamp": agenda.date,
                 "manual": "manual" in agenda.note.lower(),
                 "pk": agenda.pk,
             }
 
-        return None
+        return agendas
 
     @staticmethod
     def get_manage_agenda_url(event) -> str:
@@ -171,21 +186,32 @@ class EventService:
 
         :return details: A dict with document details if available
         """
+        return EventService.build_events_document_details([event]).get(event.pk, {})
+
+    @staticmethod
+    def build_events_document_details(events) -> dict:
+        """
+        Return the details of build_event_document_details for each of the
+        given events that has an agenda, by event ID, looking up every agenda
+        at once.
+        """
 
         date_format = "%Y-%m-%d %H:%M:%S"
+        agendas = EventService.get_agendas(events)
         details = {}
 
-        if agenda := EventService.get_agenda(event):
-            details = {
-                "title": f"{event.name} - {event.start_time.date()}",
-                "source_url": agenda["url"],
-                "created_at": event.created_at.strftime(date_format),
-                "updated_at": event.updated_at.strftime(date_format),
-                "document_type": "event_document",
-                "document_id": str(agenda["pk"]),
-                "entity_type": "event",
-                "entity_id": event.pk,
-                "entity_slug": event.slug,
-            }
+        for event in events:
+            if agenda := agendas.get(event.pk):
+                details[event.pk] = {
+                    "title": f"{event.name} - {event.start_time.date()}",
+                    "source_url": agenda["url"],
+                    "created_at": event.created_at.strftime(date_format),
+                    "updated_at": event.updated_at.strftime(date_format),
+                    "document_type": "event_document",
+                    "document_id": str(agenda["pk"]),
+                    "entity_type": "event",
+                    "entity_id": event.pk,
+                    "entity_slug": event.slug,
+                }
 
         return details
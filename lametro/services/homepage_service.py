@@ -0,0 +1,26 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.utils import timezone
+
+
+class HomepageService:
+    """
+    The upcoming and recent meetings on the homepage change slowly, so they're
+    cached as template fragments. The fragments are keyed on a version that is
+    replaced whenever events or broadcasts change, and on today's date, since
+    the list of today's meetings changes at midnight.
+    """
+
+    CACHE_VERSION_KEY = "homepage_cache_version"
+
+    @staticmethod
+    def cache_version() -> str:
+        version = cache.get_or_set(
+            HomepageService.CACHE_VERSION_KEY, lambda: uuid4().hex, None
+        )
+        return f"{version}-{timezone.localdate().isoformat()}"
+
+    @staticmethod
+    def invalidate():
+        cache.set(HomepageService.CACHE_VERSION_KEY, uuid4().hex, None)
@@ -0,0 +1,227 @@
+from datetime import timedelta
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from opencivicdata.legislative.models import EventRelatedEntity, RelatedBill
+from wagtail.models import Page
+
+from lametro.models import (
+    Alert,
+    BillPacket,
+    BoardMemberDetails,
+    EventPacket,
+    LAMetroBill,
+    LAMetroEvent,
+    LAMetroOrganization,
+    LAMetroPerson,
+    Membership,
+    PersonRecentBill,
+)
+
+
+class LastModifiedService:
+    """
+    When detail pages and feeds last changed, derived from the updated_at of
+    the entity shown and the related rows displayed with it, so that repeat
+    requests can be answered with 304 Not Modified. Each method takes the
+    request and the slug from the URL, and returns None if the page should
+    always be rendered.
+
+    Some of what these pages show depends on the date, e.g., which memberships
+    are current, so pages are also considered modified at midnight, and when
+    the alerts or CMS pages shown around every page change. Pages rendered by
+    an earlier release may differ, so they're also considered modified when
+    the running release was created. That's the same for every process, so
+    each gives a page the same ETag.
+    """
+
+    # When an alert or CMS page was last deleted or unpublished, which leaves
+    # no timestamp in the database
+    SITE_REMOVED_KEY = "site_removed_at"
+
+    # Meetings this close to their start have live broadcast links, which
+    # change without changing the event
+    LIVE_WINDOW = timedelta(days=1)
+
+    @staticmethod
+    def _latest(*timestamps):
+        timestamps = [timestamp for timestamp in timestamps if timestamp]
+        return max(timestamps) if timestamps else None
+
+    @staticmethod
+    def floor():
+        midnight = timezone.localtime().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        return LastModifiedService._latest(midnight, settings.RELEASED_AT)
+
+    @staticmethod
+    def site():
+        """
+        Return when the alerts and the CMS pages linked from the navigation
+        last changed. An alert also changes the page when it expires.
+        """
+        alerts = Alert.objects.aggregate(
+            updated=Max("updated_at"),
+            expired=Max("expiration", filter=Q(expiration__lte=timezone.now())),
+        )
+        pages = Page.objects.aggregate(
+            published=Max("last_published_at"),
+            revised=Max("latest_revision_created_at"),
+        )
+
+        return LastModifiedService._latest(
+            *alerts.values(),
+            *pages.values(),
+            cache.get(LastModifiedService.SITE_REMOVED_KEY),
+        )
+
+    @staticmethod
+    def site_removed():
+        cache.set(LastModifiedService.SITE_REMOVED_KEY, timezone.now(), None)
+
+    @staticmethod
+    def bill(request, slug):
+        bill = LAMetroBill.objects.filter(slug=slug).values("id", "updated_at").first()
+
+        if not bill:
+            return None
+
+        return LastModifiedService._latest(
+            bill["updated_at"],
+            EventRelatedEntity.objects.filter(bill_id=bill["id"]).aggregate(
+                latest=Max("agenda_item__event__updated_at")
+            )["latest"],
+            RelatedBill.objects.filter(bill_id=bill["id"]).aggregate(
+                latest=Max("related_bill__updated_at")
+            )["latest"],
+            BillPacket.objects.filter(bill_id=bill["id"]).aggregate(
+                latest=Max("updated_at")
+            )["latest"],
+        )
+
+    @staticmethod
+    def event(request, slug):
+        event = (
+            LAMetroEvent.objects.filter(slug=slug)
+            .values("id", "updated_at", "start_time")
+            .first()
+        )
+
+        if not event:
+            return None
+
+        if abs(event["start_time"] - timezone.now()) < LastModifiedService.LIVE_WINDOW:
+            return None
+
+        return LastModifiedService._latest(
+            event["updated_at"],
+            EventRelatedEntity.objects.filter(
+                agenda_item__event_id=event["id"]
+            ).aggregate(latest=Max("bill__updated_at"))["latest"],
+            EventPacket.objects.filter(event_id=event["id"]).aggregate(
+                latest=Max("updated_at")
+            )["latest"],
+        )
+
+    @staticmethod
+    def person(request, slug):
+        person = (
+            LAMetroPerson.objects.filter(slug=slug).values("id", "updated_at").first()
+        )
+
+        if not person:
+            return None
+
+        memberships = Membership.objects.filter(person_id=person["id"]).aggregate(
+            membership=Max("updated_at"),
+            organization=Max("organization__updated_at"),
+            post=Max("post__updated_at"),
+        )
+
+        return LastModifiedService._latest(
+            person["updated_at"],
+            *memberships.values(),
+            BoardMemberDetails.objects.filter(person_id=person["id"]).aggregate(
+                latest=Max("last_published_at")
+            )["latest"],
+            PersonRecentBill.objects.filter(person_id=person["id"]).aggregate(
+                latest=Max("bill__updated_at")
+            )["latest"],
+        )
+
+    @staticmethod
+    def committee(request, slug):
+        committee = (
+            LAMetroOrganization.objects.filter(slug=slug)
+            .values("id", "updated_at")
+            .first()
+        )
+
+        if not committee:
+            return None
+
+        memberships = Membership.objects.filter(
+            organization_id=committee["id"]
+        ).aggregate(membership=Max("updated_at"), person=Max("person__updated_at"))
+
+        # Meetings move from upcoming to past when they start
+        events = LAMetroEvent.objects.filter(
+            participants__organization_id=committee["id"]
+        ).aggregate(
+            event=Max("updated_at"),
+            started=Max("start_time", filter=Q(start_time__lte=timezone.now())),
+        )
+
+        return LastModifiedService._latest(
+            committee["updated_at"], *memberships.values(), *events.values()
+        )
+
+
+def conditional_page(last_modified):
+    """
+    Decorate a view to answer conditional GET requests with 304 Not Modified,
+    without querying for or rendering the page, if it hasn't changed since the
+    time returned by last_modified(request, *args, **kwargs).
+
+    Pages are sent with no-cache, so browsers ask whether they've changed
+    before showing them again.
+
+    Pages differ for signed in users, so their requests are always rendered.
+    """
+
+    def get_last_modified(request, *args, **kwargs):
+        if not hasattr(request, "_last_modified"):
+            request._last_modified = None
+
+            if not request.user.is_authenticated:
+                modified = last_modified(request, *args, **kwargs)
+
+                if modified:
+                    request._last_modified = LastModifiedService._latest(
+                        modified,
+                        LastModifiedService.site(),
+                        LastModifiedService.floor(),
+                    )
+
+        return request._last_modified
+
+    def get_etag(request, *args, **kwargs):
+        modified = get_last_modified(request, *args, **kwargs)
+
+        if modified:
+            version = f"{request.get_full_path()}:{modified.isoformat()}"
+            return hashlib.sha256(version.encode()).hexdigest()[:32]
+
+        return None
+
+    def decorator(view):
+        view = condition(etag_func=get_etag, last_modified_func=get_last_modified)(view)
+        return cache_control(no_cache=True)(view)
+
+    return decorator
@@ -0,0 +1,95 @@
+from itertools import chain
+import logging
+
+import requests
+
+from django.conf import settings
+
+from lametro.models import LAMetroEvent
+from lametro.utils import timed_get, LAMetroRequestTimeoutException
+
+logger = logging.getLogger(__name__)
+
+
+class LiveMediaService:
+    """
+    Query Granicus for running events and live media, and store the results
+    in the "live_media" cache for LAMetroEvent to read while serving requests.
+    """
+
+    NOT_IN_PROGRESS_MESSAGE = "The event you selected is not currently in progress"
+
+    @staticmethod
+    def get_running_events() -> list:
+        """
+        Return the GUIDs of events that are currently streaming, or an empty
+        list if Granicus could not be reached.
+
+        Note that our stored GUIDs are all uppercase, because they come
+        that way from the Legistar API. The running events endpoint
+        returns all-lowercase GUIDs, so we uppercase them for comparison.
+        """
+        try:
+            response = timed_get(LAMetroEvent.RUNNING_EVENTS_URL)
+        except (LAMetroRequestTimeoutException, requests.RequestException) as e:
+            logger.warning(e)
+            return []
+
+        if response.status_code != 200:
+            return []
+
+        return [guid.upper() for guid in response.json()]
+
+    @staticmethod
+    def is_valid_media(guid) -> bool:
+        try:
+            response = timed_get(LAMetroEvent.media_url(guid))
+        except (LAMetroRequestTimeoutException, requests.RequestException) as e:
+            logger.warning(e)
+            return False
+
+        return (
+            response.ok
+            and LiveMediaService.NOT_IN_PROGRESS_MESSAGE not in response.text
+        )
+
+    @staticmethod
+    def poll(timeout=None) -> list:
+        """
+        Refresh the live media snapshot. Entries expire after `timeout` seconds,
+        so the site stops reporting meetings as live if polling stops.
+
+        :return running_events: The GUIDs of events that are currently streaming
+        """
+        if timeout is None:
+            timeout = settings.LIVE_MEDIA_SNAPSHOT_TIMEOUT
+
+        live_media_cache = LAMetroEvent.live_media_cache()
+
+        running_events = LiveMediaService.get_running_events()
+        live_media_cache.set(
+            LAMetroEvent.RUNNING_EVENTS_CACHE_KEY, running_events, timeout
+        )
+
+        # Only meetings that could be displayed as live need their media checked
+        events = chain(
+            LAMetroEvent._potentially_current_meetings(),
+            LAMetroEvent.objects.filter(broadcast__is_manually_live=True),
+        )
+
+        media_validity = {}
+
+        for event in events:
+            for guid in (event.extras.get("guid"), event.extras.get("sap_guid")):
+                if guid and guid not in media_validity:
+                    media_validity[guid] = LiveMediaService.is_valid_media(guid)
+
+        live_media_cache.set_many(
+            {
+                LAMetroEvent.VALID_MEDIA_CACHE_KEY.format(guid=guid): valid
+                for guid, valid in media_validity.items()
+            },
+            timeout,
+        )
+
+        return running_events
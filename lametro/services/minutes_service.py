@@ -0,0 +1,184 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+import heapq
+import itertools
+import logging
+import os
+import threading
+from types import MappingProxyType
+
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+from opencivicdata.legislative.models import EventDocument
+
+from lametro.models import LAMetroEvent
+from lametro.utils import data_file_path, get_list_from_csv
+
+logger = logging.getLogger(__name__)
+
+
+class HistoricalMinutesIndex:
+    """
+    The meetings in data/historical_events.csv, which predate the meetings
+    scraped from Legistar, sorted by date. The index can't be changed once
+    built, so it's safe to share between requests and threads.
+    """
+
+    def __init__(self, rows):
+        meetings = sorted(
+            (self._meeting_from_row(row) for row in rows),
+            key=lambda meeting: meeting["start_time"],
+        )
+
+        self.meetings = tuple(meetings)
+        self.dates = tuple(meeting["start_time"] for meeting in meetings)
+
+    @staticmethod
+    def _meeting_from_row(row):
+        return MappingProxyType(
+            {
+                "start_time": datetime.strptime(row["date"], "%Y-%m-%d").date(),
+                "meeting": row["meeting"],
+                "agenda_link": tuple(row["agenda_link"].split("\n")),
+                "minutes_link": tuple(row["minutes_link"].split("\n")),
+            }
+        )
+
+    def between(self, start_date=None, end_date=None):
+        """
+        Return the meetings from start_date through end_date, inclusive, in
+        date order. Either bound may be omitted.
+        """
+        first = bisect_left(self.dates, start_date) if start_date else 0
+        last = bisect_right(self.dates, end_date) if end_date else len(self.dates)
+
+        return self.meetings[first:last]
+
+
+class MinutesService:
+    HISTORICAL_EVENTS_FILE = "historical_events.csv"
+
+    _historical_index = None
+    _historical_mtime = None
+    _historical_lock = threading.Lock()
+
+    @staticmethod
+    def historical_index() -> HistoricalMinutesIndex:
+        """
+        Return the index of historical meetings, loading the CSV the first time
+        and again whenever the file changes.
+        """
+        mtime = os.stat(data_file_path(MinutesService.HISTORICAL_EVENTS_FILE)).st_mtime
+
+        with MinutesService._historical_lock:
+            if MinutesService._historical_mtime != mtime:
+                logger.info(f"Loading {MinutesService.HISTORICAL_EVENTS_FILE}")
+
+                MinutesService._historical_index = HistoricalMinutesIndex(
+                    get_list_from_csv(MinutesService.HISTORICAL_EVENTS_FILE)
+                )
+                MinutesService._historical_mtime = mtime
+
+            return MinutesService._historical_index
+
+    @staticmethod
+    def get_historical_events(start_date=None, end_date=None) -> tuple:
+        """
+        Return historical meetings from start_date through end_date, inclusive,
+        in date order.
+        """
+        return MinutesService.historical_index().between(start_date, end_date)
+
+    @staticmethod
+    def get_stored_events(start_datetime=None, end_datetime=None, batch_size=200):
+        """
+        Yield the scraped meetings that can have minutes, from start_datetime
+        until end_datetime or now, newest first. Events are fetched batch_size
+        at a time, so their documents are only prefetched for one batch.
+        """
+        # We only want to display meetings that can have minutes
+        meetings_with_minutes = (
+            Q(event__name__icontains="LA SAFE")
+            | Q(event__name__icontains="Board Meeting")
+            | Q(event__name__icontains="Crenshaw Project Corporation")
+        )
+
+        links = Prefetch("links", to_attr="prefetched_links")
+        minutes = EventDocument.objects.filter(
+            note__icontains="minutes"
+        ).prefetch_related(links)
+        agenda = EventDocument.objects.filter(
+            note__icontains="agenda"
+        ).prefetch_related(links)
+
+        events = (
+            LAMetroEvent.objects.filter(meetings_with_minutes)
+            .filter(start_time__lt=end_datetime or timezone.now())
+            .order_by("-start_time", "-id")
+            .prefetch_related(
+                Prefetch("documents", queryset=minutes, to_attr="minutes_document"),
+                Prefetch("documents", queryset=agenda, to_attr="agenda_document"),
+            )
+        )
+
+        if start_datetime:
+            events = events.filter(start_time__gt=start_datetime)
+
+        for offset in itertools.count(0, batch_size):
+            batch = list(events[offset : offset + batch_size])
+
+            for event in batch:
+                yield {
+                    "start_time": event.start_time.date(),
+                    "meeting": event.name,
+                    "minutes_link": [
+                        document.prefetched_links[0].url
+                        for document in event.minutes_document[:1]
+                        if document.prefetched_links
+                    ],
+                    "agenda_link": [
+                        document.prefetched_links[0].url
+                        for document in event.agenda_document[:1]
+                        if document.prefetched_links
+                    ],
+                }
+
+            if len(batch) < batch_size:
+                return
+
+    @staticmethod
+    def get_minutes(start_datetime=None, end_datetime=None, page=1, days_per_page=50):
+        """
+        Return a page of historical and scraped meetings, grouped by date,
+        newest first, and whether there are more pages. The two sources are
+        merged as they're read, so only the requested page and the ones
+        before it are ever fetched.
+
+        :return (minutes, has_next): A list of (date, meetings) and a bool
+        """
+        historical_events = reversed(
+            MinutesService.get_historical_events(
+                start_datetime.date() if start_datetime else None,
+                end_datetime.date() if end_datetime else None,
+            )
+        )
+        stored_events = MinutesService.get_stored_events(start_datetime, end_datetime)
+
+        all_events = heapq.merge(
+            historical_events,
+            stored_events,
+            key=lambda event: event["start_time"],
+            reverse=True,
+        )
+        days = itertools.groupby(all_events, key=lambda event: event["start_time"])
+
+        first_day = (page - 1) * days_per_page
+        minutes = [
+            (date, list(events))
+            for date, events in itertools.islice(
+                days, first_day, first_day + days_per_page
+            )
+        ]
+        has_next = next(days, None) is not None
+
+        return minutes, has_next
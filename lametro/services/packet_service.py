@@ -0,0 +1,284 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import logging
+import time
+
+import requests
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+from opencivicdata.legislative.models import (
+    BillDocument,
+    BillVersion,
+    EventDocument,
+    EventRelatedEntity,
+)
+
+from lametro.models import LAMetroBill
+from lametro.utils import get_session
+
+logger = logging.getLogger(__name__)
+
+
+class PacketService:
+    """
+    Board report packets combine a report with its attachments, and event
+    packets combine an agenda with the packets of the board reports on it.
+    The metro-pdf-merger builds them asynchronously: compile() asks it to merge
+    the files of many packets at once, and probe() checks which merged PDFs
+    have been written since. Pages only read Packet.ready.
+    """
+
+    # Seconds to wait for the merger or the bucket to respond
+    TIMEOUT = 30
+
+    # Seconds to wait before the first retry. The wait doubles for each retry.
+    BACKOFF = 1
+
+    @staticmethod
+    def bill_files(bill_ids) -> dict:
+        """
+        Return the URLs of the files in each board report's packet, by bill ID:
+        the board report, then its attachments.
+        """
+        files = {}
+
+        board_reports = (
+            BillVersion.objects.filter(bill_id__in=bill_ids)
+            .order_by("bill_id")
+            .prefetch_related("links")
+        )
+
+        for board_report in board_reports:
+            links = board_report.links.all()
+
+            if links and board_report.bill_id not in files:
+                files[board_report.bill_id] = [links[0].url]
+
+        # Attachments numbered "0" go last
+        attachments = (
+            BillDocument.objects.filter(bill_id__in=bill_ids)
+            .annotate(
+                index=Case(
+                    When(note__istartswith="0", then=Value("z")),
+                    default=F("note"),
+                    output_field=models.CharField(),
+                )
+            )
+            .order_by("bill_id", "index")
+            .prefetch_related("links")
+        )
+
+        # Sometimes there is more than one url for the same document name
+        # https://metro.legistar.com/LegislationDetail.aspx?ID=3104422&GUID=C30D3376-7265-477B-AFFA-815270400538%3e%5d%3e
+        # I'm not sure if this a data problem or not, so we'll just add all
+        # the doc links
+        for attachment in attachments:
+            files.setdefault(attachment.bill_id, []).extend(
+                link.url for link in attachment.links.all()
+            )
+
+        return files
+
+    @staticmethod
+    def event_files(event_ids) -> dict:
+        """
+        Return the URLs of the files in each event's packet, by event ID: the
+        agenda, then the files of each board report on the agenda, in agenda
+        order.
+        """
+        files = {}
+
+        agendas = EventDocument.objects.filter(
+            event_id__in=event_ids, note="Agenda"
+        ).prefetch_related("links")
+
+        for agenda in agendas:
+            links = agenda.links.all()
+
+            if links and agenda.event_id not in files:
+                files[agenda.event_id] = [links[0].url]
+
+        agenda_bills = list(
+            EventRelatedEntity.objects.filter(
+                agenda_item__event_id__in=event_ids, bill__isnull=False
+            )
+            .annotate(int_order=Cast("agenda_item__order", IntegerField()))
+            .order_by("agenda_item__event_id", "int_order", "agenda_item_id")
+            .values_list("agenda_item__event_id", "agenda_item_id", "bill_id")
+        )
+        bill_ids = {bill_id for _, _, bill_id in agenda_bills}
+
+        # Only agenda items with at least one attachment are included
+        bills_with_attachments = set(
+            BillDocument.objects.filter(bill_id__in=bill_ids).values_list(
+                "bill_id", flat=True
+            )
+        )
+        items_with_attachments = {
+            item_id
+            for _, item_id, bill_id in agenda_bills
+            if bill_id in bills_with_attachments
+        }
+
+        # Board reports that can't be displayed, e.g., private reports, are
+        # left out of event packets
+        visible_bills = set(
+            LAMetroBill.objects.filter(pk__in=bill_ids).values_list("pk", flat=True)
+        )
+        bill_files = PacketService.bill_files(visible_bills)
+
+        for event_id, item_id, bill_id in agenda_bills:
+            if item_id in items_with_attachments and bill_id in visible_bills:
+                files.setdefault(event_id, []).extend(bill_files.get(bill_id, []))
+
+        return files
+
+    @staticmethod
+    def _request(method, url, **kwargs) -> requests.Response:
+        """
+        Make a request, retrying connection errors, timeouts and server errors
+        up to PACKET_REQUEST_RETRIES times, backing off between attempts.
+        """
+        for attempt in range(settings.PACKET_REQUEST_RETRIES + 1):
+            if attempt:
+                time.sleep(PacketService.BACKOFF * 2 ** (attempt - 1))
+
+            try:
+                response = get_session().request(
+                    method,
+                    url,
+                    timeout=(settings.REQUEST_CONNECT_TIMEOUT, PacketService.TIMEOUT),
+                    **kwargs,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+                continue
+
+            if response.status_code < 500:
+                return response
+
+            error = requests.HTTPError(
+                f"{response.status_code} response from {url}", response=response
+            )
+
+        raise error
+
+    @staticmethod
+    def _map(func, items) -> list:
+        with ThreadPoolExecutor(
+            max_workers=settings.PACKET_REQUEST_WORKERS
+        ) as executor:
+            return list(executor.map(func, items))
+
+    @staticmethod
+    def request_merge(slug, files) -> bool:
+        """
+        Ask the merger to build the packet for the given slug from the given
+        files. Return whether the request was accepted.
+        """
+        data = {
+            "run_id": "merge_{0}_{1}".format(slug, datetime.now().isoformat()),
+            "conf": {
+                "identifier": slug,
+                "attachment_links": files,
+            },
+            "replace_microseconds": "false",
+        }
+
+        try:
+            PacketService._request(
+                "post", settings.MERGE_ENDPOINT, json=data
+            ).raise_for_status()
+        except requests.RequestException as e:
+            logger.warning(f"Could not request the {slug} packet: {e}")
+            return False
+
+        return True
+
+    @staticmethod
+    def compile(packet_model, entities, files, merge=True) -> list:
+        """
+        Request packets of the given bills or events from the merger, several
+        at a time, then create or update the packets that were accepted.
+        Packets that couldn't be requested aren't updated, so they're requested
+        again on the next run.
+
+        :param packet_model: BillPacket or EventPacket
+        :param files: The files of each entity's packet, by entity ID
+        :param merge: Whether to contact the merger, or only store the packets
+        :return packets: The packets that were compiled
+        """
+        entities = [entity for entity in entities if files.get(entity.pk)]
+
+        if merge:
+            accepted = PacketService._map(
+                lambda entity: PacketService.request_merge(
+                    entity.slug, files[entity.pk]
+                ),
+                entities,
+            )
+            entities = [entity for entity, ok in zip(entities, accepted) if ok]
+
+        entity_field = packet_model.entity_field
+        existing_packets = {
+            getattr(packet, f"{entity_field}_id"): packet
+            for packet in packet_model.objects.filter(
+                **{f"{entity_field}__in": [entity.pk for entity in entities]}
+            )
+        }
+
+        now = timezone.now()
+        updated_packets = []
+        new_packets = []
+
+        for entity in entities:
+            url = packet_model.packet_url(entity.slug)
+
+            if packet := existing_packets.get(entity.pk):
+                packet.url = url
+                packet.updated_at = now
+                updated_packets.append(packet)
+            else:
+                new_packets.append(packet_model(url=url, **{entity_field: entity}))
+
+        with transaction.atomic():
+            packet_model.objects.bulk_update(
+                updated_packets, ["url", "updated_at"], batch_size=500
+            )
+            packet_model.objects.bulk_create(new_packets, batch_size=500)
+
+        return updated_packets + new_packets
+
+    @staticmethod
+    def is_ready(packet) -> bool:
+        try:
+            response = PacketService._request("head", packet.url)
+        except requests.RequestException as e:
+            logger.warning(f"Could not check {packet.url}: {e}")
+            return False
+
+        return response.status_code == 200
+
+    @staticmethod
+    def probe(packet_model) -> int:
+        """
+        Check whether the merged PDF of each packet that isn't ready yet has
+        been written, several at a time, and mark those that have as ready.
+
+        :return count: The number of packets marked ready
+        """
+        packets = list(packet_model.objects.filter(ready=False).only("id", "url"))
+        ready = PacketService._map(PacketService.is_ready, packets)
+
+        ready_ids = [packet.pk for packet, is_ready in zip(packets, ready) if is_ready]
+
+        # Readiness changes the page, so also update updated_at
+        packet_model.objects.filter(pk__in=ready_ids).update(
+            ready=True, updated_at=timezone.now()
+        )
+
+        return len(ready_ids)
@@ -0,0 +1,115 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.serializers import serialize
+from django.db.models import Case, IntegerField, Value, When
+from django.utils.functional import cached_property
+
+from lametro.models import LAMetroPerson
+
+
+class PersonProfile:
+    """
+    The facts shown on a board member's page. Each is fetched once, the first
+    time it's used, so a profile built for a request costs a fixed number of
+    queries however many times the view and template refer to it.
+
+    Look the person up with PersonService.queryset(), so their details and
+    latest revision are fetched along with them.
+    """
+
+    def __init__(self, person: LAMetroPerson):
+        self.person = person
+
+    @cached_property
+    def person_details(self):
+        try:
+            details = self.person.details
+        except ObjectDoesNotExist:
+            return None
+
+        return details.live_revision.as_object() if details.live_revision else None
+
+    @cached_property
+    def council_post(self):
+        membership = self.person.latest_council_membership
+        return membership.post if membership else None
+
+    @cached_property
+    def qualifying_post(self):
+        return self.council_post.acting_label if self.council_post else None
+
+    @cached_property
+    def map_geojson(self):
+        if self.council_post and self.council_post.shape:
+            return PersonService.district_geojson(self.council_post)
+
+        return None
+
+    @cached_property
+    def sponsored_legislation(self):
+        return list(self.person.committee_sponsorships)
+
+    @cached_property
+    def memberships_list(self):
+        return list(
+            self.person.current_memberships.exclude(
+                organization__name="Board of Directors"
+            )
+            .select_related("organization")
+            .annotate(
+                index=Case(
+                    When(role="Chair", then=Value(0)),
+                    When(role="Vice Chair", then=Value(1)),
+                    When(role="1st Vice Chair", then=Value(1)),
+                    When(role="2nd Vice Chair", then=Value(2)),
+                    When(role="Member", then=Value(3)),
+                    default=Value(999),
+                    output_field=IntegerField(),
+                )
+            )
+            .order_by("index")
+        )
+
+    @cached_property
+    def website_url(self):
+        return (
+            self.person.links.filter(note="web_site")
+            .values_list("url", flat=True)
+            .first()
+        )
+
+
+class PersonService:
+    """
+    Serializing a district's shape is slow, and shapes rarely change, so the
+    GeoJSON shown on person pages is cached per post. The cache keys include a
+    version that is replaced whenever a post changes or shapes are imported.
+    """
+
+    DISTRICT_CACHE_VERSION_KEY = "district_geojson_cache_version"
+
+    @staticmethod
+    def queryset():
+        return LAMetroPerson.objects.select_related("details__live_revision")
+
+    @staticmethod
+    def get_profile(person: LAMetroPerson) -> PersonProfile:
+        return PersonProfile(person)
+
+    @staticmethod
+    def district_geojson(post) -> str:
+        version = cache.get_or_set(
+            PersonService.DISTRICT_CACHE_VERSION_KEY, lambda: uuid4().hex, None
+        )
+
+        return cache.get_or_set(
+            f"district_geojson:{version}:{post.pk}",
+            lambda: serialize("geojson", [post], geometry_field="shape", fields=()),
+            None,
+        )
+
+    @staticmethod
+    def invalidate_district_geojson():
+        cache.set(PersonService.DISTRICT_CACHE_VERSION_KEY, uuid4().hex, None)
@@ -0,0 +1,40 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from lametro.models import LAMetroSubject
+
+
+class SubjectService:
+    """
+    Autocomplete matches SmartLogic concepts to subjects by guid on every
+    keystroke, and subject guids only change when refresh_guid runs. So each
+    process keeps a map of subject names by guid, and rebuilds it when the
+    version in the cache is replaced.
+    """
+
+    GUID_NAMES_VERSION_KEY = "subject_guid_names_version"
+
+    # The version the map was built at, and the map
+    _guid_names = (None, {})
+
+    @staticmethod
+    def guid_names() -> dict:
+        version = cache.get_or_set(
+            SubjectService.GUID_NAMES_VERSION_KEY, lambda: uuid4().hex, None
+        )
+        built_version, guid_names = SubjectService._guid_names
+
+        if built_version != version:
+            guid_names = dict(
+                LAMetroSubject.objects.filter(guid__isnull=False).values_list(
+                    "guid", "name"
+                )
+            )
+            SubjectService._guid_names = (version, guid_names)
+
+        return guid_names
+
+    @staticmethod
+    def invalidate_guid_names():
+        cache.set(SubjectService.GUID_NAMES_VERSION_KEY, uuid4().hex, None)
@@ -0,0 +1,220 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import logging
+import random
+import time
+
+import requests
+
+from django.conf import settings
+from django.core.cache import cache
+
+from lametro.utils import check_translations, get_session
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationService:
+    """
+    Deliver notifications of documents that need to be OCR'd and translated
+    to the Translation Suite, and look up the translated files it has made.
+
+    Translated files are cached per document, so that pages listing several
+    documents don't each wait on the suite. A document's cache entry is
+    dropped when a notification about it is delivered.
+    """
+
+    # Seconds to wait for the suite to respond
+    TIMEOUT = 30
+
+    # Attempts to deliver a chunk while the suite is unavailable, and the
+    # seconds to wait before the first retry. The wait doubles for each retry,
+    # and is jittered so that concurrent chunks don't retry in step.
+    ATTEMPTS = 3
+    BACKOFF = 30
+
+    # Seconds to cache the translated files of a document that has them, and
+    # of a document that has none yet or couldn't be checked
+    FILES_TIMEOUT = 60 * 60
+    NO_FILES_TIMEOUT = 5 * 60
+
+    # Number of documents to check with the suite at once
+    FILES_WORKERS = 8
+
+    # Status codes of a chunk rejected for its documents, whose halves may be
+    # accepted. Any other error, e.g., a bad API key, fails every document.
+    REJECTED_STATUS_CODES = (400, 422)
+
+    @staticmethod
+    def update_documents_url() -> str:
+        return f"https://{settings.TRANSLATION_SUITE_URL}/api/update-documents/"
+
+    @staticmethod
+    def idempotency_key(notifications) -> str:
+        """
+        Return a key identifying a chunk of notifications, so the suite can
+        recognize a chunk it has already received, e.g., when a response was
+        lost and the chunk is sent again.
+        """
+        pks = ",".join(str(pk) for pk in sorted(n.pk for n in notifications))
+        return hashlib.sha256(pks.encode()).hexdigest()
+
+    @staticmethod
+    def _post(notifications):
+        """
+        Send a chunk of notifications, retrying while the suite can't be
+        reached or returns a server error.
+
+        :return response: The suite's response, or None if it was unavailable
+        """
+        data = {
+            "api_key": settings.TRANSLATION_API_KEY,
+            "documents": [n.data for n in notifications],
+        }
+        headers = {
+            "Content-type": "application/json",
+            "Idempotency-Key": TranslationService.idempotency_key(notifications),
+        }
+
+        for attempt in range(TranslationService.ATTEMPTS):
+            if attempt:
+                delay = TranslationService.BACKOFF * 2 ** (attempt - 1)
+                time.sleep(delay * random.uniform(0.5, 1.5))
+
+            try:
+                response = get_session().post(
+                    TranslationService.update_documents_url(),
+                    json=data,
+                    headers=headers,
+                    timeout=(
+                        settings.REQUEST_CONNECT_TIMEOUT,
+                        TranslationService.TIMEOUT,
+                    ),
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                logger.warning(f"Could not reach the translation suite: {e}")
+                continue
+
+            logger.info(
+                f"Translation suite returned status code {response.status_code} "
+                f"for {len(notifications)} notifications"
+            )
+
+            if response.status_code < 500 and response.status_code != 429:
+                return response
+
+            logger.warning(f"Failed: {response.reason}")
+
+        return None
+
+    @staticmethod
+    def deliver(notifications) -> tuple:
+        """
+        Deliver a chunk of notifications. If the suite rejects the chunk's
+        documents, its halves are delivered separately, so that a bad document
+        only fails itself, rather than its whole chunk.
+
+        :return (delivered, failed): Lists of notifications
+        """
+        response = TranslationService._post(notifications)
+
+        if response is None:
+            return [], list(notifications)
+
+        if response.ok:
+            return list(notifications), []
+
+        try:
+            logger.warning(f"Failed: {response.json()}")
+        except requests.exceptions.JSONDecodeError:
+            logger.warning(f"Failed: {response.reason}")
+
+        if (
+            response.status_code not in TranslationService.REJECTED_STATUS_CODES
+            or len(notifications) == 1
+        ):
+            return [], list(notifications)
+
+        middle = len(notifications) // 2
+        delivered, failed = TranslationService.deliver(notifications[:middle])
+        more_delivered, more_failed = TranslationService.deliver(notifications[middle:])
+
+        return delivered + more_delivered, failed + more_failed
+
+    @staticmethod
+    def files_cache_key(document_id, entity_type) -> str:
+        return f"translation_files:{entity_type}:{document_id}"
+
+    @staticmethod
+    def get_files(document_id, entity_type) -> dict:
+        """
+        Return the translated files of a document.
+
+        :return files: A dict of "document_pdfs" and "document_rtfs"
+        """
+        return TranslationService.get_files_many([document_id], entity_type)[
+            document_id
+        ]
+
+    @staticmethod
+    def get_files_many(document_ids, entity_type) -> dict:
+        """
+        Return the translated files of each of the given documents, by document
+        ID, checking documents that aren't cached with the suite several at a
+        time.
+        """
+        keys = {
+            TranslationService.files_cache_key(document_id, entity_type): document_id
+            for document_id in document_ids
+        }
+        files = {keys[key]: value for key, value in cache.get_many(keys).items()}
+
+        missing = [
+            document_id
+            for document_id in dict.fromkeys(document_ids)
+            if document_id not in files
+        ]
+
+        if not missing:
+            return files
+
+        with ThreadPoolExecutor(max_workers=TranslationService.FILES_WORKERS) as e:
+            responses = list(
+                e.map(
+                    lambda document_id: check_translations(document_id, entity_type),
+                    missing,
+                )
+            )
+
+        for document_id, response in zip(missing, responses):
+            pdfs = response["pdf"] if response else []
+            rtfs = response["rtf"] if response else []
+            files[document_id] = {"document_pdfs": pdfs, "document_rtfs": rtfs}
+
+            if pdfs or rtfs:
+                timeout = TranslationService.FILES_TIMEOUT
+            else:
+                timeout = TranslationService.NO_FILES_TIMEOUT
+
+            cache.set(
+                TranslationService.files_cache_key(document_id, entity_type),
+                files[document_id],
+                timeout,
+            )
+
+        return files
+
+    @staticmethod
+    def invalidate_files(notifications):
+        """
+        Drop the cached translated files of the documents of the given
+        notifications, so that they're checked again.
+        """
+        cache.delete_many(
+            [
+                TranslationService.files_cache_key(
+                    notification.data["document_id"], notification.entity_type
+                )
+                for notification in notifications
+            ]
+        )
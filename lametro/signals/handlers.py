@@ -1,7 +1,33 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from wagtail.models import Page
+from wagtail.signals import page_unpublished
+from opencivicdata.core.models import Membership, Person, Post
+from opencivicdata.legislative.models import (
+    Bill,
+    BillAction,
+    Event,
+    EventAgendaItem,
+    EventDocument,
+    EventMedia,
+    EventRelatedEntity,
+)
 
-from lametro.models import LAMetroPerson, BoardMemberDetails
+from lametro.models import (
+    Alert,
+    LAMetroPerson,
+    BoardMemberDetails,
+    BillLatestAction,
+    EventBroadcast,
+    LAMetroSubject,
+    MapLayer,
+    PersonRecentBill,
+    VisibleBill,
+)
+from lametro.services.homepage_service import HomepageService
+from lametro.services.last_modified_service import LastModifiedService
+from lametro.services.person_service import PersonService
+from lametro.services.subject_service import SubjectService
 
 
 @receiver(post_save, sender=LAMetroPerson)
@@ -10,3 +36,123 @@ def create_member_details(sender, instance, created, **kwargs):
 
     if not details_exist:
         BoardMemberDetails.objects.create(person=instance)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def refresh_bill_visibility(sender, instance, **kwargs):
+    """
+    Recompute the visibility of bills affected by a change to a bill, or to
+    one of the actions or agenda appearances that determine its visibility.
+    """
+    if isinstance(instance, Bill):
+        bill_ids = [instance.pk]
+
+    elif isinstance(instance, (BillAction, EventRelatedEntity)):
+        bill_ids = [instance.bill_id] if instance.bill_id else []
+
+    elif isinstance(instance, EventAgendaItem):
+        bill_ids = EventRelatedEntity.objects.filter(
+            agenda_item=instance, bill__isnull=False
+        ).values_list("bill_id", flat=True)
+
+    elif isinstance(instance, Event):
+        bill_ids = EventRelatedEntity.objects.filter(
+            agenda_item__event=instance, bill__isnull=False
+        ).values_list("bill_id", flat=True)
+
+    else:
+        return
+
+    if bill_ids := list(bill_ids):
+        VisibleBill.refresh(bill_ids)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def refresh_latest_action(sender, instance, **kwargs):
+    """
+    Recompute the latest action of a bill when it or one of its actions changes.
+    """
+    if isinstance(instance, Bill):
+        BillLatestAction.refresh([instance.pk])
+
+    elif isinstance(instance, BillAction):
+        BillLatestAction.refresh([instance.bill_id])
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def refresh_recent_committee_bills(sender, instance, **kwargs):
+    """
+    Recompute the recent committee bills of the people affected by a change to
+    a committee's actions, or to someone's memberships. Registered after
+    refresh_bill_visibility, so bills made visible by an action are included.
+    """
+    if isinstance(instance, BillAction):
+        person_ids = Membership.objects.filter(
+            organization_id=instance.organization_id,
+            organization__classification="committee",
+        ).values_list("person_id", flat=True)
+
+    elif isinstance(instance, Membership):
+        person_ids = [instance.person_id] if instance.person_id else []
+
+    else:
+        return
+
+    if person_ids := list(set(person_ids)):
+        PersonRecentBill.refresh(person_ids)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_homepage(sender, instance, **kwargs):
+    """
+    Expire the cached meetings on the homepage when an event changes.
+    """
+    if isinstance(instance, (Event, EventBroadcast, EventDocument, EventMedia)):
+        HomepageService.invalidate()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_map_layers(sender, instance, **kwargs):
+    """
+    Delete the board members map layers when a post, its members or their
+    names change. They're rebuilt on the next request for the map.
+    """
+    if isinstance(instance, (Membership, Person, Post)):
+        MapLayer.objects.all().delete()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_district_geojson(sender, instance, **kwargs):
+    """
+    Expire the cached district maps on person pages when a post changes.
+    """
+    if isinstance(instance, Post):
+        PersonService.invalidate_district_geojson()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_subject_guid_names(sender, instance, **kwargs):
+    """
+    Rebuild the subject names matched to SmartLogic concepts when a subject
+    changes.
+    """
+    if isinstance(instance, LAMetroSubject):
+        SubjectService.invalidate_guid_names()
+
+
+@receiver(post_delete)
+@receiver(page_unpublished)
+def record_site_removal(sender, instance, **kwargs):
+    """
+    Record when an alert or CMS page is deleted or unpublished, so that pages
+    answering conditional requests are rendered again without it.
+    """
+    if isinstance(instance, (Alert, Page)):
+        LastModifiedService.site_removed()
@@ -0,0 +1,53 @@
+from django.db import models
+from haystack.signals import BaseSignalProcessor
+from opencivicdata.legislative.models import (
+    Bill,
+    BillAction,
+    BillDocument,
+    EventRelatedEntity,
+)
+
+from lametro.models import LAMetroSubject, QueuedBill
+
+
+class QueuedSignalProcessor(BaseSignalProcessor):
+    """
+    Rather than updating the search index while bills are saved, record the
+    IDs of changed bills in the QueuedBill table, including bills whose actions,
+    documents, agenda items or subjects changed. The index_queued_bills command
+    re-indexes them in batches.
+    """
+
+    def setup(self):
+        models.signals.post_save.connect(self.handle_save)
+        models.signals.post_delete.connect(self.handle_delete)
+
+    def teardown(self):
+        models.signals.post_save.disconnect(self.handle_save)
+        models.signals.post_delete.disconnect(self.handle_delete)
+
+    def handle_save(self, sender, instance, **kwargs):
+        if bill_ids := self.get_bill_ids(instance):
+            QueuedBill.enqueue(bill_ids)
+
+    def handle_delete(self, sender, instance, **kwargs):
+        self.handle_save(sender, instance, **kwargs)
+
+    def get_bill_ids(self, instance):
+        """
+        Return the IDs of the bills whose indexed data depends on the instance.
+        """
+        if isinstance(instance, Bill):
+            return [instance.pk]
+
+        elif isinstance(instance, (BillAction, BillDocument, EventRelatedEntity)):
+            return [instance.bill_id] if instance.bill_id else []
+
+        elif isinstance(instance, LAMetroSubject):
+            return list(
+                Bill.objects.filter(subject__contains=[instance.name]).values_list(
+                    "pk", flat=True
+                )
+            )
+
+        return []
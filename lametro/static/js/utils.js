@@ -37,6 +37,19 @@ function contactTranslationAPI(document_id, entity_type) {
         .then(r => r.json())
 }
 
+function contactTranslationBatchAPI(document_ids, entity_type) {
+    // Ask our own api for the available links of several documents at once
+    const body = new URLSearchParams({ "entity_type": entity_type })
+    document_ids.forEach(document_id => body.append("document_id", document_id))
+
+    return fetch(`/api/translations/`, {
+            headers: { "X-CSRFToken": getCookie("csrftoken"), "Content-Type": "application/x-www-form-urlencoded" },
+            method: "POST",
+            body: body,
+        })
+        .then(r => r.json())
+}
+
 class IndexTranslationUtils {
     static renderLinks(linksArr, file_format, meeting_id) {
         // Display links to translations as li's within a bootstrap accordion element
@@ -54,18 +67,27 @@ class IndexTranslationUtils {
         }
     }
 
-    static findTranslations(document_id, meeting_id) {
+    static showTranslations(data, meeting_id) {
         // Either show translations if any are available, or tell user none exist.
-        contactTranslationAPI(document_id, "event")
+        const messageEl = document.getElementById(`checking-message-${meeting_id}`)
+        if (data.document_pdfs.length == 0 && data.document_rtfs.length == 0) {
+            messageEl.innerHTML = `<p><em>No translations found for this agenda.</em></p>`
+        } else {
+            messageEl.classList.add("d-none")
+            this.renderLinks(data.document_pdfs, "pdf", meeting_id)
+            this.renderLinks(data.document_rtfs, "rtf", meeting_id)
+        }
+    }
+
+    static findAllTranslations(meetings) {
+        // Look up the agendas of several meetings in one request, given an
+        // object of meeting ids by agenda document id
+        const document_ids = Object.keys(meetings)
+        if (document_ids.length == 0) return
+
+        contactTranslationBatchAPI(document_ids, "event")
         .then(data => {
-            const messageEl = document.getElementById(`checking-message-${meeting_id}`)
-            if (data.document_pdfs.length == 0 && data.document_rtfs.length == 0) {
-                messageEl.innerHTML = `<p><em>No translations found for this agenda.</em></p>`
-            } else {
-                messageEl.classList.add("d-none")
-                this.renderLinks(data.document_pdfs, "pdf", meeting_id)
-                this.renderLinks(data.document_rtfs, "rtf", meeting_id)
-            }
+            document_ids.forEach(document_id => this.showTranslations(data[document_id], meetings[document_id]))
         })
     }
 }
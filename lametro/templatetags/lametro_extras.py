@@ -156,6 +156,10 @@ def updates_made(event):
     document, agenda item, status, etc), in a four-day window before the
     event's scheduled start time.
     """
+    # Precomputed by LAMetroEvent.objects.for_listing()
+    if hasattr(event, "recently_updated"):
+        return event.recently_updated
+
     four_days_before_meeting = event.start_time - timedelta(days=4)
 
     updates_made = False
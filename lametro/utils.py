@@ -3,11 +3,13 @@ import os
 import re
 import pytz
 import requests
-import sys
+import threading
 import time
 import logging
 
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
 
 from haystack.utils.highlighting import Highlighter
 
@@ -65,6 +67,29 @@ def format_full_text(full_text):
     """
     results = ""
 
+    # The subject ends at the first line break or ACTION: header after the
+    # first SUBJECT: header, so only that part of the text needs cleaning.
+    # Board reports can be long, and titles are built for many at a time.
+    start = full_text.find("SUBJECT:") if full_text else -1
+
+    if start == -1:
+        return results
+
+    ends = [
+        end
+        for end in (
+            full_text.find(terminator, start)
+            for terminator in ("\n\n", "\r\n", "\n..", "ACTION:")
+        )
+        if end != -1
+    ]
+
+    if ends:
+        # Keep the whole terminator, which is at most 7 characters
+        full_text = full_text[start : min(ends) + 7]
+    else:
+        full_text = full_text[start:]
+
     if full_text:
         clean_full_text = (
             full_text.replace("\n\n", "NEWLINE")
@@ -94,10 +119,15 @@ def get_identifier(obj_or_string):
     return obj_or_string.id
 
 
-def get_list_from_csv(filename):
+def data_file_path(filename):
     file_directory = os.path.dirname(__file__)
     absolute_file_directory = os.path.abspath(file_directory)
-    my_file = os.path.join(absolute_file_directory, "..", "data", filename)
+
+    return os.path.join(absolute_file_directory, "..", "data", filename)
+
+
+def get_list_from_csv(filename):
+    my_file = data_file_path(filename)
 
     with open(my_file) as f:
         reader = csv.DictReader(f)
@@ -118,33 +148,84 @@ class LAMetroRequestTimeoutException(Exception):
         super().__init__(f"Request to {url} took longer than {timeout} seconds.")
 
 
+_thread_locals = threading.local()
+
+
+def get_session():
+    """
+    Return a requests.Session for the current thread. Sessions pool their
+    connections, so repeated requests to the same host reuse a kept-alive
+    connection instead of opening a new one each time.
+    """
+    if not hasattr(_thread_locals, "session"):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _thread_locals.session = session
+
+    return _thread_locals.session
+
+
 def timed_get(url, params=None, **kwargs):
     """
     Convenience function to ensure GET requests that time out raise an exception.
 
-    See https://stackoverflow.com/a/71453648
+    Connecting must finish within settings.REQUEST_CONNECT_TIMEOUT, and the
+    body is streamed, checking the total timeout between reads. Each read may
+    wait up to the total timeout, so a request that stalls is abandoned within
+    twice the total timeout.
     """
 
-    TOTAL_TIMEOUT = kwargs.get("timeout", settings.REQUEST_TIMEOUT)
+    TOTAL_TIMEOUT = kwargs.pop("timeout", settings.REQUEST_TIMEOUT)
+    connect_timeout = min(settings.REQUEST_CONNECT_TIMEOUT, TOTAL_TIMEOUT)
 
-    def trace_function(frame, event, arg):
-        """
-        Makes sure our request raises an exception if the total time from
-        start to finish exceeds TOTAL_TIMEOUT.
-        """
-        if time.time() - start > TOTAL_TIMEOUT:
-            raise LAMetroRequestTimeoutException(url, TOTAL_TIMEOUT)
+    deadline = time.monotonic() + TOTAL_TIMEOUT
 
-        return trace_function
+    try:
+        resp = get_session().get(
+            url,
+            params=params,
+            timeout=(connect_timeout, TOTAL_TIMEOUT),
+            stream=True,
+            **kwargs,
+        )
+    except requests.Timeout:
+        raise LAMetroRequestTimeoutException(url, TOTAL_TIMEOUT)
+
+    content = []
+    chunks = resp.iter_content(chunk_size=8192)
 
-    start = time.time()
-    sys.settrace(trace_function)
     try:
-        resp = requests.get(url, params, **kwargs)
-    except Exception as e:
-        raise e
-    finally:
-        sys.settrace(None)
+        while True:
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0:
+                resp.close()
+                raise LAMetroRequestTimeoutException(url, TOTAL_TIMEOUT)
+
+            try:
+                content.append(next(chunks))
+            except StopIteration:
+                break
+
+    except requests.Timeout:
+        resp.close()
+        raise LAMetroRequestTimeoutException(url, TOTAL_TIMEOUT)
+
+    # requests raises read timeouts while streaming the body as connection
+    # errors
+    except requests.ConnectionError as e:
+        resp.close()
+
+        if e.args and isinstance(e.args[0], ReadTimeoutError):
+            raise LAMetroRequestTimeoutException(url, TOTAL_TIMEOUT)
+
+        raise
+
+    # Reading the body to the end returns the connection to the pool. Store
+    # what we read so .text and .json() work as usual.
+    resp._content = b"".join(content)
 
     return resp
 
@@ -16,11 +16,16 @@ from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import ensure_csrf_cookie
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition
 from django.shortcuts import render
 from django.db.models.functions import Lower, Now
 from django.db.models import (
     Max,
+    OuterRef,
+    Subquery,
     Prefetch,
     Case,
     When,
@@ -29,19 +34,22 @@ from django.db.models import (
     Q,
     F,
 )
+from django.core.paginator import Paginator
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from django.views.generic import (
     TemplateView,
     View,
 )
 from django.http import (
+    Http404,
+    HttpResponse,
     HttpResponseRedirect,
     HttpResponsePermanentRedirect,
     HttpResponseNotFound,
     JsonResponse,
 )
-from django.core.serializers import serialize
 from django.core.management import call_command
 from django.core.cache import cache
 
@@ -58,31 +66,34 @@ from councilmatic_core.views import (
 )
 from councilmatic_core.models import Organization, Membership
 
-from opencivicdata.core.models import PersonLink
-
 from lametro.models import (
     LAMetroBill,
-    LAMetroPost,
+    MapLayer,
     LAMetroPerson,
     LAMetroEvent,
     LAMetroOrganization,
     LAMetroSubject,
     EventBroadcast,
-    BoardMemberDetails,
     CommitteeDisplaySettings,
 )
 from lametro.forms import (
     LAMetroCouncilmaticSearchForm,
 )
 from lametro.services import EventService
+from lametro.services.homepage_service import HomepageService
+from lametro.services.last_modified_service import (
+    LastModifiedService,
+    conditional_page,
+)
+from lametro.services.minutes_service import MinutesService
+from lametro.services.person_service import PersonService
+from lametro.services.translation_service import TranslationService
 from lametro.exceptions import HerokuRequestError
 
 from councilmatic.settings_jurisdiction import MEMBER_BIOS
 
 from opencivicdata.legislative.models import EventDocument
 
-from .utils import get_list_from_csv, check_translations
-
 app_timezone = pytz.timezone(settings.TIME_ZONE)
 logger = logging.getLogger(__name__)
 
@@ -94,29 +105,40 @@ class LAMetroIndexView(IndexView):
     event_model = LAMetroEvent
 
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-
-        context["upcoming_board_meetings"] = self.event_model.upcoming_board_meetings()[
-            :2
-        ]
-        context["most_recent_past_meetings"] = (
-            self.event_model.most_recent_past_meetings()
+        # Skip IndexView.get_context_data, which eagerly queries for meetings
+        # this page doesn't display.
+        context = super(IndexView, self).get_context_data(**kwargs)
+
+        # The upcoming and recent meetings are rendered in cached fragments,
+        # so only query for them if the template needs to render them.
+        context["upcoming_board_meetings"] = SimpleLazyObject(
+            lambda: self.event_model.upcoming_board_meetings()[:2]
+        )
+        context["most_recent_past_meetings"] = SimpleLazyObject(
+            self.event_model.most_recent_past_meetings
         )
+        context["upcoming_committee_meetings"] = SimpleLazyObject(
+            lambda: list(self.event_model.upcoming_committee_meetings())
+        )
+        context["todays_meetings"] = SimpleLazyObject(
+            lambda: self.event_model.todays_meetings().order_by("start_date")
+        )
+        context["homepage_cache_version"] = HomepageService.cache_version()
+        context["homepage_cache_timeout"] = settings.HOMEPAGE_CACHE_TIMEOUT
+
         context["current_meeting"] = self.event_model.current_meeting()
         context["bilingual"] = bool(
             [e for e in context["current_meeting"] if e.bilingual]
         )
         context["USING_ECOMMENT"] = settings.USING_ECOMMENT
 
-        context["todays_meetings"] = self.event_model.todays_meetings().order_by(
-            "start_date"
-        )
         context["form"] = LAMetroCouncilmaticSearchForm()
 
         return context
 
 
 @method_decorator(ensure_csrf_cookie, name="get")
+@method_decorator(conditional_page(LastModifiedService.bill), name="get")
 class LABillDetail(BillDetailView):
     model = LAMetroBill
     template_name = "legislation.html"
@@ -146,6 +168,7 @@ class LABillDetail(BillDetailView):
 
 
 @method_decorator(ensure_csrf_cookie, name="get")
+@method_decorator(conditional_page(LastModifiedService.event), name="get")
 class LAMetroEventDetail(EventDetailView):
     model = LAMetroEvent
     template_name = "event/event.html"
@@ -213,6 +236,9 @@ def manual_event_live_link(request, event_slug):
 class LAMetroEventsView(EventsView):
     template_name = "events/events.html"
 
+    # Number of meeting days on each page of all events
+    days_per_page = 20
+
     def get_context_data(self, **kwargs):
         context = {}
 
@@ -229,7 +255,7 @@ class LAMetroEventsView(EventsView):
         )
 
         # A base queryset for non-test objects with media
-        media_events = LAMetroEvent.objects.with_media()
+        media_events = LAMetroEvent.objects.for_listing()
 
         # Did the user set date boundaries?
         start_date_str = self.request.GET.get("from")
@@ -258,10 +284,29 @@ class LAMetroEventsView(EventsView):
 
         # Did user request all events?
         elif self.request.GET.get("show") == "all":
-            all_events = media_events.order_by("-start_time")
+            # Page through meeting days, rather than loading every event
+            meeting_days = (
+                media_events.annotate(date=F("start_time__date"))
+                .order_by("-date")
+                .values_list("date", flat=True)
+                .distinct()
+            )
+            page = Paginator(meeting_days, self.days_per_page).get_page(
+                self.request.GET.get("page")
+            )
+
+            all_events = (
+                media_events.filter(start_time__date__in=list(page.object_list))
+                .order_by("-start_time")
+                .prefetch_related(
+                    Prefetch("documents", minutes_queryset, to_attr="minutes")
+                )
+                .prefetch_related("minutes__links")
+            )
             org_all_events = itertools.groupby(all_events, key=day_grouper)
 
             context["all_events"] = [(d, list(events)) for d, events in org_all_events]
+            context["page"] = page
 
         else:
             past_events = media_events.filter(start_time__lt=timezone.now()).order_by(
@@ -328,72 +373,54 @@ class LAMetroEventsView(EventsView):
 class LABoardMembersView(CouncilMembersView):
     template_name = "board_members/board_members.html"
 
+    recent_activity_per_page = 25
+
     def map(self):
-        maps = {
-            "map_geojson_districts": {"type": "FeatureCollection", "features": []},
-            "map_geojson_sectors": {"type": "FeatureCollection", "features": []},
-            "map_geojson_city": {"type": "FeatureCollection", "features": []},
-            "map_geojson_caltrans": {"type": "FeatureCollection", "features": []},
+        # The layers are served by map_layer. Including their versions in the
+        # URLs lets browsers cache them until the layers change.
+        return {
+            "map_layer_urls": {
+                name: f"{reverse('map_layer', args=[name])}?v={layer.etag[:12]}"
+                for name, layer in MapLayer.current().items()
+            }
         }
 
-        posts = LAMetroPost.objects.filter(shape__isnull=False)
-
-        for post in posts:
-            for feature in post.geographic_features:
-                if "council_district" in post.division_id:
-                    maps["map_geojson_districts"]["features"].append(feature)
-
-                if "la_metro_sector" in post.division_id:
-                    maps["map_geojson_sectors"]["features"].append(feature)
-
-                if (
-                    post.division_id
-                    == "ocd-division/country:us/state:ca/place:los_angeles"
-                ):
-                    maps["map_geojson_city"]["features"].append(feature)
-
-                if "caltrans" in post.division_id:
-                    maps["map_geojson_caltrans"]["features"].append(feature)
-
-        if len(maps["map_geojson_caltrans"]) > 1:
-            maps["map_geojson_caltrans"]["features"] = [
-                f
-                for f in maps["map_geojson_caltrans"]["features"]
-                if f["properties"]["council_member"] != "Vacant"
-            ]
-
-        return maps
-
     def get_queryset(self):
         board = Organization.objects.get(name=settings.OCD_CITY_COUNCIL_NAME)
 
-        memberships = board.memberships.filter(
-            Q(role="Board Member") | Q(role="Nonvoting Board Member")
-        ).filter(start_date_dt__lt=Now(), end_date_dt__gte=Now())
-
-        display_order = {
-            "Chair": 0,
-            "Vice Chair": 1,
-            "1st Chair": 1,
-            "1st Vice Chair": 1,
-            "2nd Chair": 2,
-            "2nd Vice Chair": 2,
-            "Board Member": 3,
-            "Nonvoting Board Member": 4,
-        }
-
-        sortable_memberships = []
-
-        # Display board leadership first. Person.board_office is null for
-        # members without leadership roles, so fall back to using their
-        # board membership role to decide display order.
-        for m in memberships:
-            primary_post = m.person.board_office or m
-            m.index = display_order[primary_post.role]
-            sortable_memberships.append(m)
+        # Board leadership, e.g., Chair, is held in a separate membership from
+        # the member's seat on the board
+        board_office = Membership.objects.filter(
+            person_id=OuterRef("person_id"),
+            organization__name=settings.OCD_CITY_COUNCIL_NAME,
+            role__in=LAMetroPerson.BOARD_OFFICE_ROLES,
+            start_date_dt__lte=Now(),
+            end_date_dt__gt=Now(),
+        ).values("role")[:1]
+
+        # Display board leadership first. Members without leadership roles
+        # are ordered by their board membership role.
+        display_order = Case(
+            When(office_role="Chair", then=Value(0)),
+            When(
+                office_role__in=("Vice Chair", "1st Chair", "1st Vice Chair"),
+                then=Value(1),
+            ),
+            When(office_role__in=("2nd Chair", "2nd Vice Chair"), then=Value(2)),
+            When(role="Board Member", then=Value(3)),
+            When(role="Nonvoting Board Member", then=Value(4)),
+            output_field=IntegerField(),
+        )
 
-        return sorted(
-            sortable_memberships, key=lambda x: (x.index, x.person.family_name)
+        return (
+            board.memberships.filter(
+                Q(role="Board Member") | Q(role="Nonvoting Board Member")
+            )
+            .filter(start_date_dt__lt=Now(), end_date_dt__gte=Now())
+            .select_related("person", "post")
+            .annotate(office_role=Subquery(board_office))
+            .annotate(index=display_order)
+            .order_by("index", "person__family_name")
         )
 
     def get_context_data(self, *args, **kwargs):
@@ -402,9 +429,12 @@ class LABoardMembersView(CouncilMembersView):
         context["seo"] = self.get_seo_blob()
 
         board = LAMetroOrganization.objects.get(name=settings.OCD_CITY_COUNCIL_NAME)
-        context["recent_activity"] = board.actions.order_by(
+        recent_activity = board.actions.select_related("bill").order_by(
             "-date", "-bill__identifier", "-order"
         )
+        context["recent_activity"] = Paginator(
+            recent_activity, self.recent_activity_per_page
+        ).get_page(self.request.GET.get("activity"))
         context["recent_events"] = board.recent_events
 
         if settings.MAP_CONFIG:
@@ -413,6 +443,33 @@ class LABoardMembersView(CouncilMembersView):
         return context
 
 
+def map_layer_etag(request, name):
+    """
+    Return the ETag of a layer, keeping the layer on the request for
+    map_layer, so it's only read once.
+    """
+    if name not in MapLayer.LAYERS:
+        return None
+
+    request.map_layer = MapLayer.get(name)
+    return request.map_layer.etag
+
+
+# Browsers revalidate layers on each use, so a new map is shown as soon as it's
+# rebuilt, and an unchanged one costs a 304
+@gzip_page
+@cache_control(public=True, no_cache=True)
+@condition(etag_func=map_layer_etag)
+def map_layer(request, name):
+    """
+    Serve one layer of the board members map as GeoJSON.
+    """
+    if name not in MapLayer.LAYERS:
+        raise Http404
+
+    return HttpResponse(request.map_layer.geojson, content_type="application/geo+json")
+
+
 class LACommitteesView(CommitteesView):
     template_name = "committees.html"
 
@@ -443,6 +500,7 @@ class LACommitteesView(CommitteesView):
         return qs
 
 
+@method_decorator(conditional_page(LastModifiedService.committee), name="get")
 class LACommitteeDetailView(CommitteeDetailView):
     model = LAMetroOrganization
     template_name = "committee.html"
@@ -481,6 +539,7 @@ class LACommitteeDetailView(CommitteeDetailView):
         return context
 
 
+@method_decorator(conditional_page(LastModifiedService.person), name="get")
 class LAPersonDetailView(PersonDetailView):
     template_name = "person/person.html"
     model = LAMetroPerson
@@ -513,70 +572,26 @@ class LAPersonDetailView(PersonDetailView):
 
         return response
 
+    def get_queryset(self):
+        return PersonService.queryset()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         person = context["person"]
 
-        try:
-            person_details = BoardMemberDetails.objects.get(person=person)
-        except BoardMemberDetails.DoesNotExist:
-            context["person_details"] = None
-        else:
-            context["person_details"] = (
-                person_details.live_revision.as_object()
-                if person_details.live_revision
-                else None
-            )
-
-        council_post = (
-            person.latest_council_membership.post
-            if person.latest_council_membership
-            else ""
-        )
+        profile = PersonService.get_profile(person)
 
-        try:
-            context["qualifying_post"] = council_post.acting_label
-        except AttributeError:
-            context["qualifying_post"] = None
-
-        try:
-            if council_post.shape:
-                context["map_geojson"] = serialize(
-                    "geojson", [council_post], geometry_field="shape", fields=()
-                )
-            else:
-                context["map_geojson"] = None
-        except AttributeError:
-            context["map_geojson"] = None
-
-        if person.committee_sponsorships:
-            context["sponsored_legislation"] = person.committee_sponsorships
-        else:
-            context["sponsored_legislation"] = []
-
-        context["memberships_list"] = (
-            person.current_memberships.exclude(organization__name="Board of Directors")
-            .annotate(
-                index=Case(
-                    When(role="Chair", then=Value(0)),
-                    When(role="Vice Chair", then=Value(1)),
-                    When(role="1st Vice Chair", then=Value(1)),
-                    When(role="2nd Vice Chair", then=Value(2)),
-                    When(role="Member", then=Value(3)),
-                    default=Value(999),
-                    output_field=IntegerField(),
-                )
-            )
-            .order_by("index")
-        )
+        context["person_details"] = profile.person_details
+        context["qualifying_post"] = profile.qualifying_post
+        context["map_geojson"] = profile.map_geojson
+        context["sponsored_legislation"] = profile.sponsored_legislation
+        context["memberships_list"] = profile.memberships_list
 
         if person.slug_name in MEMBER_BIOS:
             context["member_bio"] = MEMBER_BIOS[person.slug_name]
 
-        try:
-            context["website_url"] = person.links.get(note="web_site").url
-        except PersonLink.DoesNotExist:
-            pass
+        if profile.website_url:
+            context["website_url"] = profile.website_url
 
         return context
 
@@ -731,92 +746,8 @@ class LAMetroContactView(IndexView):
 class MinutesView(EventsView):
     template_name = "minutes/minutes.html"
 
-    def _get_historical_events(self, start_datetime=None, end_datetime=None):
-        csv_events = get_list_from_csv("historical_events.csv")
-
-        filtered_historical_events = []
-        if start_datetime or end_datetime:
-            for e in csv_events:
-                e_datetime = datetime.strptime(e["date"], "%Y-%m-%d")
-                if start_datetime and end_datetime:
-                    if e_datetime >= start_datetime and e_datetime <= end_datetime:
-                        filtered_historical_events.append(e)
-                elif start_datetime:
-                    if e_datetime >= start_datetime:
-                        filtered_historical_events.append(e)
-                elif end_datetime:
-                    if e_datetime <= end_datetime:
-                        filtered_historical_events.append(e)
-        else:
-            filtered_historical_events = csv_events
-
-        for obj in filtered_historical_events:
-            obj["start_time"] = timezone.make_aware(
-                datetime.strptime(obj["date"], "%Y-%m-%d")
-            ).date()
-            obj["agenda_link"] = obj["agenda_link"].split("\n")
-            obj["minutes_link"] = obj["minutes_link"].split("\n")
-
-        return filtered_historical_events
-
-    def _get_stored_events(self, start_datetime=None, end_datetime=None):
-        # we only want to display meetings that can have minutes
-        meetings_with_minutes = (
-            Q(event__name__icontains="LA SAFE")
-            | Q(event__name__icontains="Board Meeting")
-            | Q(event__name__icontains="Crenshaw Project Corporation")
-        )
-
-        minutes = EventDocument.objects.filter(
-            meetings_with_minutes, note__icontains="minutes"
-        ).prefetch_related(Prefetch("links", to_attr="prefetched_links"))
-
-        agenda = EventDocument.objects.filter(
-            meetings_with_minutes, note__icontains="agenda"
-        ).prefetch_related(Prefetch("links", to_attr="prefetched_links"))
-
-        all_events = (
-            LAMetroEvent.objects.filter(meetings_with_minutes)
-            .prefetch_related(
-                Prefetch("documents", queryset=minutes, to_attr="minutes_document")
-            )
-            .prefetch_related(
-                Prefetch("documents", queryset=agenda, to_attr="agenda_document")
-            )
-        )
-
-        if start_datetime:
-            stored_events = all_events.filter(start_time__gt=start_datetime)
-        else:
-            stored_events = all_events
-        if end_datetime:
-            stored_events = stored_events.filter(start_time__lt=end_datetime)
-        else:
-            stored_events = stored_events.filter(start_time__lt=timezone.now())
-
-        structured_db_events = []
-        for event in stored_events:
-            stored_events_dict = {
-                "start_time": event.start_time.date(),
-                "meeting": event.name,
-                "minutes_link": [],
-                "agenda_link": [],
-            }
-            try:
-                minutes_link = event.minutes_document[0].prefetched_links[0].url
-                stored_events_dict["minutes_link"].append(minutes_link)
-            except IndexError:
-                pass
-
-            try:
-                agenda_link = event.agenda_document[0].prefetched_links[0].url
-                stored_events_dict["agenda_link"].append(agenda_link)
-            except IndexError:
-                pass
-
-            structured_db_events.append(stored_events_dict)
-
-        return structured_db_events
+    # Number of meeting days on each page
+    days_per_page = 50
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -835,23 +766,21 @@ class MinutesView(EventsView):
         context["start_date"] = start_date_str
         context["end_date"] = end_date_str
 
-        historical_events = self._get_historical_events(start_datetime, end_datetime)
-        stored_events = self._get_stored_events(start_datetime, end_datetime)
+        try:
+            page = max(int(self.request.GET.get("page", 1)), 1)
+        except ValueError:
+            page = 1
 
-        # sort and group csv and db events together
-        all_minutes = historical_events + stored_events
-        all_minutes_sorted = sorted(
-            all_minutes, key=lambda x: x["start_time"], reverse=True
+        context["all_minutes"], has_next = MinutesService.get_minutes(
+            start_datetime, end_datetime, page, self.days_per_page
         )
 
-        all_minutes_grouped = []
-        for event_date, events in itertools.groupby(
-            all_minutes_sorted, key=lambda x: x["start_time"]
-        ):
-            events = sorted(events, key=lambda x: x["start_time"])
-            all_minutes_grouped.append([event_date, events])
+        query = self.request.GET.copy()
+        query.pop("page", None)
 
-        context["all_minutes"] = all_minutes_grouped
+        context["query_string"] = query.urlencode()
+        context["previous_page"] = page - 1 if page > 1 else None
+        context["next_page"] = page + 1 if has_next else None
 
         return context
 
@@ -951,15 +880,35 @@ class TranslationFilesView(View):
         if entity_type not in ("event", "bill"):
             return JsonResponse({"error": "invalid entity_type"}, status=400)
 
-        response = check_translations(document_id, entity_type)
-        result = {"document_pdfs": [], "document_rtfs": []}
-        if response:
-            result = {
-                "document_pdfs": response["pdf"],
-                "document_rtfs": response["rtf"],
-            }
+        return JsonResponse(TranslationService.get_files(document_id, entity_type))
+
 
-        return JsonResponse(result)
+class TranslationFilesBatchView(View):
+    """
+    Return the translated files of several documents of the same entity type
+    in one response, keyed by document ID.
+    """
+
+    MAX_DOCUMENTS = 50
+
+    def post(self, request):
+        entity_type = request.POST.get("entity_type")
+        if entity_type not in ("event", "bill"):
+            return JsonResponse({"error": "invalid entity_type"}, status=400)
+
+        document_ids = request.POST.getlist("document_id")
+        if not document_ids or len(document_ids) > self.MAX_DOCUMENTS:
+            return JsonResponse(
+                {
+                    "error": "provide between 1 and "
+                    f"{self.MAX_DOCUMENTS} document_id values"
+                },
+                status=400,
+            )
+
+        return JsonResponse(
+            TranslationService.get_files_many(document_ids, entity_type)
+        )
 
 
 def metro_login(request):
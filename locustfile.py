@@ -1,15 +1,18 @@
-from locust import HttpUser, TaskSet, task, between
+from locust import HttpUser, TaskSet, task, tag, between
 
 
 class UserBehavior(TaskSet):
+    @tag("index")
     @task
     def index(self):
         self.client.get("/")
 
+    @tag("events")
     @task
     def events(self):
         self.client.get("/events/")
 
+    @tag("event_detail")
     @task
     def event_detail(self):
         self.client.get("/event/regular-board-meeting-9db63964de28/")
@@ -4,7 +4,11 @@ if [ -n "${PRODUCTION}" ] || [ -n "${STAGING}" ] || [ -n "${WAGTAIL_STAGING}" ];
 
     python manage.py migrate --noinput
     python manage.py createcachetable
+    python manage.py refresh_visible_bills
+    python manage.py refresh_latest_actions
+    python manage.py refresh_recent_committee_bills
     python manage.py import_shapes data/final/boundary.geojson
+    python manage.py refresh_map_layers
     python manage.py clear_cache
 
     if [ `psql ${DATABASE_URL} -tAX -c "SELECT COUNT(*) FROM wagtailcore_page"` -eq "1" ]; then
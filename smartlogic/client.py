@@ -1,8 +1,12 @@
 from django.conf import settings
+from django.core.cache import cache
 
+import hashlib
 import json
+import threading
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError, ConnectTimeout, ReadTimeout
 
 from smartlogic.exceptions import (
@@ -12,11 +16,30 @@ from smartlogic.exceptions import (
     ResponseNotSerializable,
 )
 
+_thread_locals = threading.local()
+
+
+def get_session():
+    """
+    Return a requests.Session for the current thread, so that requests to SES
+    reuse a kept-alive connection instead of opening a new one each time.
+    """
+    if not hasattr(_thread_locals, "session"):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10)
+        session.mount("https://", adapter)
+        _thread_locals.session = session
+
+    return _thread_locals.session
+
 
 class SmartLogic(object):
     BASE_URL = "https://metro.data.progress.cloud"
     SERVICE_URL = f"/semantic/{'test' if settings.DEBUG else 'prod'}/CombinedModel"
 
+    # Seconds before a cached token expires to stop using it
+    TOKEN_EXPIRY_MARGIN = 5 * 60
+
     def __init__(self, api_key, authorization=None):
         self.api_key = api_key
         self._authorization = authorization
@@ -37,11 +60,18 @@ class SmartLogic(object):
         url = f"{self.BASE_URL}{route}"
 
         try:
-            response = getattr(requests, method)(url, timeout=5, **requests_kwargs)
+            response = get_session().request(method, url, timeout=5, **requests_kwargs)
         except (HTTPError, ConnectTimeout, ReadTimeout):
             raise
 
         if response.status_code == 403:
+            # Only drop the cached token if it's the one rejected, rather than,
+            # e.g., a token passed in by a browser using autocomplete
+            access_token = cache.get(self.token_cache_key)
+
+            if access_token and self._authorization == f"Bearer {access_token}":
+                cache.delete(self.token_cache_key)
+
             raise AuthenticationFailed
 
         elif response.status_code >= 400:
@@ -60,6 +90,31 @@ class SmartLogic(object):
         data = {"grant_type": "apikey", "key": self.api_key}
         return self.endpoint("post", "/token", data=data)
 
+    @property
+    def token_cache_key(self):
+        return "smartlogic_token:{}".format(
+            hashlib.sha256(self.api_key.encode()).hexdigest()
+        )
+
+    def authenticate(self):
+        """
+        Authorize subsequent requests with an access token for the API key.
+        Tokens are cached until shortly before they expire, so that they're
+        shared between requests and command runs.
+        """
+        access_token = cache.get(self.token_cache_key)
+
+        if not access_token:
+            token = self.token()
+            access_token = token["access_token"]
+            timeout = int(token.get("expires_in", 0)) - self.TOKEN_EXPIRY_MARGIN
+
+            if timeout > 0:
+                cache.set(self.token_cache_key, access_token, timeout)
+
+        self._authorization = f"Bearer {access_token}"
+        return self
+
     def terms(self, params):
         return self.endpoint(
             "post",
@@ -387,6 +387,8 @@ def mocked_streaming_meeting(mocker):
     mock_response = mocker.MagicMock(spec=requests.Response)
     mock_response.status_code = 200
 
-    mocker.patch("lametro.models.requests.get", return_value=mock_response)
+    mocker.patch(
+        "lametro.services.live_media_service.timed_get", return_value=mock_response
+    )
 
     return mock_response
@@ -1,12 +1,17 @@
 import json
 import os
 
+from django.core.cache import caches
+from django.core.management import call_command
 from django.urls import reverse
 import pytest
 import requests
+import requests_mock
 
 from lametro.models import LAMetroEvent
 from lametro.api import SmartLogicAPI
+from smartlogic.client import get_session
+from smartlogic.exceptions import AuthenticationFailed
 from smartlogic.views import SmartLogic
 
 
@@ -49,7 +54,10 @@ def test_public_comment_endpoint_one_meeting(
     ]  # GUIDs in running events endpoint are all lowercase.
     mock_response.status_code = 200
 
-    mocker.patch("lametro.models.requests.get", return_value=mock_response)
+    mocker.patch(
+        "lametro.services.live_media_service.timed_get", return_value=mock_response
+    )
+    call_command("poll_live_media", "--once")
 
     response = client.get(reverse("lametro:public_comment"), follow=True)
     _test_redirect(response, ecomment_url)
@@ -119,6 +127,104 @@ def test_lametro_smartlogic_api_relate(client, metro_subject, mocker):
     assert response["subjects"][0]["guid"] == b_line.guid
 
 
+def test_lametro_smartlogic_api_cached(
+    client, metro_subject, settings, mocker, django_assert_num_queries
+):
+    settings.CACHES = {
+        alias: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": f"test_smartlogic_api_cached_{alias}",
+        }
+        for alias in ("default", "live_media", "smartlogic")
+    }
+    _mock_smartlogic(mocker, "suggest_concepts.json")
+
+    red_line = metro_subject.build(
+        name="Metro Red Line",
+        guid="1031d836-2d8b-4c20-b3c1-1487f0d503e6",
+    )
+
+    suggest = reverse(
+        "lametro_ses_endpoint", kwargs={"term": "red line", "action": "suggest"}
+    )
+    relate = reverse(
+        "lametro_ses_endpoint", kwargs={"term": "red line", "action": "relate"}
+    )
+
+    response = client.get(suggest, {"maxResultCount": 10}).json()
+    assert response["subjects"][0]["guid"] == red_line.guid
+
+    # Repeated requests for the same term are served without calling SES or
+    # querying for subjects, whatever the action
+    with django_assert_num_queries(0):
+        assert client.get(suggest, {"maxResultCount": 10}).json() == response
+        client.get(relate, {"maxResultCount": 10})
+
+    assert SmartLogicAPI.get_queryset.call_count == 1
+
+    # Concepts are kept in process memory, out of the site cache
+    assert len(caches["smartlogic"]._cache) == 1
+    assert not any("smartlogic_concepts" in key for key in caches["default"]._cache)
+
+    # Changing subjects rebuilds the map of subject names
+    red_line.name = "Metro B Line"
+    red_line.save()
+
+    response = client.get(suggest, {"maxResultCount": 10}).json()
+    assert response["subjects"][0]["name"] == "Metro B Line"
+    assert SmartLogicAPI.get_queryset.call_count == 1
+
+
+def test_smartlogic_client_reuses_connections_and_tokens(settings, mocker):
+    settings.CACHES = {
+        alias: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": f"test_smartlogic_client_{alias}",
+        }
+        for alias in ("default", "live_media")
+    }
+    session_request = mocker.spy(get_session(), "request")
+
+    with requests_mock.Mocker() as m:
+        token = m.post(
+            f"{SmartLogic.BASE_URL}/token",
+            json={"access_token": "foo", "expires_in": 3600},
+        )
+        concepts = m.get(
+            f"{SmartLogic.BASE_URL}{SmartLogic.SERVICE_URL}/concepts/bus.json",
+            json={"terms": []},
+        )
+
+        for _ in range(2):
+            SmartLogic("test key").authenticate().concepts("bus", {})
+
+    # The token is requested once, then read from the cache
+    assert token.call_count == 1
+    assert concepts.call_count == 2
+    assert concepts.last_request.headers["Authorization"] == "Bearer foo"
+
+    # Every request goes through the same pooled session
+    assert session_request.call_count == 3
+
+    # Tokens that are no longer accepted are dropped from the cache, but only
+    # if the rejected token is the cached one
+    with requests_mock.Mocker() as m:
+        m.get(
+            f"{SmartLogic.BASE_URL}{SmartLogic.SERVICE_URL}/concepts/bus.json",
+            status_code=403,
+        )
+
+        with pytest.raises(AuthenticationFailed):
+            SmartLogic("test key", authorization="Bearer expired").concepts("bus", {})
+
+        assert caches["default"].get(SmartLogic("test key").token_cache_key) == "foo"
+
+        with pytest.raises(AuthenticationFailed):
+            SmartLogic("test key").authenticate().concepts("bus", {})
+
+    assert caches["default"].get(SmartLogic("test key").token_cache_key) is None
+
+
 @pytest.mark.django_db
 def test_fetch_object_counts(client, bill, event):
     bill.build(classification=["Board Box"])
@@ -133,3 +239,61 @@ def test_fetch_object_counts(client, bill, event):
     assert response["status_code"] == 200
     assert response["bill_count"] == 1
     assert response["event_count"] == 1
+
+
+@pytest.mark.django_db
+def test_two_level_cache(client, settings, mocker):
+    settings.CACHES = {
+        "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "default": {
+            "BACKEND": "lametro.cache_backends.TwoLevelCache",
+            "LOCATION": "test_two_level_cache",
+            "OPTIONS": {"SHARED": "shared", "LOCAL_TIMEOUT": 30},
+        },
+    }
+
+    cache, shared = caches["default"], caches["shared"]
+    shared_get = mocker.spy(shared, "get")
+
+    cache.set("key", "value")
+    assert shared.get("key") == "value"
+    shared_get.reset_mock()
+
+    # Read from process memory, without touching the shared tier
+    assert cache.get("key") == "value"
+    assert not shared_get.called
+
+    # A value written by another process is read through to the shared tier...
+    shared.set("other_key", "other value")
+    assert cache.get("other_key") == "other value"
+    assert shared_get.call_count == 1
+
+    # ...and then kept locally
+    assert cache.get("other_key") == "other value"
+    assert shared_get.call_count == 1
+
+    cache.delete("key")
+    assert cache.get("key") is None
+    assert shared.get("key") is None
+
+    # While another process holds the lock, wait for it to fill in the value,
+    # rather than computing it again
+    shared.add("computed:lock", 1)
+    mocker.patch(
+        "lametro.cache_backends.time.sleep",
+        side_effect=lambda seconds: shared.set("computed", "from another process"),
+    )
+    compute = mocker.Mock(return_value="from this process")
+
+    assert cache.get_or_set("computed", compute) == "from another process"
+    assert not compute.called
+
+    shared.delete("computed:lock")
+    assert cache.get_or_set("uncomputed", compute) == "from this process"
+    assert compute.call_count == 1
+    assert shared.get("uncomputed:lock") is None
+
+    response = client.get("/object-counts/test api key").json()
+
+    assert response["cache"]["default"] == cache.stats()
+    assert response["cache"]["default"]["local_hits"] == 3
@@ -1,9 +1,13 @@
 from datetime import timedelta, datetime
+import importlib
 import logging
+from unittest.mock import patch
 from uuid import uuid4
 
 import pytest
+import requests_mock
 
+from django.core.management import call_command
 from django.urls import reverse
 from django.utils import timezone
 from django.core.exceptions import ObjectDoesNotExist
@@ -13,7 +17,13 @@ from opencivicdata.legislative.models import (
     EventParticipant,
 )
 from councilmatic_core.models import Event
-from lametro.models import LAMetroBill
+from lametro.models import (
+    BillLatestAction,
+    LAMetroBill,
+    TranslationNotification,
+    VisibleBill,
+)
+from lametro.services import last_modified_service
 from lametro.utils import format_full_text
 
 
@@ -151,6 +161,64 @@ def test_bill_manager(
         assert is_public == (some_bill in bill_qs_with_manager)
 
 
+def test_visible_bills(bill):
+    public_bill = bill.build(classification=["Board Box"])
+    assert LAMetroBill.objects.filter(id=public_bill.id).exists()
+
+    # Visibility is updated when the bill changes
+    public_bill.extras["restrict_view"] = True
+    public_bill.save()
+    assert not LAMetroBill.objects.filter(id=public_bill.id).exists()
+
+    # ...and rebuilt by the refresh command
+    public_bill.extras["restrict_view"] = False
+    LAMetroBill._base_manager.filter(id=public_bill.id).update(
+        extras=public_bill.extras
+    )
+    assert not LAMetroBill.objects.filter(id=public_bill.id).exists()
+
+    call_command("refresh_visible_bills")
+    assert list(VisibleBill.objects.values_list("bill_id", flat=True)) == [
+        public_bill.id
+    ]
+
+    # Bills made private without signals, e.g., by the scrapers, are hidden
+    # before the table is refreshed
+    public_bill.extras["restrict_view"] = True
+    LAMetroBill._base_manager.filter(id=public_bill.id).update(
+        extras=public_bill.extras
+    )
+    assert VisibleBill.objects.filter(bill_id=public_bill.id).exists()
+    assert not LAMetroBill.objects.filter(id=public_bill.id).exists()
+
+
+def test_bill_latest_action(bill, bill_action):
+    some_bill = bill.build(classification=["Board Box"])
+    assert some_bill.latest_action.description == ""
+    assert some_bill.inferred_status is None
+
+    bill_action.build(bill=some_bill, order=1)
+    adopted = bill_action.build(bill=some_bill, description="ADOPTED", order=2)
+
+    some_bill = LAMetroBill.objects.with_latest_actions().get(pk=some_bill.pk)
+    assert some_bill.last_action_description == "ADOPTED"
+    assert some_bill.last_action_status == "Adopted"
+    assert str(some_bill.latest_action.date) == adopted.date
+    assert some_bill.inferred_status == "Adopted"
+
+    adopted.delete()
+    some_bill.refresh_from_db()
+    assert some_bill.latest_action.description == "test action"
+
+    # Bills without a stored latest action fall back to their actions
+    BillLatestAction.objects.all().delete()
+    some_bill = LAMetroBill.objects.get(pk=some_bill.pk)
+    assert some_bill.latest_action_description == "test action"
+
+    call_command("refresh_latest_actions")
+    assert BillLatestAction.objects.get(bill=some_bill).description == "test action"
+
+
 @pytest.mark.django_db
 def test_last_action_date_has_already_occurred(bill, event):
     some_bill = bill.build()
@@ -265,6 +333,54 @@ def test_actions_and_agendas(
     assert expected_agenda["description"] == "SCHEDULED"
 
 
+@pytest.mark.django_db
+def test_actions_and_agendas_for_bills(
+    bill,
+    bill_action,
+    event,
+    event_agenda_item,
+    event_related_entity,
+    django_assert_num_queries,
+):
+    bills = []
+
+    for i in range(3):
+        some_bill = bill.build(
+            id="ocd-bill/{}".format(uuid4()),
+            identifier="2017-000{}".format(i),
+            slug="2017-000{}".format(i),
+        )
+        some_action = bill_action.build(bill=some_bill)
+        action_org = some_action.organization
+
+        some_event = event.build(
+            id="ocd-event/{}".format(uuid4()),
+            name=action_org.name,
+            start_date="{} 12:00".format(some_action.date),
+        )
+        EventParticipant.objects.create(
+            name=action_org.name,
+            organization=action_org,
+            entity_type="organization",
+            event=some_event,
+        )
+
+        some_agenda_item = event_agenda_item.build(event=some_event)
+        event_related_entity.build(agenda_item=some_agenda_item, bill=some_bill)
+
+        bills.append(some_bill)
+
+    # The number of queries does not depend on the number of bills or actions
+    with django_assert_num_queries(5):
+        aaa_by_bill = LAMetroBill.actions_and_agendas_for_bills(bills)
+
+    for some_bill in bills:
+        aaa = aaa_by_bill[some_bill.pk]
+
+        assert aaa == some_bill.actions_and_agendas
+        assert [a["description"] for a in aaa] == ["SCHEDULED", "test action"]
+
+
 @pytest.mark.django_db
 def test_related_bill_respects_privacy(bill):
     primary_bill = bill.build()
@@ -296,3 +412,207 @@ def test_private_bill(client, bill):
     url = reverse("lametro:bill_detail", kwargs={"slug": private_bill.slug})
     response = client.get(url)
     assert response.status_code == 404
+
+
+def test_bill_detail_conditional_get(
+    client, admin_client, bill, alert, django_assert_max_num_queries
+):
+    some_bill = bill.build(classification=["Board Box"])
+    url = reverse("lametro:bill_detail", kwargs={"slug": some_bill.slug})
+
+    response = client.get(url)
+    etag = response["ETag"]
+
+    assert response.status_code == 200
+    assert response.has_header("Last-Modified")
+    assert "no-cache" in response["Cache-Control"]
+
+    # An unchanged page isn't queried for or rendered again
+    with django_assert_max_num_queries(7):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=client.get(url)["Last-Modified"])
+    assert response.status_code == 304
+
+    # Changing the bill changes its ETag
+    some_bill.save()
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+    # As does adding an alert, which is shown on every page
+    etag = response["ETag"]
+    alert.build(description="Service is suspended")
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert b"Service is suspended" in response.content
+    assert response["ETag"] != etag
+
+    # Pages are always rendered for signed in users
+    response = admin_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 200
+    assert not response.has_header("ETag")
+
+
+def test_bill_detail_etag_is_the_same_in_every_process(client, bill, settings):
+    settings.RELEASED_AT = timezone.now() - timedelta(days=2)
+
+    some_bill = bill.build(classification=["Board Box"])
+    LAMetroBill.objects.filter(pk=some_bill.pk).update(
+        updated_at=timezone.now() - timedelta(days=30)
+    )
+    url = reverse("lametro:bill_detail", kwargs={"slug": some_bill.slug})
+
+    etag = client.get(url)["ETag"]
+
+    # A worker started later, e.g., after being recycled, gives the same ETag
+    later = timezone.now() + timedelta(minutes=5)
+
+    with patch("django.utils.timezone.now", return_value=later):
+        importlib.reload(last_modified_service)
+
+    assert client.get(url)["ETag"] == etag
+
+    # A new release changes it
+    settings.RELEASED_AT = timezone.now()
+
+    assert client.get(url)["ETag"] != etag
+
+
+def test_build_translation_notifications(bill, event, event_document):
+    some_bill = bill.build(
+        classification=["Board Box"],
+        extras={
+            "restrict_view": False,
+            "plain_text": "..Subject\nSUBJECT:\tFOOD SERVICE OPERATOR\n\n..Action",
+        },
+    )
+    board_report = some_bill.versions.create(note="Board Report", date="2024-01-01")
+    board_report.links.create(url="https://metro.test/report.pdf")
+
+    some_event = event.build()
+    agenda = event_document.build(event_id=some_event.id, note="Agenda")
+
+    # Entities without documents aren't notified about
+    bill.build(
+        id="ocd-bill/00000000-0000-0000-0000-000000000000",
+        slug="no-report",
+        classification=["Board Box"],
+    )
+
+    call_command("build_translation_notifications")
+
+    bill_notification = TranslationNotification.objects.get(entity_type="bill")
+    assert bill_notification.bill_id == some_bill.id
+    assert bill_notification.data["title"] == "2017-0686 - FOOD SERVICE OPERATOR"
+    assert bill_notification.data["source_url"] == "https://metro.test/report.pdf"
+    assert bill_notification.data["document_id"] == str(board_report.pk)
+
+    event_notification = TranslationNotification.objects.get(entity_type="event")
+    assert event_notification.event_id == some_event.id
+    assert event_notification.data["document_id"] == str(agenda.pk)
+    assert event_notification.data["source_url"] == agenda.links.get().url
+
+
+@pytest.mark.django_db
+def test_notify_translation_suite(settings):
+    settings.TRANSLATION_SUITE_URL = "translations.test"
+
+    TranslationNotification.objects.bulk_create(
+        TranslationNotification(entity_type="bill", data={"document_id": str(i)})
+        for i in range(5)
+    )
+
+    def respond(request, context):
+        documents = request.json()["documents"]
+
+        # The suite rejects any request containing a bad document
+        if {"document_id": "3"} in documents:
+            context.status_code = 400
+            return {"error": "Bad document"}
+
+        return {}
+
+    with requests_mock.Mocker() as m:
+        m.post("https://translations.test/api/update-documents/", json=respond)
+
+        call_command("notify_translation_suite", batch_size=2, workers=2)
+
+    # Chunks are identified by their notifications
+    keys = {request.headers["Idempotency-Key"] for request in m.request_history}
+    assert len(keys) == 5
+
+    # Rejected chunks are split, so the bad document only fails itself
+    statuses = dict(
+        TranslationNotification.objects.values_list("data__document_id", "status")
+    )
+    assert statuses == {
+        "0": "delivered",
+        "1": "delivered",
+        "2": "delivered",
+        "3": "failed",
+        "4": "delivered",
+    }
+
+    # Chunks that fail for any other reason aren't split
+    TranslationNotification.objects.update(status="waiting")
+
+    with requests_mock.Mocker() as m:
+        m.post("https://translations.test/api/update-documents/", status_code=401)
+
+        call_command("notify_translation_suite", batch_size=2, workers=2)
+
+    assert m.call_count == 3
+    assert not TranslationNotification.objects.exclude(status="failed").exists()
+
+
+@pytest.mark.django_db
+def test_translation_files_are_cached(client, settings, mocker):
+    settings.CACHES = {
+        alias: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": f"test_translation_files_{alias}",
+        }
+        for alias in ("default", "live_media")
+    }
+    settings.TRANSLATION_SUITE_URL = "translations.test"
+
+    translated = {"pdf": [{"url": "https://translations.test/1.pdf"}], "rtf": []}
+    check_translations = mocker.patch(
+        "lametro.services.translation_service.check_translations",
+        side_effect=lambda document_id, entity_type: (
+            translated if document_id == "1" else None
+        ),
+    )
+
+    response = client.post(
+        reverse("translations"), {"entity_type": "bill", "document_id": ["1", "2"]}
+    )
+
+    assert response.json() == {
+        "1": {"document_pdfs": translated["pdf"], "document_rtfs": []},
+        "2": {"document_pdfs": [], "document_rtfs": []},
+    }
+    assert check_translations.call_count == 2
+
+    # Documents are looked up once, whether alone or in a batch
+    response = client.post(reverse("translation", args=["2"]), {"entity_type": "bill"})
+
+    assert response.json() == {"document_pdfs": [], "document_rtfs": []}
+    assert check_translations.call_count == 2
+
+    # Delivering a notification about a document drops its cached files
+    TranslationNotification.objects.create(
+        entity_type="bill", data={"document_id": "2"}
+    )
+
+    with requests_mock.Mocker() as m:
+        m.post("https://translations.test/api/update-documents/", json={})
+        call_command("notify_translation_suite")
+
+    client.post(reverse("translation", args=["2"]), {"entity_type": "bill"})
+    assert check_translations.call_count == 3
@@ -45,7 +45,7 @@ def test_event_admin_renders_based_on_context(
     dummy_service.get_agenda = get_agenda
 
     mocker.patch(
-        "lametro.views.check_translations",
+        "lametro.services.translation_service.check_translations",
         return_value={"pdf": [], "rtf": []},
     )
     with requests_mock.Mocker() as m:
@@ -1,6 +1,7 @@
+import os
 import pytest
 import re
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from uuid import uuid4
 from unittest.mock import patch
 
@@ -14,6 +15,8 @@ import requests_mock
 from opencivicdata.legislative.models import EventLocation
 
 from lametro.models import LAMetroEvent, app_timezone, EventBroadcast, EventNotice
+from lametro.services import minutes_service
+from lametro.services.minutes_service import MinutesService
 from lametro.templatetags.lametro_extras import updates_made
 
 
@@ -22,7 +25,12 @@ def mock_streaming_meetings(mocker, return_value=None):
     mock_response.json.return_value = return_value if return_value else []
     mock_response.status_code = 200
 
-    mocker.patch("lametro.models.requests.get", return_value=mock_response)
+    mocker.patch(
+        "lametro.services.live_media_service.timed_get", return_value=mock_response
+    )
+
+    # Pages read running events from a snapshot maintained by the poller
+    call_command("poll_live_media", "--once")
 
     return mock_response
 
@@ -71,6 +79,34 @@ def test_updates_made(event, event_document, mocker, has_updates, has_agenda):
         assert updates_made(event) == (has_updates and has_agenda)
 
 
+@pytest.mark.parametrize(
+    "has_updates,has_agenda",
+    [
+        (True, True),
+        (True, False),
+        (False, True),
+        (False, False),
+    ],
+)
+def test_updates_made_precomputed(event, event_document, has_updates, has_agenda):
+    event = event.build(
+        start_date=LAMetroEvent._time_from_now(hours=1).isoformat()[:25]
+    )
+    event_document.build(note="Agenda" if has_agenda else "Some document")
+
+    # Bypass auto_now by updating the queryset
+    LAMetroEvent.objects.filter(id=event.id).update(
+        updated_at=LAMetroEvent._time_ago(days=1 if has_updates else 7)
+    )
+
+    listed_event = LAMetroEvent.objects.for_listing().get(id=event.id)
+
+    assert listed_event.recently_updated == (has_updates and has_agenda)
+    assert updates_made(listed_event) == updates_made(
+        LAMetroEvent.objects.get(id=event.id)
+    )
+
+
 def test_current_meeting_streaming_event(concurrent_current_meetings, mocker):
     """
     Test that if an event is streaming, it alone is returned as current.
@@ -219,6 +255,7 @@ def test_streamed_meeting_is_marked_as_broadcast(concurrent_current_meetings, mo
     # is still upcoming, since it has not yet broadcast.
     with freeze_time(LAMetroEvent._time_from_now(hours=1)):
         mock_response.json.return_value = []
+        call_command("poll_live_media", "--once")
         del test_event_a.has_passed
 
         assert test_event_a.has_passed
@@ -231,6 +268,40 @@ def test_streamed_meeting_is_marked_as_broadcast(concurrent_current_meetings, mo
 def test_check_current_meeting(): ...
 
 
+def test_live_media_read_from_snapshot(concurrent_current_meetings, mocker):
+    """
+    Test that live media is only requested from Granicus by the poller, and
+    that events read their streaming status and media links from its snapshot.
+    """
+    live_meeting, _ = concurrent_current_meetings
+    live_meeting.extras = {"guid": "ENGLISH-GUID", "sap_guid": "SPANISH-GUID"}
+    live_meeting.save()
+
+    mock_response = mock_streaming_meetings(mocker, return_value=["english-guid"])
+    mock_get = mocker.patch(
+        "lametro.services.live_media_service.timed_get", return_value=mock_response
+    )
+
+    current_meeting = LAMetroEvent.current_meeting().get()
+
+    assert current_meeting == live_meeting
+    assert current_meeting.is_ongoing
+    assert current_meeting.english_live_media_url == LAMetroEvent.media_url(
+        "ENGLISH-GUID"
+    )
+    assert current_meeting.spanish_live_media_url == LAMetroEvent.media_url(
+        "SPANISH-GUID"
+    )
+    mock_get.assert_not_called()
+
+    mock_response.text = "The event you selected is not currently in progress"
+    call_command("poll_live_media", "--once")
+
+    assert (
+        current_meeting.english_live_media_url == LAMetroEvent.GENERIC_ENGLISH_MEDIA_URL
+    )
+
+
 def get_event_id():
     return "ocd-event/{}".format(str(uuid4()))
 
@@ -559,7 +630,7 @@ def test_meeting_stream_link_unavailable(mocker):
     """
     mock_response = mocker.MagicMock(spec=requests.Response)
     mock_response.status_code = 404
-    mocker.patch("lametro.models.requests.get")
+    mocker.patch("lametro.services.live_media_service.timed_get")
 
     current_meeting = LAMetroEvent.current_meeting()
 
@@ -615,7 +686,7 @@ def test_live_comment_details_display_as_expected(
     notice.save()
 
     mocker.patch(
-        "lametro.views.check_translations",
+        "lametro.services.translation_service.check_translations",
         return_value={"pdf": [], "rtf": []},
     )
 
@@ -767,3 +838,148 @@ def test_manually_broadcasted_events(event, admin_client, mocker):
     current_meeting_str = 'meeting currently has a manually published "Watch Live" link'
     response = admin_client.get(detail_url)
     assert current_meeting_str in response.content.decode("utf-8")
+
+
+@pytest.mark.django_db
+def test_homepage_meetings_cached(event, client, settings):
+    settings.CACHES = {
+        alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        for alias in ("default", "live_media")
+    }
+
+    start_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d %H:%M")
+    upcoming_meeting = event.build(
+        name="Upcoming Committee Meeting", start_date=start_date
+    )
+
+    url = reverse("lametro:index")
+
+    response = client.get(url)
+    assert upcoming_meeting.name in response.content.decode("utf-8")
+
+    # Cached meetings aren't queried again
+    with patch.object(LAMetroEvent, "upcoming_committee_meetings") as mock_meetings:
+        response = client.get(url)
+        mock_meetings.assert_not_called()
+        assert upcoming_meeting.name in response.content.decode("utf-8")
+
+    # Changing an event expires the cached meetings
+    upcoming_meeting.name = "Rescheduled Committee Meeting"
+    upcoming_meeting.save()
+
+    response = client.get(url)
+    assert "Rescheduled Committee Meeting" in response.content.decode("utf-8")
+
+
+@pytest.mark.django_db
+def test_all_events_paginated_by_day(event, client, mocker):
+    mocker.patch("lametro.views.LAMetroEventsView.days_per_page", 2)
+
+    for days_ago in (1, 1, 2, 3):
+        event.build(
+            id=f"ocd-event/{uuid4()}",
+            name=f"Meeting {days_ago} Days Ago {uuid4()}",
+            start_date=LAMetroEvent._time_ago(days=days_ago).isoformat()[:25],
+        )
+
+    url = reverse("lametro:event")
+
+    response = client.get(url, {"show": "all"})
+    days = [day for day, _ in response.context["all_events"]]
+
+    assert len(days) == 2
+    assert [len(events) for _, events in response.context["all_events"]] == [2, 1]
+    assert response.context["page"].has_next()
+
+    response = client.get(url, {"show": "all", "page": 2})
+
+    assert len(response.context["all_events"]) == 1
+    assert response.context["all_events"][0][0] < days[-1]
+
+
+def test_historical_minutes_reloaded(tmp_path, mocker):
+    csv_path = tmp_path / "historical_events.csv"
+    csv_path.write_text(
+        "Date,Meeting,Agenda Link,Minutes Link\n"
+        "1995-03-01,Regular Board Meeting,https://example.com/a2,https://example.com/m2\n"
+        '1994-02-01,Regular Board Meeting,https://example.com/a1,"https://example.com/m1\n'
+        'https://example.com/m1b"\n'
+    )
+    # An absolute file name replaces the data directory
+    mocker.patch.object(MinutesService, "HISTORICAL_EVENTS_FILE", str(csv_path))
+    mocker.patch.object(MinutesService, "_historical_index", None)
+    mocker.patch.object(MinutesService, "_historical_mtime", None)
+
+    events = MinutesService.get_historical_events()
+
+    assert [e["start_time"] for e in events] == [date(1994, 2, 1), date(1995, 3, 1)]
+    assert events[0]["minutes_link"] == (
+        "https://example.com/m1",
+        "https://example.com/m1b",
+    )
+
+    # Both bounds are inclusive
+    assert MinutesService.get_historical_events(date(1994, 2, 1), date(1994, 2, 1)) == (
+        events[0],
+    )
+    assert MinutesService.get_historical_events(start_date=date(1994, 2, 2)) == (
+        events[1],
+    )
+    assert MinutesService.get_historical_events(end_date=date(1993, 1, 1)) == ()
+
+    # Unchanged files aren't parsed again
+    parse = mocker.spy(minutes_service, "get_list_from_csv")
+    MinutesService.get_historical_events()
+    assert not parse.called
+
+    with open(csv_path, "a") as f:
+        f.write("1996-01-01,Regular Board Meeting,https://example.com/a3,\n")
+    os.utime(csv_path, (0, 1))
+
+    assert len(MinutesService.get_historical_events()) == 3
+
+
+@pytest.mark.django_db
+def test_minutes_merged_and_paginated(event, event_document, client, mocker):
+    historical_events = (
+        {"start_time": date(1995, 3, 1), "meeting": "Historical Meeting"},
+        {"start_time": date(2001, 6, 1), "meeting": "Historical Meeting"},
+    )
+    mocker.patch.object(
+        MinutesService, "get_historical_events", return_value=historical_events
+    )
+
+    for start_date in ("1998-01-05 09:30", "2003-01-05 09:30", "2003-01-05 11:00"):
+        meeting = event.build(
+            id=f"ocd-event/{uuid4()}",
+            name="Regular Board Meeting",
+            start_date=start_date,
+        )
+        event_document.build(event_id=meeting.id, note="Minutes")
+
+    event.build(id=f"ocd-event/{uuid4()}", name="Committee Meeting")
+
+    minutes, has_next = MinutesService.get_minutes(days_per_page=2)
+
+    assert [day for day, _ in minutes] == [date(2003, 1, 5), date(2001, 6, 1)]
+    assert [e["meeting"] for e in minutes[0][1]] == ["Regular Board Meeting"] * 2
+    assert minutes[0][1][0]["minutes_link"] == [
+        "https://metro.legistar.com/View.ashx?M=A&ID=545192&GUID=19F05A99-F3FB-4354-969F-67BE32A46081"
+    ]
+    assert has_next
+
+    minutes, has_next = MinutesService.get_minutes(page=2, days_per_page=2)
+
+    assert [day for day, _ in minutes] == [date(1998, 1, 5), date(1995, 3, 1)]
+    assert not has_next
+
+    # Batches of stored events are read in order
+    stored_events = MinutesService.get_stored_events(batch_size=1)
+    assert [e["start_time"] for e in stored_events] == [
+        date(2003, 1, 5),
+        date(2003, 1, 5),
+        date(1998, 1, 5),
+    ]
+
+    response = client.get(reverse("lametro:minutes"), {"page": 2})
+    assert response.status_code == 200
@@ -1,4 +1,12 @@
+import json
+
+from django.contrib.gis.geos import MultiPolygon, Polygon
 from django.urls import reverse
+from opencivicdata.core.models import Division
+import pytest
+
+from lametro.models import LAMetroPost, MapLayer
+from lametro.views import LABoardMembersView
 
 
 def test_organization_url(client, metro_organization):
@@ -50,3 +58,100 @@ def test_membership_context(client, metro_organization, membership, metro_person
     assert memberships[0].role == "Chair"
     assert memberships[1].role == "Vice Chair"
     assert memberships[2].role == "Member"
+
+
+@pytest.mark.django_db
+def test_map_layers(client, metro_organization, membership, metro_person):
+    board = metro_organization.build(name="Board of Directors")
+    division = Division.objects.create(
+        id="ocd-division/country:us/state:ca/place:los_angeles", name="Los Angeles"
+    )
+    post = LAMetroPost.objects.create(
+        id="ocd-post/00000000-0000-0000-0000-000000000000",
+        label="Mayor of the City of Los Angeles",
+        role="Board Member",
+        organization=board,
+        division=division,
+        shape=MultiPolygon(
+            Polygon(
+                (
+                    (-118.5, 34.0),
+                    (-118.25, 34.00001),
+                    (-118.0, 34.0),
+                    (-118.0, 34.5),
+                    (-118.5, 34.5),
+                    (-118.5, 34.0),
+                )
+            )
+        ),
+    )
+
+    # The post is vacant
+    layers = MapLayer.refresh()
+    features = json.loads(layers["city"].geojson)["features"]
+
+    assert features[0]["properties"]["council_member"] == "Vacant"
+    assert json.loads(layers["districts"].geojson)["features"] == []
+
+    # The nearly straight edge is simplified away
+    assert len(features[0]["geometry"]["coordinates"][0][0]) == 5
+
+    # Changing the post's members invalidates the layers, which are rebuilt on
+    # the next request
+    mayor = metro_person.build(name="Karen Bass")
+    membership.build(organization=board, person=mayor, post=post)
+
+    assert not MapLayer.objects.exists()
+
+    url = reverse("map_layer", args=["city"])
+    response = client.get(url)
+    features = response.json()["features"]
+
+    assert response["Content-Type"] == "application/geo+json"
+    assert "no-cache" in response["Cache-Control"]
+    assert features[0]["properties"]["council_member"] == "Karen Bass"
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    assert response.status_code == 304
+
+    response = client.get(reverse("lametro:council_members"))
+
+    assert response.context["map_layer_urls"]["city"].startswith(url)
+
+    assert client.get(reverse("map_layer", args=["nowhere"])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_board_members_ordered_in_one_query(
+    metro_organization, membership, metro_person, django_assert_num_queries
+):
+    board = metro_organization.build(name="Board of Directors")
+
+    for i, (family_name, role, office) in enumerate(
+        (
+            ("Alpha", "Nonvoting Board Member", None),
+            ("Bravo", "Board Member", None),
+            ("Charlie", "Board Member", "Vice Chair"),
+            ("Delta", "Board Member", "Chair"),
+            ("Echo", "Board Member", None),
+        )
+    ):
+        person = metro_person.build(family_name=family_name)
+        membership.build(id=i * 2, organization=board, person=person, role=role)
+
+        if office:
+            membership.build(
+                id=i * 2 + 1, organization=board, person=person, role=office
+            )
+
+    with django_assert_num_queries(2):
+        members = list(LABoardMembersView().get_queryset())
+
+    assert [(m.person.family_name, m.office_role) for m in members] == [
+        ("Delta", "Chair"),
+        ("Charlie", "Vice Chair"),
+        ("Bravo", None),
+        ("Echo", None),
+        ("Alpha", None),
+    ]
@@ -0,0 +1,104 @@
+import requests_mock
+
+from lametro.models import BillPacket, LAMetroBill, VisibleBill
+from lametro.services.packet_service import PacketService
+
+
+MERGE_ENDPOINT = "https://merger.test/dag_runs"
+MERGE_HOST = "https://packets.test/"
+
+
+def add_board_report(some_bill):
+    board_report = some_bill.versions.create(note="Board Report", date="2024-01-01")
+    board_report.links.create(url="https://metro.test/report.pdf")
+
+    for note in ("0 - Cover", "1 - Attachment"):
+        attachment = some_bill.documents.create(note=note, date="2024-01-01")
+        attachment.links.create(url=f"https://metro.test/{note[0]}.pdf")
+
+
+def test_compile_and_probe_packets(bill, settings, mocker):
+    settings.MERGE_ENDPOINT = MERGE_ENDPOINT
+    settings.MERGE_HOST = MERGE_HOST
+    mocker.patch.object(PacketService, "BACKOFF", 0)
+
+    some_bill = bill.build(classification=["Board Box"])
+    add_board_report(some_bill)
+
+    files = PacketService.bill_files([some_bill.pk])
+
+    # Attachments numbered 0 go last
+    assert files[some_bill.pk] == [
+        "https://metro.test/report.pdf",
+        "https://metro.test/1.pdf",
+        "https://metro.test/0.pdf",
+    ]
+
+    with requests_mock.Mocker() as m:
+        # Requests that fail for good aren't recorded, so they're retried on
+        # the next run
+        m.post(MERGE_ENDPOINT, status_code=503)
+
+        assert PacketService.compile(BillPacket, [some_bill], files) == []
+        assert m.call_count == 4
+        assert not BillPacket.objects.exists()
+
+        # Server errors are retried
+        m.post(MERGE_ENDPOINT, [{"status_code": 503}, {"status_code": 200}])
+
+        (packet,) = PacketService.compile(BillPacket, [some_bill], files)
+
+        assert m.last_request.json()["conf"]["attachment_links"] == files[some_bill.pk]
+        assert packet.url == f"{MERGE_HOST}{some_bill.slug}.pdf"
+        assert not BillPacket.objects.get(bill=some_bill).ready
+
+        # Packets are ready once the merger writes them
+        m.head(packet.url, status_code=404)
+        assert PacketService.probe(BillPacket) == 0
+
+        m.head(packet.url, status_code=200)
+        assert PacketService.probe(BillPacket) == 1
+        assert BillPacket.objects.get(bill=some_bill).ready
+
+
+def test_event_files_leave_out_private_bills(
+    bill, event, event_agenda_item, event_related_entity, event_document
+):
+    meeting = event.build()
+    agenda = event_document.build(event_id=meeting.id, note="Agenda")
+
+    public_bill = bill.build(classification=["Board Box"])
+    add_board_report(public_bill)
+
+    private_bill = bill.build(
+        id="ocd-bill/00000000-0000-0000-0000-000000000000",
+        identifier="2017-0000",
+        slug="2017-0000",
+        classification=["Board Box"],
+    )
+    private_report = private_bill.versions.create(
+        note="Board Report", date="2024-01-01"
+    )
+    private_report.links.create(url="https://metro.test/private.pdf")
+    private_bill.documents.create(note="1 - Attachment", date="2024-01-01")
+
+    for order, some_bill in enumerate((public_bill, private_bill), start=1):
+        event_related_entity.build(
+            agenda_item=event_agenda_item.build(event=meeting, order=order),
+            bill=some_bill,
+            entity_type="bill",
+        )
+
+    # The scrapers make the bill private without refreshing its visibility
+    private_bill.extras["restrict_view"] = True
+    LAMetroBill._base_manager.filter(pk=private_bill.pk).update(
+        extras=private_bill.extras
+    )
+    assert VisibleBill.objects.filter(bill_id=private_bill.pk).exists()
+
+    files = PacketService.event_files([meeting.pk])
+
+    assert files[meeting.pk] == [
+        agenda.links.get().url,
+        *PacketService.bill_files([public_bill.pk])[public_bill.pk],
+    ]
@@ -1,6 +1,15 @@
+import json
+from unittest.mock import patch
+
 import pytest
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.core.management import call_command
+from django.urls import reverse
+from opencivicdata.core.models import Division
 
 from .conftest import get_uid_chunk
+from lametro.models import LAMetroPerson, LAMetroPost, PersonRecentBill
+from lametro.services.person_service import PersonService
 from lametro.views import PersonDetailView, LAPersonDetailView
 
 
@@ -55,3 +64,91 @@ def test_person_page_redirects(client, metro_person, mocker):
 
     response = view.dispatch(None)
     assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_person_profile(client, metro_organization, membership, metro_person, settings):
+    settings.CACHES = {
+        alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        for alias in ("default", "live_media")
+    }
+
+    board = metro_organization.build(name="Board of Directors")
+    division = Division.objects.create(
+        id="ocd-division/country:us/state:ca/place:los_angeles", name="Los Angeles"
+    )
+    post = LAMetroPost.objects.create(
+        id="ocd-post/00000000-0000-0000-0000-000000000000",
+        label="Mayor of the City of Los Angeles",
+        role="Board Member",
+        organization=board,
+        division=division,
+        shape=MultiPolygon(
+            Polygon(((-118.5, 34.0), (-118.0, 34.0), (-118.0, 34.5), (-118.5, 34.0)))
+        ),
+    )
+    mayor = metro_person.build(name="Karen Bass")
+    membership.build(organization=board, person=mayor, post=post, role="Board Member")
+    mayor.links.create(note="web_site", url="https://mayor.lacity.gov")
+
+    person = PersonService.queryset().get(pk=mayor.pk)
+    profile = PersonService.get_profile(person)
+
+    assert profile.qualifying_post == "Mayor of the City of Los Angeles"
+    assert profile.website_url == "https://mayor.lacity.gov"
+    assert json.loads(profile.map_geojson)["features"][0]["geometry"]
+
+    # The district's GeoJSON is cached, until the post changes
+    with patch(
+        "lametro.services.person_service.serialize", return_value="{}"
+    ) as mock_serialize:
+        PersonService.get_profile(person).map_geojson
+        mock_serialize.assert_not_called()
+
+        post.save()
+
+        PersonService.get_profile(person).map_geojson
+        mock_serialize.assert_called_once()
+
+    response = client.get(reverse("lametro:person", args=[mayor.slug]))
+
+    assert response.status_code == 200
+    assert response.context["website_url"] == "https://mayor.lacity.gov"
+    assert response.context["qualifying_post"] == "Mayor of the City of Los Angeles"
+
+
+@pytest.mark.django_db
+def test_recent_committee_bills(
+    client, metro_organization, membership, metro_person, bill, bill_action
+):
+    committee = metro_organization.build(classification="committee")
+    member = metro_person.build()
+    membership.build(organization=committee, person=member, role="Member")
+
+    older_bill, newer_bill, other_bill = (
+        bill.build(
+            id=f"ocd-bill/00000000-0000-0000-0000-{i:012}",
+            identifier=f"2024-{i:04}",
+            slug=f"2024-{i:04}",
+            classification=["Board Box"],
+        )
+        for i in range(3)
+    )
+
+    # Actions by the person's committees are recorded as they're saved
+    bill_action.build(bill=older_bill, organization=committee, date="2024-01-01")
+    bill_action.build(bill=newer_bill, organization=committee, date="2024-02-01")
+    bill_action.build(bill=other_bill, date="2024-03-01")
+
+    person = LAMetroPerson.objects.get(pk=member.pk)
+    assert list(person.committee_sponsorships) == [newer_bill, older_bill]
+
+    # ...and rebuilt by the refresh command
+    PersonRecentBill.objects.all().delete()
+    call_command("refresh_recent_committee_bills")
+
+    person = LAMetroPerson.objects.get(pk=member.pk)
+    assert list(person.committee_sponsorships) == [newer_bill, older_bill]
+
+    response = client.get(reverse("person_feed", args=[member.slug]))
+    assert response.status_code == 200
@@ -0,0 +1,275 @@
+from datetime import datetime, timedelta
+import json
+import logging
+import os
+import time
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from opencivicdata.legislative.models import EventParticipant
+
+from councilmatic.settings import OCD_CITY_COUNCIL_NAME
+
+
+logger = logging.getLogger(__name__)
+
+# The maximum number of queries each route may make against the data seeded
+# by the site_data fixture. Set UPDATE_QUERY_BUDGETS=1 to write the measured
+# counts to this file instead of checking them, e.g., after a change that
+# legitimately adds a query. Routes without a measured budget are skipped.
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), "query_budgets.json")
+
+# Roughly a month of meetings and a few dozen board reports
+BOARD_MEMBERS = 13
+COMMITTEES = 6
+EVENTS = 24
+BILLS_PER_EVENT = 4
+ACTIONS_PER_BILL = 3
+
+
+@pytest.fixture
+def seed_site(
+    metro_organization,
+    metro_person,
+    membership,
+    event,
+    event_agenda_item,
+    event_related_entity,
+    event_document,
+    bill,
+    bill_action,
+    metro_subject,
+):
+    """
+    Return a function that seeds a batch of board members, meetings and board
+    reports. Each batch is the same size, so seeding a second batch shows
+    whether a page makes a query per row.
+    """
+    board = metro_organization.build(name=OCD_CITY_COUNCIL_NAME)
+    committees = [
+        metro_organization.build(classification="committee") for _ in range(COMMITTEES)
+    ]
+    metro_subject.build()
+
+    start_date = (datetime.now() - timedelta(days=365)).date().isoformat()
+    end_date = (datetime.now() + timedelta(days=365)).date().isoformat()
+
+    def seed(batch):
+        people = []
+
+        for i in range(BOARD_MEMBERS):
+            person = metro_person.build(family_name=f"Member {batch}-{i}")
+            people.append(person)
+
+            first_id = (batch * BOARD_MEMBERS + i) * (COMMITTEES + 1)
+
+            membership.build(
+                id=first_id,
+                organization=board,
+                person=person,
+                role="Chair" if i == 0 else "Board Member",
+                start_date=start_date,
+                end_date=end_date,
+            )
+
+            for j, committee in enumerate(committees[: i % COMMITTEES + 1]):
+                membership.build(
+                    id=first_id + j + 1,
+                    organization=committee,
+                    person=person,
+                    role="Chair" if i == j else "Member",
+                    start_date=start_date,
+                    end_date=end_date,
+                )
+
+        events = []
+        reports = []
+
+        for i in range(EVENTS):
+            # Half of the meetings are in the past, and half are upcoming
+            start_time = timezone.now() + timedelta(days=3 * (i - EVENTS // 2))
+            organization = board if i % 4 == 0 else committees[i % COMMITTEES]
+            name = "Regular Board Meeting" if i % 4 == 0 else organization.name
+            m = batch * EVENTS + i
+
+            meeting = event.build(
+                id=f"ocd-event/00000000-0000-0000-0000-{m:012}",
+                name=name,
+                start_date=start_time.strftime("%Y-%m-%d %H:%M"),
+                status="passed" if start_time < timezone.now() else "confirmed",
+                extras={"guid": f"00000000-0000-0000-0000-{m:012}"},
+            )
+            events.append(meeting)
+
+            EventParticipant.objects.create(
+                event=meeting,
+                name=organization.name,
+                entity_type="organization",
+                organization=organization,
+            )
+
+            event_document.build(event_id=meeting.id, note="Agenda")
+
+            if i % 4 == 0:
+                event_document.build(event_id=meeting.id, note="Minutes")
+
+            for j in range(BILLS_PER_EVENT):
+                n = m * BILLS_PER_EVENT + j
+
+                report = bill.build(
+                    id=f"ocd-bill/00000000-0000-0000-0000-{n:012}",
+                    identifier=f"2024-{n:04}",
+                    slug=f"2024-{n:04}",
+                    subject=["Metro Gold Line"],
+                )
+                reports.append(report)
+
+                for k in range(ACTIONS_PER_BILL):
+                    bill_action.build(
+                        bill=report,
+                        organization=organization,
+                        description="APPROVED" if k else "REFERRED",
+                        date=(start_time - timedelta(days=ACTIONS_PER_BILL - k))
+                        .date()
+                        .isoformat(),
+                        order=k,
+                    )
+
+                agenda_item = event_agenda_item.build(
+                    event=meeting, order=j + 1, description=report.title
+                )
+                event_related_entity.build(
+                    agenda_item=agenda_item,
+                    bill=report,
+                    entity_type="bill",
+                    name=report.identifier,
+                )
+
+        return {
+            "event": events[EVENTS // 2 - 1],
+            # Reports on the first meeting, which has passed, are visible
+            "bill": reports[0],
+            "person": people[0],
+        }
+
+    return seed
+
+
+@pytest.fixture
+def site_data(seed_site):
+    return seed_site(0)
+
+
+def load_budgets():
+    try:
+        with open(BUDGETS_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+ROUTES = {
+    "index": lambda data: reverse("lametro:index"),
+    "events": lambda data: reverse("lametro:event"),
+    "event_detail": lambda data: reverse(
+        "lametro:events", kwargs={"slug": data["event"].slug}
+    ),
+    "bill_detail": lambda data: reverse(
+        "lametro:bill_detail", kwargs={"slug": data["bill"].slug}
+    ),
+    "person": lambda data: reverse(
+        "lametro:person", kwargs={"slug": data["person"].slug}
+    ),
+    "committees": lambda data: reverse("lametro:committees"),
+    "board_members": lambda data: reverse("lametro:council_members"),
+    "minutes": lambda data: reverse("lametro:minutes"),
+}
+
+
+def measure(client, url):
+    """
+    Request the URL, and return the response and the queries it made.
+    """
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+        # Render lazy parts of the response while still capturing queries
+        response.content
+
+    return response, context.captured_queries
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("route", ROUTES)
+def test_query_budget(client, site_data, route, record_property):
+    url = ROUTES[route](site_data)
+
+    start = time.perf_counter()
+    response, queries = measure(client, url)
+    total_time = time.perf_counter() - start
+
+    query_count = len(queries)
+    sql_time = sum(float(query["time"]) for query in queries)
+
+    # Reported in the JUnit XML output, e.g., pytest --junitxml=report.xml
+    record_property("query_count", query_count)
+    record_property("sql_time", round(sql_time, 4))
+    record_property("render_time", round(total_time - sql_time, 4))
+
+    logger.info(
+        f"{url}: {query_count} queries, {sql_time:.3f}s in SQL, "
+        f"{total_time - sql_time:.3f}s rendering"
+    )
+
+    assert response.status_code == 200
+
+    budgets = load_budgets()
+
+    if os.getenv("UPDATE_QUERY_BUDGETS"):
+        budgets[route] = query_count
+
+        with open(BUDGETS_PATH, "w") as f:
+            json.dump(budgets, f, indent=4, sort_keys=True)
+            f.write("\n")
+
+        return
+
+    if route not in budgets:
+        pytest.skip(
+            f"{route} has no measured budget. Run with UPDATE_QUERY_BUDGETS=1 to "
+            "record one."
+        )
+
+    assert query_count <= budgets[route], (
+        f"{url} made {query_count} queries, over its budget of {budgets[route]}:\n"
+        + "\n".join(query["sql"] for query in queries)
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("route", ROUTES)
+def test_query_count_does_not_grow(client, seed_site, route):
+    """
+    Seeding a second batch of data doubles the rows on listing pages, so a
+    query made per row shows up as a difference in the query count, whether
+    or not the route has a budget.
+    """
+    url = ROUTES[route](seed_site(0))
+
+    # The first request pays one-time costs, e.g., building the map of
+    # subject names or filling per-process caches, so it isn't compared
+    measure(client, url)
+    _, queries = measure(client, url)
+
+    seed_site(1)
+    response, more_queries = measure(client, url)
+
+    assert response.status_code == 200
+    assert len(more_queries) == len(queries), (
+        f"{url} made {len(queries)} queries, then {len(more_queries)} with "
+        "twice the data:\n" + "\n".join(query["sql"] for query in more_queries)
+    )
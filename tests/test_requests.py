@@ -1,17 +1,105 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import io
+import socket
+import threading
+
 import pytest
+import requests
+import requests_mock
 
-from lametro.utils import timed_get, LAMetroRequestTimeoutException
+from lametro.utils import timed_get, get_session, LAMetroRequestTimeoutException
 
 
 def test_timed_get(mocker):
     """
-    First run mocks time.time() so that it looks like 9 seconds have passed.
-    Second run uses real time.
+    First run mocks time.monotonic() so that it looks like 9 seconds have passed
+    while reading the response. Second run uses real time.
+    """
+    with requests_mock.Mocker() as m:
+        m.get("https://google.com", text="Hello, world")
+
+        mocker.patch("lametro.utils.time.monotonic", side_effect=[0, 9])
+
+        with pytest.raises(LAMetroRequestTimeoutException):
+            timed_get("https://google.com", timeout=5)
+
+        mocker.stopall()
+        response = timed_get("https://google.com", timeout=5)
+
+    assert response.text == "Hello, world"
+
+
+def test_timed_get_timeout():
+    """
+    Test that connect and read timeouts raise the same exception as exceeding
+    the total timeout.
     """
-    mocker.patch("lametro.utils.time.time", side_effect=[0, 9])
+    with requests_mock.Mocker() as m:
+        m.get("https://google.com", exc=requests.ConnectTimeout)
+
+        with pytest.raises(LAMetroRequestTimeoutException):
+            timed_get("https://google.com", timeout=5)
+
+        m.get("https://google.com", exc=requests.ReadTimeout)
+
+        with pytest.raises(LAMetroRequestTimeoutException):
+            timed_get("https://google.com", timeout=5)
+
+
+class StalledBody(io.BytesIO):
+    def read(self, *args, **kwargs):
+        raise socket.timeout("timed out")
+
+
+def test_timed_get_timeout_while_streaming():
+    """
+    Test that a read timeout while streaming the body raises the same exception
+    as exceeding the total timeout.
+    """
+    with requests_mock.Mocker() as m:
+        m.get("https://google.com", body=StalledBody())
+
+        with pytest.raises(LAMetroRequestTimeoutException):
+            timed_get("https://google.com", timeout=5)
+
+
+class StalledHandler(BaseHTTPRequestHandler):
+    """
+    Send part of the body, then stall until the test is over.
+    """
+
+    protocol_version = "HTTP/1.1"
+    done = threading.Event()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "12")
+        self.end_headers()
+        self.wfile.write(b"Hello")
+        self.wfile.flush()
+        self.done.wait(10)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_timed_get_timeout_while_streaming_from_a_server():
+    """
+    Test a read timeout from a real connection, which urllib3 raises while
+    streaming the body.
+    """
+    server = HTTPServer(("127.0.0.1", 0), StalledHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        with pytest.raises(LAMetroRequestTimeoutException):
+            timed_get(f"http://127.0.0.1:{server.server_port}/", timeout=0.5)
+    finally:
+        StalledHandler.done.set()
+        server.shutdown()
+        server.server_close()
 
-    with pytest.raises(LAMetroRequestTimeoutException):
-        timed_get("https://google.com", timeout=5)
 
-    mocker.stopall()
-    timed_get("https://google.com", timeout=5)
+def test_timed_get_reuses_session():
+    assert get_session() is get_session()
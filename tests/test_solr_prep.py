@@ -1,8 +1,16 @@
+import json
 import pytest
 from datetime import datetime, timedelta
+from uuid import uuid4
 
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from haystack import connections as haystack_connections
 from opencivicdata.legislative.models import EventParticipant
 
+from lametro.models import LAMetroBill, QueuedBill
 from lametro.search_indexes import LAMetroBillIndex
 
 
@@ -161,3 +169,145 @@ def test_sponsorships(bill, metro_organization, event, event_related_entity, moc
     indexed_data = index.prepare(bill)
 
     assert indexed_data["sponsorships"] == {org1.name, org2.name, "Public Hearing"}
+
+
+def test_preload(bill, bill_action, metro_subject):
+    metro_subject.build(name="Metro Gold Line", classification="lines_and_ways_exact")
+    metro_subject.build(name="Budget", guid="0000-0-0001")
+
+    for i in range(3):
+        some_bill = bill.build(
+            id="ocd-bill/{}".format(uuid4()),
+            identifier="2017-000{}".format(i),
+            slug="2017-000{}".format(i),
+            classification=["Board Box"],
+            subject=["Metro Gold Line", "Budget"],
+        )
+        bill_action.build(bill=some_bill)
+        bill_action.build(bill=some_bill, description="APPROVED", order=1000)
+
+    index = LAMetroBillIndex()
+
+    # Prepare each bill individually, without prefetching
+    expected = {b.pk: index.full_prepare(b) for b in LAMetroBill.objects.all()}
+
+    def prepare_batch(size):
+        bills = list(index.index_queryset()[:size])
+
+        with CaptureQueriesContext(connection) as context:
+            with index.preload(bills):
+                prepared = {b.pk: index.full_prepare(b) for b in bills}
+
+        return prepared, len(context.captured_queries)
+
+    prepared, single_bill_queries = prepare_batch(1)
+    assert len(prepared) == 1
+
+    prepared, batch_queries = prepare_batch(3)
+    assert prepared == expected
+
+    # The number of queries does not depend on the number of bills
+    assert batch_queries == single_bill_queries
+
+    for data in prepared.values():
+        assert data["lines_and_ways"] == ["Metro Gold Line"]
+        assert data["topics"] == ["Budget"]
+        assert data["last_action_description"] == "APPROVED"
+        assert json.loads(data["rich_topics"]) == [
+            {"name": "Budget", "classification": "topics_exact"},
+            {"name": "Metro Gold Line", "classification": "lines_and_ways_exact"},
+        ]
+
+
+def test_rebuild_bill_index(bill, mocker, tmp_path):
+    bills = [
+        bill.build(
+            id="ocd-bill/{}".format(uuid4()),
+            identifier="2017-000{}".format(i),
+            slug="2017-000{}".format(i),
+            classification=["Board Box"],
+        )
+        for i in range(3)
+    ]
+    checkpoint = tmp_path / "checkpoint.json"
+
+    update = mocker.patch(
+        "lametro.search_backends.LAMetroElasticsearch7SearchBackend.update",
+        side_effect=[None, ValueError("Connection reset")],
+    )
+    mocker.patch(
+        "lametro.search_backends.LAMetroElasticsearch7SearchBackend.indexed_ids",
+        return_value=[bills[0].pk, "ocd-bill/deleted"],
+    )
+    remove = mocker.patch(
+        "lametro.search_backends.LAMetroElasticsearch7SearchBackend.remove"
+    )
+    mocker.patch.object(haystack_connections["default"].get_backend(), "conn")
+
+    command_args = (
+        "rebuild_bill_index",
+        "--batch-size=1",
+        f"--checkpoint={checkpoint}",
+    )
+
+    # The first range is recorded before the run fails on the second
+    with pytest.raises(CommandError):
+        call_command(*command_args)
+
+    assert json.loads(checkpoint.read_text())["completed"] == [0]
+
+    # Resuming indexes the remaining ranges and removes the checkpoint
+    update.side_effect = None
+    call_command(*command_args, "--resume")
+
+    successful_calls = update.call_args_list[:1] + update.call_args_list[2:]
+    indexed = [b.pk for c in successful_calls for b in c.args[1]]
+
+    assert sorted(indexed) == sorted(b.pk for b in bills)
+    assert not checkpoint.exists()
+
+    # Bills that are no longer indexable are removed
+    remove.assert_called_once_with("ocd-bill/deleted", commit=False)
+
+
+def test_queued_signal_processor(bill, bill_action, metro_subject):
+    some_bill = bill.build(subject=["Metro Gold Line"])
+    assert QueuedBill.objects.filter(bill_id=some_bill.pk).exists()
+
+    QueuedBill.objects.all().delete()
+    bill_action.build(bill=some_bill)
+    assert list(QueuedBill.objects.values_list("bill_id", flat=True)) == [some_bill.pk]
+
+    QueuedBill.objects.all().delete()
+    metro_subject.build(name="Metro Gold Line", classification="lines_and_ways_exact")
+    assert list(QueuedBill.objects.values_list("bill_id", flat=True)) == [some_bill.pk]
+
+
+def test_index_queued_bills(bill, mocker):
+    visible_bill = bill.build(
+        id="ocd-bill/{}".format(uuid4()),
+        slug="visible",
+        classification=["Board Box"],
+    )
+    private_bill = bill.build(
+        id="ocd-bill/{}".format(uuid4()),
+        slug="private",
+        extras={"restrict_view": True},
+    )
+    QueuedBill.enqueue(["ocd-bill/deleted"])
+
+    update = mocker.patch(
+        "lametro.search_backends.LAMetroElasticsearch7SearchBackend.update"
+    )
+    remove = mocker.patch(
+        "lametro.search_backends.LAMetroElasticsearch7SearchBackend.remove"
+    )
+
+    call_command("index_queued_bills", "--batch-size=2")
+
+    indexed = [b.pk for c in update.call_args_list for b in c.args[1]]
+    removed = [c.args[0] for c in remove.call_args_list]
+
+    assert indexed == [visible_bill.pk]
+    assert sorted(removed) == sorted([private_bill.pk, "ocd-bill/deleted"])
+    assert not QueuedBill.objects.exists()